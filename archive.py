@@ -0,0 +1,82 @@
+# File: archive.py
+from datetime import date, timedelta
+from sqlalchemy import text, bindparam
+from database import (
+    ProjectModel, UnitModel, ARCHIVE_SCHEMA, archive_config, archive_path, attach_archive, detach_archive
+)
+from events import ChangeEvent, ChangeKind
+from history import history_row
+import search_index
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+ARCHIVE_AFTER_DAYS = int(archive_config.get('max_age_days', 365))
+
+def _copy_statement(table):
+    columns = ", ".join(column.name for column in table.columns)
+    key = "project_id" if table is UnitModel.__table__ else "id"
+    return text(
+        f"INSERT OR REPLACE INTO {ARCHIVE_SCHEMA}.{table.name} ({columns}) "
+        f"SELECT {columns} FROM main.{table.name} WHERE {key} IN :ids"
+    ).bindparams(bindparam('ids', expanding=True))
+
+def _delete_statement(table):
+    key = "project_id" if table is UnitModel.__table__ else "id"
+    return text(f"DELETE FROM main.{table.name} WHERE {key} IN :ids").bindparams(bindparam('ids', expanding=True))
+
+def archive_finished_projects(db, max_age_days=ARCHIVE_AFTER_DAYS, batch_size=500, vacuum=False):
+    """
+    Moves Finished projects whose end date is more than max_age_days ago, with their units and search
+    rows, from the main database to the archive file. Returns the number of projects moved.
+    """
+    cutoff = (date.today() - timedelta(days=max_age_days)).isoformat()
+    history_rows = []
+    with db.engine.connect() as conn:
+        attach_archive(conn, create=True)
+        try:
+            # With WAL the commit is atomic per file only, so rows are copied before they are deleted and
+            # copies replace existing ones: an interrupted run leaves duplicates that the next run cleans up
+            with conn.begin():
+                project_ids = [row[0] for row in conn.execute(
+                    text("SELECT id FROM main.projects WHERE status = 'Finished' AND end_date IS NOT NULL AND end_date < :cutoff"),
+                    {'cutoff': cutoff}
+                )]
+                for start in range(0, len(project_ids), batch_size):
+                    batch = project_ids[start:start + batch_size]
+                    for table in (ProjectModel.__table__, UnitModel.__table__):
+                        conn.execute(_copy_statement(table), {'ids': batch})
+                    search_index.reindex_projects(conn, batch, schema=ARCHIVE_SCHEMA)
+                    search_index.remove_projects(conn, batch)
+                    for table in (UnitModel.__table__, ProjectModel.__table__):
+                        conn.execute(_delete_statement(table), {'ids': batch})
+                    history_rows.extend(
+                        history_row('project', project_id, project_id, 'archived', new_value=archive_path)
+                        for project_id in batch
+                    )
+        except Exception as e:
+            logger.error(f"Archiving Finished projects older than {cutoff} failed and was rolled back: {e}")
+            raise
+        finally:
+            detach_archive(conn)
+        if vacuum and project_ids:
+            # Gives the freed pages back to the file system; needs a moment of exclusive access
+            conn.exec_driver_sql("VACUUM")
+
+    logger.info(f"Archived {len(project_ids)} Finished projects that ended before {cutoff} to {archive_path}.")
+    if project_ids:
+        db.history.record(history_rows)
+        db.project_changed.emit(ChangeEvent(ChangeKind.PROJECTS_RELOADED))
+    return len(project_ids)
+
+if __name__ == "__main__":
+    import sys
+    from database import Database
+
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    database = Database()
+    moved = archive_finished_projects(
+        database, max_age_days=int(args[0]) if args else ARCHIVE_AFTER_DAYS, vacuum="--vacuum" in sys.argv[1:]
+    )
+    print(f"Archived {moved} projects to {archive_path}.")
+    database.close()
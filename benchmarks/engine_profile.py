@@ -0,0 +1,80 @@
+# File: benchmarks/engine_profile.py
+"""
+Compares commit latency and concurrent reader behaviour of the default SQLite engine
+against the profile from config.ini and the local disk opt-in (WAL, mmap). Run from the repository root:
+
+    python benchmarks/engine_profile.py [commits]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from database import Base, ENGINE_PROFILE, create_database_engine
+
+def _seed(engine):
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO projects (name, number, start_date, status, worker) "
+            "VALUES ('Bench', '1', '2024-01-01', 'Active', 'Alex')"
+        ))
+        conn.execute(
+            text("INSERT INTO units (project_id, name, is_done) VALUES (1, :name, 0)"),
+            [{'name': str(i)} for i in range(300)]
+        )
+
+def _run(label, profile, commits):
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_database_engine(path, profile)
+    _seed(engine)
+
+    stop = threading.Event()
+    reads = []
+    read_errors = []
+
+    def reader():
+        reader_engine = create_database_engine(path, profile)
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                with reader_engine.connect() as conn:
+                    conn.execute(text("SELECT COUNT(*) FROM units WHERE is_done = 1")).scalar()
+                reads.append(time.perf_counter() - start)
+            except Exception as e:
+                read_errors.append(str(e))
+        reader_engine.dispose()
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    latencies = []
+    for i in range(commits):
+        # Same shape as a checkbox toggle: one UPDATE, one COMMIT
+        start = time.perf_counter()
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE units SET is_done = :done WHERE id = :id"), {'done': i % 2, 'id': i % 300 + 1})
+        latencies.append(time.perf_counter() - start)
+    stop.set()
+    thread.join()
+    engine.dispose()
+
+    latencies.sort()
+    reads.sort()
+    print(f"{label}:")
+    print(f"  commits: {commits}, median {latencies[len(latencies) // 2] * 1000:.2f} ms, "
+          f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:.2f} ms")
+    if reads:
+        print(f"  concurrent reads: {len(reads)}, median {reads[len(reads) // 2] * 1000:.2f} ms, "
+              f"errors {len(read_errors)}")
+    else:
+        print(f"  concurrent reads: 0, errors {len(read_errors)}")
+
+if __name__ == "__main__":
+    commits = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    _run("Default engine", None, commits)
+    _run("Configured profile", ENGINE_PROFILE, commits)
+    _run("Local disk profile", dict(ENGINE_PROFILE, journal_mode='WAL', synchronous='NORMAL', mmap_size=134217728), commits)
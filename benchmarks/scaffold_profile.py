@@ -0,0 +1,43 @@
+# File: benchmarks/scaffold_profile.py
+"""
+Times creating the folder tree of a residential complex with one scaffold worker against the
+configured pool. Run from the repository root; point project_dir at a network share to see
+the effect of latency:
+
+    python benchmarks/scaffold_profile.py [units] [project_dir]
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def main(units=400, project_dir=None):
+    project_dir = project_dir or tempfile.mkdtemp()
+    work_dir = tempfile.mkdtemp()
+    with open(os.path.join(work_dir, "config.ini"), "w") as f:
+        f.write(
+            "[Paths]\n"
+            f"template_dir = {os.path.join(REPO_DIR, 'templates')}\n"
+            f"project_dir = {project_dir}\n"
+            f"logs_dir = {os.path.join(work_dir, 'logs')}\n"
+        )
+    # Configuration is read from the working directory when the modules are imported
+    os.chdir(work_dir)
+    sys.path.insert(0, REPO_DIR)
+    from project import Project, Unit
+    from scaffold import WORKERS, scaffold_project
+
+    for workers in (1, WORKERS):
+        project = Project(
+            name=f"Bench {workers}", number="1", is_residential_complex=True,
+            units=[Unit(name=f"A-{i}") for i in range(units)]
+        )
+        report = scaffold_project(project, workers=workers)
+        print(f"{workers} worker(s): {report.summary()}")
+        shutil.rmtree(report.folder)
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 400, args[1] if len(args) > 1 else None)
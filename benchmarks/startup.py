@@ -0,0 +1,106 @@
+# File: benchmarks/startup.py
+"""
+Measures cold start of the GUI: time to import main, to the first paint of the main window,
+until the database is open and the first tab is built, and until its first rows are shown.
+Every run is a fresh interpreter against a seeded database in a temporary directory, so
+imports are cold each time. Run from the repository root:
+
+    python benchmarks/startup.py [runs] [projects]
+
+Set QT_QPA_PLATFORM=offscreen to run without a display.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STEPS = ('import_main', 'first_paint', 'ready', 'first_rows')
+
+def _write_config(work_dir):
+    with open(os.path.join(work_dir, "config.ini"), "w") as f:
+        f.write(
+            "[Paths]\n"
+            f"template_dir = {os.path.join(REPO_DIR, 'templates')}\n"
+            f"project_dir = {os.path.join(work_dir, 'projects')}\n"
+            f"docx_temp_dir = {os.path.join(work_dir, 'temp_docx')}\n"
+            f"logs_dir = {os.path.join(work_dir, 'logs')}\n"
+            "database_file = projects.db\n"
+        )
+
+def _seed(work_dir, projects):
+    csv_path = os.path.join(work_dir, "seed.csv")
+    with open(csv_path, "w") as f:
+        f.write("Project Name;Project Number;Worker;Start Date;Status;Units\n")
+        for i in range(projects):
+            status = ("Active", "Completed", "Finished")[i % 3]
+            units = '"' + ";".join(f"A-{n}" for n in range(i % 40)) + '"' if i % 4 == 0 else ""
+            f.write(f"Project {i};{i};Bench;2024-01-01;{status};{units}\n")
+    subprocess.run(
+        [sys.executable, os.path.join(REPO_DIR, "importer.py"), csv_path],
+        cwd=work_dir, check=True, stdout=subprocess.DEVNULL
+    )
+
+def _child():
+    started = time.perf_counter()
+    sys.path.insert(0, REPO_DIR)
+    from PyQt5.QtCore import QEvent, QObject
+    from PyQt5.QtWidgets import QApplication
+
+    app = QApplication(sys.argv)
+    import main
+    timings = {'import_main': time.perf_counter() - started}
+
+    class FirstPaint(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Paint and 'first_paint' not in timings:
+                timings['first_paint'] = time.perf_counter() - started
+                timings['heavy_modules_at_paint'] = sorted(
+                    name for name in ('sqlalchemy', 'docx', 'openpyxl', 'win32com') if name in sys.modules
+                )
+            return False
+
+    paint_filter = FirstPaint()
+    app.installEventFilter(paint_filter)
+    window = main.MainWindow(deferred=True)
+    window.show()
+    app.processEvents()
+    window.start()
+    timings['ready'] = time.perf_counter() - started
+    deadline = time.perf_counter() + 10
+    while window.overview_tab.proxy.rowCount() == 0 and time.perf_counter() < deadline:
+        app.processEvents()
+        time.sleep(0.001)
+    timings['first_rows'] = time.perf_counter() - started
+    timings['tabs_built'] = sum(1 for _, attribute, _, _ in main.TABS if getattr(window, attribute) is not None)
+    window.close()
+    print(json.dumps(timings))
+
+def main(runs=5, projects=2000):
+    work_dir = tempfile.mkdtemp()
+    _write_config(work_dir)
+    _seed(work_dir, projects)
+    results = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child"],
+            cwd=work_dir, check=True, capture_output=True, text=True
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"Cold start over {runs} runs with {projects} projects (median):")
+    for step in STEPS:
+        print(f"  {step:<12} {statistics.median(result[step] for result in results) * 1000:8.1f} ms")
+    print(f"  tabs built at first rows: {results[-1]['tabs_built']} of 4")
+    print(f"  heavy modules loaded before first paint: {', '.join(results[-1]['heavy_modules_at_paint']) or 'none'}")
+
+if __name__ == "__main__":
+    if "--child" in sys.argv:
+        _child()
+    else:
+        args = [int(arg) for arg in sys.argv[1:]]
+        main(*args)
@@ -0,0 +1,128 @@
+# File: controllers/db_executor.py
+
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable, List, Optional
+
+from PyQt5.QtCore import QObject, pyqtSignal
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+class DatabaseExecutor(QObject):
+    """
+    Runs database work on one dedicated thread, in submission order, so the GUI thread never waits on SQLite.
+    Results come back as Futures; callbacks passed to submit run on the thread that created the executor.
+    """
+    _finished = pyqtSignal(object, object)  # (Future, list of (on_done, on_error) pairs)
+
+    def __init__(self, db):
+        super().__init__()
+        self.db = db
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._pending: Dict[Hashable, tuple] = {}  # coalescing key -> (Future, callbacks)
+        self.submitted = 0
+        self.coalesced = 0
+        # The executor lives on the GUI thread, so emitting from the worker queues the delivery there
+        self._finished.connect(self._deliver)
+        self._thread = threading.Thread(target=self._run, name="db-worker", daemon=True)
+        self._thread.start()
+
+    def submit(self, fn: Callable, *args, key: Optional[Hashable] = None,
+               on_done: Optional[Callable] = None, on_error: Optional[Callable] = None, **kwargs) -> Future:
+        """
+        Queues fn(*args, **kwargs) for the worker thread. Requests with the same key that are still
+        waiting or running share one call and one Future; every caller still gets its callbacks.
+        Requests without a key (writes) are never shared, and reads queued after them never join reads from before.
+        """
+        callbacks = [(on_done, on_error)]
+        with self._lock:
+            self.submitted += 1
+            if key is None:
+                self._pending.clear()
+            elif key in self._pending:
+                future, pending_callbacks = self._pending[key]
+                pending_callbacks.extend(callbacks)
+                self.coalesced += 1
+                return future
+            future = Future()
+            if key is not None:
+                self._pending[key] = (future, callbacks)
+        self._queue.put((future, key, callbacks, fn, args, kwargs))
+        return future
+
+    def pending_count(self) -> int:
+        return self._queue.qsize()
+
+    def shutdown(self, wait: bool = True):
+        """
+        Stops the worker after the requests already queued have run.
+        """
+        self._queue.put(None)
+        if wait:
+            self._thread.join()
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            future, key, callbacks, fn, args, kwargs = job
+            if not future.set_running_or_notify_cancel():
+                self._release(key, future)
+                continue
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                logger.error(f"Background database call {getattr(fn, '__name__', fn)} failed: {e}")
+                self._release(key, future)
+                future.set_exception(e)
+            else:
+                self._release(key, future)
+                future.set_result(result)
+            try:
+                self._finished.emit(future, callbacks)
+            except RuntimeError:
+                # The Qt side is gone (application shutting down), there is nobody left to call back
+                break
+        self.db.release_session()
+        logger.info("Database worker stopped.")
+
+    def _release(self, key, future):
+        # Later requests with the same key must start a new call, since this one may have read stale data
+        if key is not None:
+            with self._lock:
+                if key in self._pending and self._pending[key][0] is future:
+                    del self._pending[key]
+
+    def _deliver(self, future: Future, callbacks: List[tuple]):
+        with self._lock:
+            callbacks = list(callbacks)
+        error = future.exception()
+        for on_done, on_error in callbacks:
+            try:
+                if error is None:
+                    if on_done is not None:
+                        on_done(future.result())
+                elif on_error is not None:
+                    on_error(error)
+            except Exception as e:
+                logger.error(f"Callback for background database call failed: {e}")
+
+_executors: Dict[int, DatabaseExecutor] = {}
+
+def get_executor(db) -> DatabaseExecutor:
+    """
+    Returns the executor of a Database, starting it on first use. Must be called from the GUI thread.
+    """
+    executor = _executors.get(id(db))
+    if executor is None:
+        executor = _executors[id(db)] = DatabaseExecutor(db)
+    return executor
+
+def shutdown_executor(db):
+    executor = _executors.pop(id(db), None)
+    if executor is not None:
+        executor.shutdown()
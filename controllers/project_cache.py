@@ -0,0 +1,152 @@
+# File: controllers/project_cache.py
+
+import threading
+from collections import OrderedDict
+from configparser import ConfigParser
+from dataclasses import replace
+from typing import Dict, List, Optional
+
+from events import ChangeKind
+from project import Project
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+# Load configuration
+config = ConfigParser()
+config.read('config.ini')
+
+cache_config = config['Cache'] if config.has_section('Cache') else {}
+# Upper bound on cached rows, counting each project and each of its units as one
+MAX_CACHE_WEIGHT = int(cache_config.get('max_rows', 50000))
+
+def _clone(project: Project) -> Project:
+    # Callers mutate the projects they get (e.g. handle_move_project), so never hand out cached instances
+    return replace(project, units=[replace(unit) for unit in project.units])
+
+def _weight(project: Project) -> int:
+    return 1 + len(project.units)
+
+class ProjectCache:
+    """
+    Process-wide LRU cache of projects and of per-status project lists, bounded by row count.
+    """
+    def __init__(self, max_weight: int = MAX_CACHE_WEIGHT):
+        self.max_weight = max_weight
+        self._lock = threading.RLock()
+        self._projects: "OrderedDict[int, Project]" = OrderedDict()
+        self._lists: Dict[Optional[str], List[int]] = {}
+        self._weight = 0
+        self._attached = set()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def attach(self, db):
+        """
+        Subscribes to the change events of a Database once, so writes that bypass the
+        controller (e.g. bulk imports) also invalidate the cache. Must run before any view
+        connects to project_changed, so views never read stale entries.
+        """
+        with self._lock:
+            if id(db) in self._attached:
+                return
+            self._attached.add(id(db))
+        db.project_changed.connect(self.apply_event)
+
+    def get(self, project_id: int) -> Optional[Project]:
+        with self._lock:
+            project = self._projects.get(project_id)
+            if project is None:
+                self.misses += 1
+                return None
+            self._projects.move_to_end(project_id)
+            self.hits += 1
+            return _clone(project)
+
+    def put(self, project: Project):
+        with self._lock:
+            self._store(project)
+            self._evict()
+
+    def get_list(self, status: Optional[str]) -> Optional[List[Project]]:
+        with self._lock:
+            project_ids = self._lists.get(status)
+            if project_ids is None or any(project_id not in self._projects for project_id in project_ids):
+                self.misses += 1
+                return None
+            self.hits += 1
+            for project_id in project_ids:
+                self._projects.move_to_end(project_id)
+            return [_clone(self._projects[project_id]) for project_id in project_ids]
+
+    def put_list(self, status: Optional[str], projects: List[Project]):
+        with self._lock:
+            for project in projects:
+                self._store(project)
+            self._lists[status] = [project.id for project in projects]
+            self._evict()
+
+    def invalidate(self, project_id: Optional[int] = None, statuses=None):
+        """
+        Drops one project, or everything when project_id is None. Lists are dropped for the
+        given statuses plus the unfiltered list, or all of them when statuses is None.
+        """
+        with self._lock:
+            if project_id is None:
+                self._projects.clear()
+                self._lists.clear()
+                self._weight = 0
+                return
+            project = self._projects.pop(project_id, None)
+            if project is not None:
+                self._weight -= _weight(project)
+            if statuses is None:
+                self._lists.clear()
+                return
+            for status in set(statuses) | {None}:
+                self._lists.pop(status, None)
+
+    def apply_event(self, event):
+        if event.kind == ChangeKind.PROJECTS_RELOADED:
+            self.invalidate()
+        elif event.kind == ChangeKind.UNIT_TOGGLED:
+            # Membership of the lists doesn't change, so patch the cached unit in place
+            with self._lock:
+                project = self._projects.get(event.project_id)
+                for unit in project.units if project else []:
+                    if unit.id == event.unit_id:
+                        unit.is_done = event.is_done
+        else:
+            self.invalidate(event.project_id, statuses=(event.status, event.old_status))
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'projects': len(self._projects),
+                'lists': len(self._lists),
+                'weight': self._weight,
+                'max_weight': self.max_weight,
+            }
+
+    def _store(self, project: Project):
+        old = self._projects.pop(project.id, None)
+        if old is not None:
+            self._weight -= _weight(old)
+        self._projects[project.id] = _clone(project)
+        self._weight += _weight(project)
+
+    def _evict(self):
+        while self._weight > self.max_weight and self._projects:
+            _, project = self._projects.popitem(last=False)
+            self._weight -= _weight(project)
+            self.evictions += 1
+        # Lists pointing at evicted projects fail the membership check in get_list and get reloaded
+
+# Shared by every ProjectController in the process
+project_cache = ProjectCache()
@@ -1,27 +1,136 @@
 # File: controllers/project_controller.py
 
-from project import Project
+from concurrent.futures import Future
+from project import Project, ProjectPage, Unit
 from database import ProjectModel, UnitModel
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Optional, List, Tuple, Dict
+from controllers.project_cache import project_cache
+from controllers.db_executor import get_executor
+from utils import date_range
+from folders import project_folder
+from events import ChangeEvent, ChangeKind
 from logger import get_logger
 
 logger = get_logger(__name__)
 
 class ProjectController:
-    def __init__(self, db):
+    def __init__(self, db, cache=project_cache, executor=None):
         self.db = db  # The Database instance containing the session
+        self.cache = cache
+        self.cache.attach(db)
+        self._executor = executor
 
-    def load_projects(self, status: Optional[str] = None) -> List[Project]:
+    @property
+    def executor(self):
+        # Started on first use, so controllers that are only used synchronously don't need one
+        if self._executor is None:
+            self._executor = get_executor(self.db)
+        return self._executor
+
+    def submit(self, fn, *args, key=None, on_done=None, on_error=None, **kwargs) -> Future:
+        """
+        Runs fn on the DB worker thread. on_done and on_error are called on the GUI thread;
+        reads with the same key that are still in flight share one query.
+        """
+        return self.executor.submit(fn, *args, key=key, on_done=on_done, on_error=on_error, **kwargs)
+
+    def load_projects(self, status: Optional[str] = None, include_archive: bool = False) -> List[Project]:
+        """
+        Loads every project, or those with the given status. With include_archive, archived projects follow the current ones.
+        """
         try:
-            return self.db.load_projects(status=status)
+            projects = self.cache.get_list(status)
+            if projects is None:
+                projects = self.db.load_projects(status=status)
+                self.cache.put_list(status, projects)
+            if include_archive:
+                projects = projects + self.db.load_projects(status=status, archived=True)
+            return projects
         except Exception as e:
             logger.error(f"Failed to load projects: {e}")
             return []
 
+    def load_projects_with_counts(self, status: Optional[str] = None, include_archive: bool = False) -> Tuple[List[Project], dict]:
+        projects = self.load_projects(status=status, include_archive=include_archive)
+        counts = self.unit_completion_counts(status=status)
+        if include_archive:
+            # Archived projects keep their ids, which are never handed out again
+            counts.update(self.unit_completion_counts(status=status, archived=True))
+        return projects, counts
+
+    def load_projects_page(self, status: Optional[str] = None, sort_column: str = 'id', descending: bool = False,
+                           after=None, limit: int = 100, started_in: Optional[str] = None,
+                           finished_in: Optional[str] = None, **filters) -> ProjectPage:
+        """
+        Loads one page of projects. started_in and finished_in take a period from utils.DATE_PERIODS,
+        e.g. started_in='this_quarter' or finished_in='last_year', and filter on the indexed date columns.
+        """
+        try:
+            if started_in is not None:
+                filters['start_date_from'], filters['start_date_to'] = date_range(started_in)
+            if finished_in is not None:
+                filters['end_date_from'], filters['end_date_to'] = date_range(finished_in)
+            page = self.db.load_projects_page(
+                status=status, sort_column=sort_column, descending=descending, after=after, limit=limit, **filters
+            )
+            for project in page.projects:
+                # The cache only holds complete projects
+                if project.units_loaded:
+                    self.cache.put(project)
+            return page
+        except Exception as e:
+            logger.error(f"Failed to load projects page: {e}")
+            return ProjectPage()
+
+    def load_projects_page_with_counts(self, **params) -> Tuple[ProjectPage, dict]:
+        page = self.load_projects_page(**params)
+        return page, self._counts_for(page.projects)
+
+    def _counts_for(self, projects: List[Project]) -> dict:
+        counts = self.unit_completion_counts(project_ids=[project.id for project in projects if not project.is_archived])
+        archived_ids = [project.id for project in projects if project.is_archived]
+        if archived_ids:
+            counts.update(self.unit_completion_counts(project_ids=archived_ids, archived=True))
+        return counts
+
+    def load_projects_page_async(self, on_done, on_error=None, **params) -> Future:
+        """
+        Loads a page in the background and calls on_done((page, unit completion counts)).
+        """
+        key = ('page',) + tuple(sorted(params.items()))
+        return self.submit(self.load_projects_page_with_counts, key=key, on_done=on_done, on_error=on_error, **params)
+
+    def search(self, search_text: str, status: Optional[str] = None, limit: int = 50,
+               include_archive: bool = False) -> List[Project]:
+        """
+        Returns matching projects best first. With include_archive, archived matches follow the current ones.
+        """
+        try:
+            project_ids = self.db.search_project_ids(search_text, status=status, limit=limit)
+            projects = self.get_projects_by_ids(project_ids)
+            if include_archive and len(projects) < limit:
+                projects += self.db.search_projects(search_text, status=status, limit=limit - len(projects), archived=True)
+            return projects
+        except Exception as e:
+            logger.error(f"Failed to search projects for '{search_text}': {e}")
+            return []
+
+    def search_async(self, search_text: str, on_done, on_error=None, status: Optional[str] = None, limit: int = 50,
+                     include_archive: bool = False) -> Future:
+        """
+        Searches in the background and calls on_done((projects, unit completion counts)).
+        """
+        def run():
+            projects = self.search(search_text, status=status, limit=limit, include_archive=include_archive)
+            return projects, self._counts_for(projects)
+        key = ('search', search_text, status, limit, include_archive)
+        return self.submit(run, key=key, on_done=on_done, on_error=on_error)
+
     def add_project(self, project: Project) -> int:
         try:
             project_id = self.db.add_project(project)
+            self.cache.invalidate(project_id, statuses=(project.status,))
             logger.info(f"Project '{project.name}' added with ID {project_id}")
             return project_id
         except Exception as e:
@@ -31,30 +140,130 @@ class ProjectController:
     def update_project(self, project: Project):
         try:
             self.db.update_project(project)
+            self.cache.invalidate(project.id)
             logger.info(f"Project '{project.name}' updated.")
         except Exception as e:
             logger.error(f"Failed to update project '{project.name}': {e}")
             raise
 
+    def update_project_async(self, project: Project, on_done=None, on_error=None) -> Future:
+        return self.submit(self.update_project, project, on_done=on_done, on_error=on_error)
+
     def delete_project(self, project_id: int):
         try:
             self.db.delete_project(project_id)
+            self.cache.invalidate(project_id)
             logger.info(f"Project with ID {project_id} deleted.")
         except Exception as e:
             logger.error(f"Failed to delete project with ID {project_id}: {e}")
             raise
 
+    def delete_project_async(self, project_id: int, on_done=None, on_error=None) -> Future:
+        return self.submit(self.delete_project, project_id, on_done=on_done, on_error=on_error)
+
     def get_project_by_id(self, project_id: int) -> Optional[Project]:
         try:
-            return self.db.get_project_by_id(project_id)
+            project = self.cache.get(project_id)
+            if project is None:
+                project = self.db.get_project_by_id(project_id)
+                if project is not None:
+                    self.cache.put(project)
+            return project
         except Exception as e:
             logger.error(f"Failed to retrieve project with ID {project_id}: {e}")
             return None
 
+    def project_folder(self, project_id: int) -> Optional[str]:
+        """
+        Path of the folder stored with a project, from the cache when it holds the project. None if the project doesn't exist.
+        """
+        project = self.get_project_by_id(project_id)
+        return project_folder(project) if project is not None else None
+
+    def folder_shared(self, project: Project) -> bool:
+        """
+        True if other projects are stored with the same folder as this one.
+        """
+        try:
+            return bool(project.folder) and self.db.count_projects_in_folder(project.folder) > 1
+        except Exception as e:
+            logger.error(f"Failed to check who else uses the folder of project '{project.name}': {e}")
+            return True
+
+    def folder_shared_async(self, project: Project, on_done, on_error=None) -> Future:
+        return self.submit(self.folder_shared, project, key=('folder_shared', project.folder), on_done=on_done, on_error=on_error)
+
+    def get_project_async(self, project_id: int, on_done, on_error=None) -> Future:
+        """
+        Reads one project in the background and calls on_done((project or None, unit completion counts)).
+        """
+        def run():
+            project = self.get_project_by_id(project_id)
+            return project, self._counts_for([project]) if project else {}
+        return self.submit(run, key=('project', project_id), on_done=on_done, on_error=on_error)
+
+    def get_projects_async(self, project_ids: List[int], on_done, on_error=None) -> Future:
+        """
+        Reads several projects in the background and calls on_done((projects, unit completion counts)).
+        Projects that no longer exist are left out.
+        """
+        def run():
+            projects = self.get_projects_by_ids(project_ids)
+            return projects, self._counts_for(projects)
+        return self.submit(run, key=('projects', tuple(project_ids)), on_done=on_done, on_error=on_error)
+
+    def get_projects_by_ids(self, project_ids: List[int]) -> List[Project]:
+        """
+        Returns the projects in the given order, reading only the ones missing from the cache.
+        """
+        try:
+            found = {}
+            for project_id in project_ids:
+                project = self.cache.get(project_id)
+                if project is not None:
+                    found[project_id] = project
+            missing = [project_id for project_id in project_ids if project_id not in found]
+            for project in self.db.get_projects_by_ids(missing):
+                self.cache.put(project)
+                found[project.id] = project
+            return [found[project_id] for project_id in project_ids if project_id in found]
+        except Exception as e:
+            logger.error(f"Failed to retrieve projects {project_ids}: {e}")
+            return []
+
+    def load_units(self, project_ids: List[int], archived: bool = False) -> Dict[int, List[Unit]]:
+        try:
+            return self.db.load_units(project_ids, archived=archived)
+        except Exception as e:
+            logger.error(f"Failed to load units of projects {project_ids}: {e}")
+            return {}
+
+    def load_units_async(self, project_ids: List[int], on_done, on_error=None, archived: bool = False) -> Future:
+        """
+        Loads the units of several projects in the background and calls on_done({project_id: [Unit, ...]}).
+        """
+        key = ('units', tuple(project_ids), archived)
+        return self.submit(self.load_units, list(project_ids), archived=archived, key=key, on_done=on_done, on_error=on_error)
+
+    def unit_completion_counts(self, status: Optional[str] = None, project_ids: Optional[List[int]] = None,
+                               archived: bool = False) -> dict:
+        try:
+            return self.db.unit_completion_counts(status=status, project_ids=project_ids, archived=archived)
+        except Exception as e:
+            logger.error(f"Failed to count completed units: {e}")
+            return {}
+
     def toggle_unit_status(self, project_id: int, unit_id: int, is_done: bool):
         try:
             self.db.toggle_unit_status(project_id, unit_id, is_done)
+            self.cache.apply_event(ChangeEvent(ChangeKind.UNIT_TOGGLED, project_id=project_id, unit_id=unit_id, is_done=is_done))
             logger.info(f"Unit with ID {unit_id} in project {project_id} status set to {'done' if is_done else 'not done'}.")
         except Exception as e:
             logger.error(f"Failed to toggle unit status for unit {unit_id} in project {project_id}: {e}")
             raise
+
+    def toggle_unit_status_async(self, project_id: int, unit_id: int, is_done: bool, on_done=None, on_error=None) -> Future:
+        return self.submit(self.toggle_unit_status, project_id, unit_id, is_done, on_done=on_done, on_error=on_error)
+
+    def cache_stats(self) -> dict:
+        return self.cache.stats()
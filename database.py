@@ -1,10 +1,21 @@
 # File: database.py
-from sqlalchemy import create_engine, Column, Integer, String, Boolean, ForeignKey
+from sqlalchemy import (
+    create_engine, event, func, tuple_, case, type_coerce, Column, Integer, String, Boolean, Date, ForeignKey, Index
+)
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship, scoped_session
-from project import Project, Unit
+from sqlalchemy.orm import Session, sessionmaker, relationship, scoped_session, selectinload, noload
+from sqlalchemy.pool import QueuePool
+from project import Project, ProjectPage, Unit, HistoryEntry, format_date
+from events import ChangeEvent, ChangeKind
+from migrations import run_migrations, check_query_plans, upgrade_archive
+import search_index
+from history import HistoryWriter, history_row, PROJECT_FIELDS
+from folders import move_project_folder, unit_folder_names
+from utils import get_project_folder_name, natural_sort_key
 from logger import get_logger
 import os
+from contextlib import contextmanager
+from datetime import date
 from configparser import ConfigParser
 from PyQt5.QtCore import QObject, pyqtSignal
 
@@ -30,6 +41,99 @@ if not os.path.exists(project_dir):
 # Construct full database path
 db_path = os.path.join(project_dir, database_file)
 
+# Old Finished projects are moved to a separate file that is attached only while it is read, see archive.py
+archive_config = config['Archive'] if config.has_section('Archive') else {}
+archive_path = os.path.join(project_dir, archive_config.get('archive_file', 'archive.db'))
+ARCHIVE_SCHEMA = 'archive'
+
+# Engine profile applied to every SQLite connection, see [Database] in config.ini
+db_config = config['Database'] if config.has_section('Database') else {}
+ENGINE_PROFILE = {
+    'journal_mode': db_config.get('journal_mode', 'DELETE').upper(),
+    'busy_timeout': int(db_config.get('busy_timeout', 5000)),
+    'synchronous': db_config.get('synchronous', 'FULL').upper(),
+    'cache_size': int(db_config.get('cache_size', -16000)),
+    'mmap_size': int(db_config.get('mmap_size', 0)),
+    'temp_store': db_config.get('temp_store', 'MEMORY').upper(),
+    'pool_size': int(db_config.get('pool_size', 5)),
+    'max_overflow': int(db_config.get('max_overflow', 5)),
+    'pool_timeout': int(db_config.get('pool_timeout', 30)),
+    'pool_recycle': int(db_config.get('pool_recycle', 3600)),
+}
+
+JOURNAL_MODES = {'DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF'}
+SYNCHRONOUS_MODES = {'OFF', 'NORMAL', 'FULL', 'EXTRA'}
+TEMP_STORES = {'DEFAULT', 'FILE', 'MEMORY'}
+
+# File systems reached over the network, as named in /proc/mounts
+NETWORK_FILE_SYSTEMS = ('nfs', 'nfs4', 'cifs', 'smbfs', 'smb3', 'afs', '9p', 'fuse.sshfs')
+DRIVE_REMOTE = 4
+
+def is_network_path(path) -> bool:
+    """
+    Whether path is on a network share: a UNC path or mapped network drive on Windows, an NFS or SMB mount elsewhere.
+    """
+    path = os.path.abspath(path)
+    if os.name == 'nt':
+        if path.startswith('\\\\'):
+            return True
+        import ctypes
+        return ctypes.windll.kernel32.GetDriveTypeW(os.path.splitdrive(path)[0] + '\\') == DRIVE_REMOTE
+    try:
+        with open('/proc/mounts') as mounts:
+            mount_points = [line.split()[1:3] for line in mounts]
+    except OSError:
+        return False
+    # The longest mount point containing the path is the one it is on
+    fs_type = max(((mount_point, fs_type) for mount_point, fs_type in mount_points
+                   if path == mount_point or path.startswith(mount_point.rstrip('/') + '/')),
+                  key=lambda mount: len(mount[0]), default=(None, None))[1]
+    return fs_type in NETWORK_FILE_SYSTEMS
+
+def create_database_engine(path, profile=None):
+    """
+    Creates a SQLAlchemy engine for the SQLite file at path. With a profile, every new
+    connection gets its pragmas and the engine uses a bounded connection pool.
+    """
+    if profile is None:
+        return create_engine(f'sqlite:///{path}', echo=False)
+
+    if profile['journal_mode'] not in JOURNAL_MODES:
+        raise ValueError(f"Invalid journal_mode '{profile['journal_mode']}'")
+    if profile['synchronous'] not in SYNCHRONOUS_MODES:
+        raise ValueError(f"Invalid synchronous mode '{profile['synchronous']}'")
+    if profile['temp_store'] not in TEMP_STORES:
+        raise ValueError(f"Invalid temp_store '{profile['temp_store']}'")
+
+    # WAL's shared memory index and memory mapped I/O rely on locking a network share doesn't provide
+    if (profile['journal_mode'] == 'WAL' or profile['mmap_size'] > 0) and is_network_path(path):
+        logger.warning(f"{path} is on a network share, using journal_mode DELETE without mmap.")
+        profile = dict(profile, journal_mode='DELETE', mmap_size=0)
+
+    engine = create_engine(
+        f'sqlite:///{path}',
+        echo=False,
+        poolclass=QueuePool,
+        pool_size=profile['pool_size'],
+        max_overflow=profile['max_overflow'],
+        pool_timeout=profile['pool_timeout'],
+        pool_recycle=profile['pool_recycle'],
+        connect_args={'timeout': profile['busy_timeout'] / 1000, 'check_same_thread': False}
+    )
+
+    @event.listens_for(engine, "connect")
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA journal_mode = {profile['journal_mode']}")
+        cursor.execute(f"PRAGMA busy_timeout = {int(profile['busy_timeout'])}")
+        cursor.execute(f"PRAGMA synchronous = {profile['synchronous']}")
+        cursor.execute(f"PRAGMA cache_size = {int(profile['cache_size'])}")
+        cursor.execute(f"PRAGMA mmap_size = {int(profile['mmap_size'])}")
+        cursor.execute(f"PRAGMA temp_store = {profile['temp_store']}")
+        cursor.close()
+
+    return engine
+
 Base = declarative_base()
 
 class ProjectModel(Base):
@@ -38,16 +142,37 @@ class ProjectModel(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String, nullable=False)
     number = Column(String, nullable=False)
-    start_date = Column(String, nullable=False)
-    end_date = Column(String, nullable=True)
+    start_date = Column(Date, nullable=False)  # Stored as 'YYYY-MM-DD' text, read as datetime.date
+    end_date = Column(Date, nullable=True)
     status = Column(String, nullable=False)
     is_residential_complex = Column(Boolean, default=False)
     number_of_units = Column(Integer, default=0)
     worker = Column(String, nullable=False)
     extra = Column(String, default="")
     main_contractor = Column(String, nullable=True)  # New Field
+    # Relative to the project directory; set when the project is created and renamed with it
+    folder = Column(String, nullable=True)
+    # utils.natural_sort_key of the text columns pages are sorted by, kept current by set_sort_keys
+    name_sort = Column(String, nullable=True)
+    number_sort = Column(String, nullable=True)
+    main_contractor_sort = Column(String, nullable=True)
+    worker_sort = Column(String, nullable=True)
     
-    units = relationship("UnitModel", back_populates="project", cascade="all, delete-orphan")
+    units = relationship("UnitModel", back_populates="project", cascade="all, delete-orphan", order_by="UnitModel.id")
+
+    __table_args__ = (
+        Index('ix_projects_status', 'status'),
+        Index('ix_projects_number', 'number'),
+        Index('ix_projects_start_date', 'start_date'),
+        Index('ix_projects_end_date', 'end_date'),
+        Index('ix_projects_folder', 'folder'),
+        Index('ix_projects_name_sort', 'name_sort'),
+        Index('ix_projects_number_sort', 'number_sort'),
+        Index('ix_projects_main_contractor_sort', 'main_contractor_sort'),
+        Index('ix_projects_worker_sort', 'worker_sort'),
+        # Ids of archived projects must never be handed out again
+        {'sqlite_autoincrement': True},
+    )
 
 class UnitModel(Base):
     __tablename__ = 'units'
@@ -56,24 +181,174 @@ class UnitModel(Base):
     project_id = Column(Integer, ForeignKey('projects.id'))
     name = Column(String, nullable=False)
     is_done = Column(Boolean, default=False)
+    folder = Column(String, nullable=True)  # Relative to the project folder
     
     project = relationship("ProjectModel", back_populates="units")
 
+    __table_args__ = (
+        Index('uq_units_project_name', 'project_id', 'name', unique=True),
+        Index('ix_units_project_done', 'project_id', 'is_done'),
+        {'sqlite_autoincrement': True},
+    )
+
+class HistoryModel(Base):
+    __tablename__ = 'history'
+
+    # Append-only: rows are written in batches by HistoryWriter and never updated
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    timestamp = Column(String, nullable=False)
+    entity = Column(String, nullable=False)
+    entity_id = Column(Integer, nullable=True)
+    project_id = Column(Integer, nullable=True)  # No foreign key, history outlives deleted projects
+    field = Column(String, nullable=False)
+    old_value = Column(String, nullable=True)
+    new_value = Column(String, nullable=True)
+    worker = Column(String, nullable=False, default="")
+
+    __table_args__ = (
+        Index('ix_history_project', 'project_id', 'id'),
+        Index('ix_history_timestamp', 'timestamp'),
+    )
+
+# Tables copied to the archive, in dependency order
+ARCHIVED_TABLES = (ProjectModel.__table__, UnitModel.__table__)
+
+_upgraded_archives = set()
+
+def attach_archive(conn, create=False):
+    """
+    Attaches the archive file to a connection as schema 'archive'. Returns False without attaching
+    when the archive doesn't exist yet, unless create is set, in which case its tables are created.
+    Must run outside of a transaction.
+    """
+    if not create and not os.path.exists(archive_path):
+        return False
+    conn.exec_driver_sql(f"ATTACH DATABASE ? AS {ARCHIVE_SCHEMA}", (archive_path,))
+    if create:
+        Base.metadata.create_all(
+            conn.execution_options(schema_translate_map={None: ARCHIVE_SCHEMA}), tables=list(ARCHIVED_TABLES)
+        )
+        search_index.create_search_table(conn, schema=ARCHIVE_SCHEMA)
+    if archive_path not in _upgraded_archives:
+        # Archives written by older versions lack the newer columns the models read
+        upgrade_archive(conn, ARCHIVE_SCHEMA)
+        _upgraded_archives.add(archive_path)
+    return True
+
+def detach_archive(conn):
+    conn.exec_driver_sql(f"DETACH DATABASE {ARCHIVE_SCHEMA}")
+
+# Project fields the folder name is made from
+FOLDER_FIELDS = ('name', 'number', 'main_contractor')
+
+# Stands in for a missing end date, which sorts after all others as in the project views
+NO_END_DATE = '9999-12-31'
+
+# Text columns pages can be sorted by, with the column holding their natural sort key
+SORT_KEY_COLUMNS = {
+    'name': 'name_sort',
+    'number': 'number_sort',
+    'main_contractor': 'main_contractor_sort',
+    'worker': 'worker_sort',
+}
+
+def sort_key_values(name, number, main_contractor, worker):
+    """
+    The sort key columns of a project row, for inserts that bypass the ORM.
+    """
+    values = {'name': name, 'number': number, 'main_contractor': main_contractor, 'worker': worker}
+    return {key_column: natural_sort_key(values[column]) for column, key_column in SORT_KEY_COLUMNS.items()}
+
+@event.listens_for(ProjectModel, 'before_insert')
+@event.listens_for(ProjectModel, 'before_update')
+def set_sort_keys(mapper, connection, project_model):
+    for column, key_column in SORT_KEY_COLUMNS.items():
+        setattr(project_model, key_column, natural_sort_key(getattr(project_model, column)))
+
+# Columns load_projects_page can sort by, in the same order as the project views sort them so pages
+# arrive in display order: text by its indexed natural sort key, status as is (the statuses are fixed
+# and capitalized alike). Missing end dates sort as a fixed value so keyset cursors stay comparable.
+# Dates sort as their stored ISO text, so cursors hold strings for them too.
+SORT_COLUMNS = {
+    'id': ProjectModel.id,
+    'name': ProjectModel.name_sort,
+    'number': ProjectModel.number_sort,
+    'main_contractor': ProjectModel.main_contractor_sort,
+    'status': ProjectModel.status,
+    'start_date': type_coerce(ProjectModel.start_date, String),
+    'end_date': type_coerce(func.coalesce(ProjectModel.end_date, NO_END_DATE), String),
+    'worker': ProjectModel.worker_sort,
+}
+
 class Database(QObject):
-    project_updated = pyqtSignal()
+    project_changed = pyqtSignal(object)  # Emits a ChangeEvent describing what changed
 
     def __init__(self):
         super().__init__()
         try:
-            self.engine = create_engine(f'sqlite:///{db_path}', echo=False)
+            self.engine = create_database_engine(db_path, ENGINE_PROFILE)
             Base.metadata.create_all(self.engine)
+            schema_version = run_migrations(self.engine)
+            check_query_plans(self.engine)
+            # Sessions are thread-local, so the DB worker thread and the GUI thread never share one
             self.Session = scoped_session(sessionmaker(bind=self.engine))
-            self.session = self.Session()
-            logger.info(f"Database initialized at {db_path}")
+            self.history = HistoryWriter(self.engine)
+            logger.info(f"Database initialized at {db_path} (schema version {schema_version})")
         except Exception as e:
             logger.error(f"Failed to initialize database at {db_path}: {e}")
             raise
 
+    @property
+    def session(self):
+        """
+        The session of the calling thread. Another thread may have committed changes to rows this
+        session still holds, so ORM queries use populate_existing() to refresh them.
+        """
+        return self.Session()
+
+    @contextmanager
+    def _reading(self, archived=False):
+        """
+        Yields the session to read from. For the archive this is a short-lived session on a connection
+        with the archive attached, where the ORM models map to the archive tables; None if there is no archive.
+        """
+        if not archived:
+            yield self.session
+            return
+        with self.engine.connect() as conn:
+            if not attach_archive(conn):
+                yield None
+                return
+            session = Session(bind=conn.execution_options(schema_translate_map={None: ARCHIVE_SCHEMA}))
+            try:
+                yield session
+            finally:
+                session.close()
+                detach_archive(conn)
+
+    def _to_project(self, p, archived=False, with_units=True):
+        return Project(
+            id=p.id,
+            name=p.name,
+            number=p.number,
+            start_date=p.start_date,
+            end_date=p.end_date,
+            start_date_text=format_date(p.start_date),
+            end_date_text=format_date(p.end_date),
+            status=p.status,
+            is_residential_complex=p.is_residential_complex,
+            number_of_units=p.number_of_units,
+            worker=p.worker,
+            extra=p.extra,
+            main_contractor=p.main_contractor,
+            units=[
+                Unit(id=unit.id, name=unit.name, is_done=bool(unit.is_done), folder=unit.folder or "") for unit in p.units
+            ] if with_units else [],
+            folder=p.folder or "",
+            is_archived=archived,
+            units_loaded=with_units
+        )
+
     def add_project(self, project: Project):
         try:
             project_model = ProjectModel(
@@ -86,17 +361,21 @@ class Database(QObject):
                 number_of_units=project.number_of_units,
                 worker=project.worker,
                 extra=project.extra,
-                main_contractor=project.main_contractor  # Map New Attribute
+                main_contractor=project.main_contractor,  # Map New Attribute
+                folder=project.folder or get_project_folder_name(project)
             )
             # Add units if residential complex
             if project.is_residential_complex and project.units:
-                for unit_name in project.units:
-                    unit_model = UnitModel(name=unit_name)
+                for unit, folder in zip(project.units, unit_folder_names(project.units)):
+                    unit_model = UnitModel(name=unit.name, is_done=unit.is_done, folder=folder)
                     project_model.units.append(unit_model)
             self.session.add(project_model)
+            self.session.flush()
+            search_index.reindex_projects(self.session, [project_model.id])
             self.session.commit()
+            self.history.record([history_row('project', project_model.id, project_model.id, 'created', new_value=project.name)])
             logger.info(f"Added project: {project.name} ({project.number}) with ID {project_model.id}")
-            self.project_updated.emit()  # Emit signal
+            self.project_changed.emit(ChangeEvent(ChangeKind.PROJECT_ADDED, project_id=project_model.id, status=project.status))
             return project_model.id
         except Exception as e:
             logger.error(f"Failed to add project: {e}")
@@ -105,8 +384,11 @@ class Database(QObject):
 
     def update_project(self, project: Project):
         try:
-            project_model = self.session.query(ProjectModel).filter_by(id=project.id).first()
+            project_model = self.session.query(ProjectModel).populate_existing().filter_by(id=project.id).first()
             if project_model:
+                old_status = project_model.status
+                old_values = {name: getattr(project_model, name) for name in PROJECT_FIELDS}
+                history_rows = []
                 project_model.name = project.name
                 project_model.number = project.number
                 project_model.start_date = project.start_date
@@ -117,85 +399,320 @@ class Database(QObject):
                 project_model.worker = project.worker
                 project_model.extra = project.extra
                 project_model.main_contractor = project.main_contractor  # Update New Attribute
-                # Update units
-                if project.is_residential_complex:
-                    # Clear existing units
-                    project_model.units.clear()
-                    # Add new units
-                    if project.units:
-                        for unit_name in project.units:
-                            unit_model = UnitModel(name=unit_name)
-                            project_model.units.append(unit_model)
-                else:
-                    project_model.units = []
-                self.session.commit()
-                logger.info(f"Updated project ID {project.id}: {project.name} ({project.number})")
-                self.project_updated.emit()  # Emit signal
+                # Update units, unless the project was read without them
+                units_changed = project.units_loaded and self._sync_units(
+                    project_model, project.units if project.is_residential_complex else [], history_rows
+                )
+                old_folder = project_model.folder
+                new_folder = get_project_folder_name(project)
+                if old_folder and new_folder != old_folder and any(old_values[name] != getattr(project, name) for name in FOLDER_FIELDS):
+                    # The folder follows the fields it is named after; renamed before the commit and back if that fails.
+                    # A folder that can't be renamed (e.g. a document in it is open) is kept, the stored path still finds it.
+                    # So is a folder other projects were merged into, their stored paths must keep working.
+                    if self.count_projects_in_folder(old_folder) > 1:
+                        logger.info(f"Kept project folder {old_folder} of project ID {project.id}, other projects use it too.")
+                    else:
+                        try:
+                            project_model.folder = move_project_folder(old_folder, new_folder)
+                        except OSError as e:
+                            logger.warning(f"Kept project folder {old_folder} of project ID {project.id}, renaming it failed: {e}")
+                    if project_model.folder != old_folder:
+                        history_rows.append(history_row('project', project.id, project.id, 'folder', old_folder, project_model.folder))
+                self.session.flush()
+                search_index.reindex_projects(self.session, [project.id])
+                try:
+                    self.session.commit()
+                except Exception:
+                    if old_folder and project_model.folder != old_folder:
+                        try:
+                            move_project_folder(project_model.folder, old_folder)
+                        except OSError as e:
+                            logger.error(f"Failed to rename project folder {project_model.folder} back to {old_folder}: {e}")
+                    raise
+                history_rows[:0] = [
+                    history_row('project', project.id, project.id, name, old_value, getattr(project, name))
+                    for name, old_value in old_values.items() if old_value != getattr(project, name)
+                ]
+                self.history.record(history_rows)
+                logger.info(f"Updated project ID {project.id}: {project.name} ({project.number})" + ("" if units_changed else " without unit changes"))
+                kind = ChangeKind.PROJECT_MOVED if old_status != project.status else ChangeKind.PROJECT_UPDATED
+                self.project_changed.emit(ChangeEvent(kind, project_id=project.id, old_status=old_status, status=project.status))
         except Exception as e:
             logger.error(f"Failed to update project ID {project.id}: {e}")
             self.session.rollback()
             raise
 
+    def _sync_units(self, project_model, units, history_rows):
+        """
+        Brings the stored units of a project in line with the given list, keeping primary keys
+        and is_done of units that still exist. Units are matched by id first, then by name.
+        Appends a history row per change to history_rows and returns True if anything changed.
+        """
+        stored = {unit_model.id: unit_model for unit_model in project_model.units}
+        matches = [None] * len(units)
+        kept = set()
+        # All ids are matched before any name, so a unit renamed to the name of a new unit keeps its row
+        for i, unit in enumerate(units):
+            unit_model = stored.get(unit.id) if unit.id is not None else None
+            if unit_model is not None and unit_model.id not in kept:
+                matches[i] = unit_model
+                kept.add(unit_model.id)
+        unmatched_by_name = {unit_model.name: unit_model for unit_model in project_model.units if unit_model.id not in kept}
+        for i, unit in enumerate(units):
+            if matches[i] is None and unit.name in unmatched_by_name:
+                matches[i] = unmatched_by_name.pop(unit.name)
+                kept.add(matches[i].id)
+        renames = [(unit_model, unit.name) for unit, unit_model in zip(units, matches)
+                   if unit_model is not None and unit_model.name != unit.name]
+        inserts = [unit for unit, unit_model in zip(units, matches) if unit_model is None]
+        deletes = [unit_model for unit_id, unit_model in stored.items() if unit_id not in kept]
+
+        if not (renames or inserts or deletes):
+            return False
+
+        for unit_model in deletes:
+            history_rows.append(history_row('unit', unit_model.id, project_model.id, 'deleted', old_value=unit_model.name))
+            project_model.units.remove(unit_model)
+        if deletes:
+            self.session.flush()
+        if renames:
+            # Move renamed units out of the way first so swapped names don't trip the unique index
+            old_names = {unit_model.id: unit_model.name for unit_model, _ in renames}
+            for unit_model, _ in renames:
+                unit_model.name = f"\0rename-{unit_model.id}"
+            self.session.flush()
+            for unit_model, new_name in renames:
+                history_rows.append(history_row('unit', unit_model.id, project_model.id, 'name', old_names[unit_model.id], new_name))
+                unit_model.name = new_name
+            self.session.flush()
+        taken = [unit_model.folder for unit_model in project_model.units if unit_model.folder]
+        inserted = [
+            UnitModel(name=unit.name, is_done=unit.is_done, folder=folder)
+            for unit, folder in zip(inserts, unit_folder_names(inserts, taken))
+        ]
+        project_model.units.extend(inserted)
+        if inserted:
+            self.session.flush()
+            history_rows.extend(
+                history_row('unit', unit_model.id, project_model.id, 'created', new_value=unit_model.name)
+                for unit_model in inserted
+            )
+        logger.debug(
+            f"Synchronized units for project ID {project_model.id}: "
+            f"{len(inserts)} added, {len(renames)} renamed, {len(deletes)} removed."
+        )
+        return True
+
     def delete_project(self, project_id: int):
         try:
-            project_model = self.session.query(ProjectModel).filter_by(id=project_id).first()
+            project_model = self.session.query(ProjectModel).populate_existing().filter_by(id=project_id).first()
             if project_model:
+                old_status = project_model.status
+                old_name = project_model.name
                 self.session.delete(project_model)
+                search_index.remove_projects(self.session, [project_id])
                 self.session.commit()
+                self.history.record([history_row('project', project_id, project_id, 'deleted', old_value=old_name)])
                 logger.info(f"Deleted project ID {project_id}")
-                self.project_updated.emit()  # Emit signal
+                self.project_changed.emit(ChangeEvent(ChangeKind.PROJECT_DELETED, project_id=project_id, old_status=old_status))
         except Exception as e:
             logger.error(f"Failed to delete project ID {project_id}: {e}")
             self.session.rollback()
             raise
 
-    def load_projects(self, status=None):
+    def load_projects(self, status=None, archived=False):
+        """
+        Loads every project, or those with the given status. With archived, they are read from the archive instead.
+        """
         try:
-            query = self.session.query(ProjectModel)
-            if status is not None:
-                query = query.filter_by(status=status)
-            projects = query.all()
+            with self._reading(archived) as session:
+                if session is None:
+                    return []
+                # One query for the projects and one batched query for all of their units, see tests/test_database.py
+                query = session.query(ProjectModel).populate_existing().options(selectinload(ProjectModel.units))
+                if status is not None:
+                    query = query.filter_by(status=status)
+                projects = [self._to_project(p, archived) for p in query.all()]
+            kind = 'archived projects' if archived else 'projects'
             if status is not None:
-                logger.info(f"Loaded projects with status='{status}'. Count: {len(projects)}")
+                logger.info(f"Loaded {kind} with status='{status}'. Count: {len(projects)}")
             else:
-                logger.info(f"Loaded all projects. Count: {len(projects)}")
-            return [Project(
-                id=p.id,
-                name=p.name,
-                number=p.number,
-                start_date=p.start_date,
-                end_date=p.end_date,
-                status=p.status,
-                is_residential_complex=p.is_residential_complex,
-                number_of_units=p.number_of_units,
-                worker=p.worker,
-                extra=p.extra,
-                main_contractor=p.main_contractor,
-                units=[unit.name for unit in p.units]
-            ) for p in projects]
+                logger.info(f"Loaded all {kind}. Count: {len(projects)}")
+            return projects
         except Exception as e:
             logger.error(f"Failed to load projects: {e}")
             raise
 
+    def load_projects_page(self, status=None, sort_column='id', descending=False, after=None, limit=100,
+                           worker=None, main_contractor=None, start_date_from=None, start_date_to=None,
+                           end_date_from=None, end_date_to=None, archived=False, with_units=True):
+        """
+        Loads one page of projects ordered by sort_column and id. Pass the next_cursor of the
+        previous page as after to continue; the date bounds are inclusive datetime.date values.
+        With archived, the page is read from the archive instead. Without with_units the units
+        are left out (units_loaded is False); load them with load_units when they are needed.
+        """
+        try:
+            if sort_column not in SORT_COLUMNS:
+                raise ValueError(f"Cannot sort projects by '{sort_column}'")
+            sort_expression = SORT_COLUMNS[sort_column]
+            with self._reading(archived) as session:
+                if session is None:
+                    return ProjectPage()
+                query = session.query(ProjectModel).populate_existing().options(
+                    selectinload(ProjectModel.units) if with_units else noload(ProjectModel.units)
+                )
+                if status is not None:
+                    query = query.filter(ProjectModel.status == status)
+                if worker is not None:
+                    query = query.filter(ProjectModel.worker == worker)
+                if main_contractor is not None:
+                    query = query.filter(ProjectModel.main_contractor == main_contractor)
+                if start_date_from is not None:
+                    query = query.filter(ProjectModel.start_date >= start_date_from)
+                if start_date_to is not None:
+                    query = query.filter(ProjectModel.start_date <= start_date_to)
+                if end_date_from is not None:
+                    query = query.filter(ProjectModel.end_date >= end_date_from)
+                if end_date_to is not None:
+                    query = query.filter(ProjectModel.end_date <= end_date_to)
+                if after is not None:
+                    key = tuple_(sort_expression, ProjectModel.id)
+                    query = query.filter(key < tuple_(*after) if descending else key > tuple_(*after))
+                if descending:
+                    query = query.order_by(sort_expression.desc(), ProjectModel.id.desc())
+                else:
+                    query = query.order_by(sort_expression, ProjectModel.id)
+                # One extra row tells whether another page follows
+                rows = query.limit(limit + 1).all()
+                projects = [self._to_project(p, archived, with_units) for p in rows[:limit]]
+            next_cursor = None
+            if len(rows) > limit:
+                last = projects[-1]
+                if sort_column == 'id':
+                    sort_value = last.id
+                elif sort_column == 'end_date':
+                    sort_value = last.end_date or NO_END_DATE
+                elif sort_column in SORT_KEY_COLUMNS:
+                    sort_value = natural_sort_key(getattr(last, sort_column))
+                else:
+                    sort_value = getattr(last, sort_column) or ''
+                if isinstance(sort_value, date):
+                    sort_value = sort_value.isoformat()
+                next_cursor = (sort_value, last.id)
+            logger.info(
+                f"Loaded page of {len(projects)} {'archived ' if archived else ''}projects "
+                f"(status={status}, sort={sort_column}{' desc' if descending else ''})."
+            )
+            return ProjectPage(projects=projects, next_cursor=next_cursor)
+        except Exception as e:
+            logger.error(f"Failed to load projects page: {e}")
+            raise
+
+    def search_project_ids(self, search_text, status=None, limit=50, archived=False):
+        """
+        Full-text search over project name, number, main contractor, extra and unit names.
+        Every word matches as a prefix; returns project ids ranked best first.
+        """
+        try:
+            with self._reading(archived) as session:
+                if session is None:
+                    return []
+                project_ids = search_index.search_project_ids(
+                    session, search_text, status=status, limit=limit, schema=ARCHIVE_SCHEMA if archived else 'main'
+                )
+            logger.info(f"Search for '{search_text}' matched {len(project_ids)} {'archived ' if archived else ''}projects.")
+            return project_ids
+        except Exception as e:
+            logger.error(f"Failed to search projects for '{search_text}': {e}")
+            raise
+
+    def search_projects(self, search_text, status=None, limit=50, archived=False):
+        return self.get_projects_by_ids(
+            self.search_project_ids(search_text, status=status, limit=limit, archived=archived), archived=archived
+        )
+
+    def get_projects_by_ids(self, project_ids, archived=False):
+        """
+        Loads several projects with their units in two queries, in the order of project_ids.
+        """
+        try:
+            if not project_ids:
+                return []
+            with self._reading(archived) as session:
+                if session is None:
+                    return []
+                rows = session.query(ProjectModel).populate_existing().options(selectinload(ProjectModel.units)).filter(
+                    ProjectModel.id.in_(project_ids)
+                ).all()
+                by_id = {p.id: p for p in rows}
+                return [self._to_project(by_id[project_id], archived) for project_id in project_ids if project_id in by_id]
+        except Exception as e:
+            logger.error(f"Failed to retrieve projects {project_ids}: {e}")
+            raise
+
+    def unit_completion_counts(self, status=None, project_ids=None, archived=False):
+        """
+        Returns {project_id: (done, total)} for projects with units, computed in one GROUP BY query.
+        """
+        try:
+            if project_ids is not None and not project_ids:
+                return {}
+            with self._reading(archived) as session:
+                if session is None:
+                    return {}
+                query = session.query(
+                    UnitModel.project_id,
+                    func.sum(case((UnitModel.is_done == True, 1), else_=0)),
+                    func.count(UnitModel.id)
+                )
+                if status is not None:
+                    query = query.join(ProjectModel, ProjectModel.id == UnitModel.project_id).filter(ProjectModel.status == status)
+                if project_ids is not None:
+                    query = query.filter(UnitModel.project_id.in_(project_ids))
+                return {project_id: (int(done or 0), total) for project_id, done, total in query.group_by(UnitModel.project_id)}
+        except Exception as e:
+            logger.error(f"Failed to count completed units: {e}")
+            raise
+
+    def load_units(self, project_ids, archived=False):
+        """
+        Returns {project_id: [Unit, ...]} for the given projects in one query, units in creation order.
+        """
+        try:
+            if not project_ids:
+                return {}
+            with self._reading(archived) as session:
+                if session is None:
+                    return {}
+                rows = session.query(
+                    UnitModel.project_id, UnitModel.id, UnitModel.name, UnitModel.is_done, UnitModel.folder
+                ).filter(UnitModel.project_id.in_(project_ids)).order_by(UnitModel.project_id, UnitModel.id)
+                units = {project_id: [] for project_id in project_ids}
+                for project_id, unit_id, name, is_done, folder in rows:
+                    units[project_id].append(Unit(id=unit_id, name=name, is_done=bool(is_done), folder=folder or ""))
+            logger.debug(f"Loaded units of {len(project_ids)} {'archived ' if archived else ''}projects.")
+            return units
+        except Exception as e:
+            logger.error(f"Failed to load units of projects {project_ids}: {e}")
+            raise
+
+    def count_projects_in_folder(self, folder):
+        """
+        Number of projects stored with the given folder; more than one when projects were merged into one folder.
+        """
+        try:
+            return self.session.query(func.count(ProjectModel.id)).filter(ProjectModel.folder == folder).scalar()
+        except Exception as e:
+            logger.error(f"Failed to count projects in folder {folder}: {e}")
+            raise
+
     def get_project_by_id(self, project_id: int):
         try:
-            p = self.session.query(ProjectModel).filter_by(id=project_id).first()
+            p = self.session.query(ProjectModel).populate_existing().options(selectinload(ProjectModel.units)).filter_by(id=project_id).first()
             if p:
                 logger.info(f"Retrieved project ID {project_id}")
-                return Project(
-                    id=p.id,
-                    name=p.name,
-                    number=p.number,
-                    start_date=p.start_date,
-                    end_date=p.end_date,
-                    status=p.status,
-                    is_residential_complex=p.is_residential_complex,
-                    number_of_units=p.number_of_units,
-                    worker=p.worker,
-                    extra=p.extra,
-                    main_contractor=p.main_contractor,
-                    units=[unit.name for unit in p.units]
-                )
+                return self._to_project(p)
             logger.warning(f"Project ID {project_id} not found.")
             return None
         except Exception as e:
@@ -204,18 +721,69 @@ class Database(QObject):
 
     def toggle_unit_status(self, project_id: int, unit_id: int, is_done: bool):
         try:
-            unit = self.session.query(UnitModel).filter_by(id=unit_id, project_id=project_id).first()
+            unit = self.session.query(UnitModel).populate_existing().filter_by(id=unit_id, project_id=project_id).first()
             if unit:
+                was_done = bool(unit.is_done)
                 unit.is_done = is_done
                 self.session.commit()
                 logger.info(f"Unit ID {unit_id} in Project ID {project_id} marked as {'done' if is_done else 'undone'}.")
-                self.project_updated.emit()  # Emit signal
+                # Views adjust completed counts by one per event, so only real changes are announced
+                if was_done != is_done:
+                    self.history.record([history_row('unit', unit_id, project_id, 'is_done', was_done, is_done)])
+                    self.project_changed.emit(ChangeEvent(ChangeKind.UNIT_TOGGLED, project_id=project_id, unit_id=unit_id, is_done=is_done))
         except Exception as e:
             logger.error(f"Failed to toggle unit status for Unit ID {unit_id} in Project ID {project_id}: {e}")
             self.session.rollback()
             raise
 
+    def project_history(self, project_id: int, limit=200):
+        """
+        Returns the recorded changes of a project and its units, newest first.
+        """
+        try:
+            self.history.flush()
+            rows = self.session.query(HistoryModel).filter(HistoryModel.project_id == project_id).order_by(
+                HistoryModel.id.desc()
+            ).limit(limit).all()
+            return [self._to_history_entry(row) for row in rows]
+        except Exception as e:
+            logger.error(f"Failed to load history for project ID {project_id}: {e}")
+            raise
+
+    def history_since(self, since: str, limit=1000):
+        """
+        Returns changes made at or after since ('YYYY-MM-DD' or 'YYYY-MM-DD HH:MM:SS'), oldest first.
+        """
+        try:
+            self.history.flush()
+            rows = self.session.query(HistoryModel).filter(HistoryModel.timestamp >= since).order_by(
+                HistoryModel.timestamp, HistoryModel.id
+            ).limit(limit).all()
+            return [self._to_history_entry(row) for row in rows]
+        except Exception as e:
+            logger.error(f"Failed to load history since {since}: {e}")
+            raise
+
+    def _to_history_entry(self, row):
+        return HistoryEntry(
+            id=row.id,
+            timestamp=row.timestamp,
+            entity=row.entity,
+            entity_id=row.entity_id,
+            project_id=row.project_id,
+            field_name=row.field,
+            old_value=row.old_value,
+            new_value=row.new_value,
+            worker=row.worker
+        )
+
+    def release_session(self):
+        """
+        Closes the session of the calling thread. Worker threads call this before they exit.
+        """
+        self.Session.remove()
+
     def close(self):
-        self.session.close()
+        self.history.close()
         self.Session.remove()
         logger.info("Database session closed.")
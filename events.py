@@ -0,0 +1,24 @@
+# File: events.py
+from dataclasses import dataclass
+from enum import Enum
+from typing import Optional
+
+class ChangeKind(Enum):
+    PROJECT_ADDED = "project_added"
+    PROJECT_UPDATED = "project_updated"
+    PROJECT_DELETED = "project_deleted"
+    PROJECT_MOVED = "project_moved"
+    UNIT_TOGGLED = "unit_toggled"
+    PROJECTS_RELOADED = "projects_reloaded"  # Bulk changes, subscribers should reload everything
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    """
+    Describes a single change made through Database, emitted with Database.project_changed.
+    """
+    kind: ChangeKind
+    project_id: Optional[int] = None
+    unit_id: Optional[int] = None
+    is_done: Optional[bool] = None  # New state for UNIT_TOGGLED
+    old_status: Optional[str] = None  # Previous status for PROJECT_MOVED
+    status: Optional[str] = None  # Status after the change, None when deleted
@@ -0,0 +1,78 @@
+# File: folders.py
+import os
+from typing import Iterable, List, Optional
+
+from project import Project
+from utils import get_project_dir, get_project_folder_name, sanitize_filename
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+def project_folder(project) -> str:
+    """
+    Path of a project's folder. The folder stored with the project is used as is; projects not saved
+    yet, or read before their folder was stored, fall back to the name made from their fields.
+    """
+    return os.path.join(get_project_dir(), project.folder or get_project_folder_name(project))
+
+def unit_folder_name(unit) -> str:
+    """
+    Folder of a unit relative to its project folder.
+    """
+    return unit.folder or sanitize_filename(unit.name)
+
+def unit_folder(project, unit) -> str:
+    return os.path.join(project_folder(project), unit_folder_name(unit))
+
+def unit_folder_names(units, taken: Iterable[str] = ()) -> List[str]:
+    """
+    The folder of each unit: its stored folder, or its sanitized name, numbered when another unit of the
+    project already uses that folder (names such as 'A/1' and 'A1' sanitize alike). taken are the
+    folders of the project's other units.
+    """
+    used = {folder.casefold() for folder in taken}
+    folders = []
+    for unit in units:
+        folder = unit.folder
+        if not folder:
+            base = sanitize_filename(unit.name) or "Unit"
+            folder, suffix = base, 2
+            while folder.casefold() in used:
+                folder, suffix = f"{base}-{suffix}", suffix + 1
+        used.add(folder.casefold())
+        folders.append(folder)
+    return folders
+
+def move_project_folder(old: str, new: str) -> str:
+    """
+    Renames a project folder, given relative to the project directory, with one os.rename so it is
+    never half moved. Returns the folder the project should store: new once moved or if old doesn't
+    exist, old if another folder already has the new name.
+    """
+    source = os.path.join(get_project_dir(), old)
+    target = os.path.join(get_project_dir(), new)
+    if not os.path.isdir(source):
+        return new
+    # On a case-insensitive file system a change of case finds the folder itself at the target
+    if os.path.exists(target) and not os.path.samefile(source, target):
+        logger.warning(f"Kept project folder {source}, {target} already exists.")
+        return old
+    os.rename(source, target)
+    logger.info(f"Renamed project folder {source} to {target}")
+    return new
+
+def match_project_folder(name, number, main_contractor, existing) -> Optional[str]:
+    """
+    Finds the folder of a project stored before folders were, among the names of the folders in the
+    project directory (existing, by casefolded name): the name made from its current fields, else the
+    one folder made from its name and number with any or no main contractor. None if there is no match.
+    """
+    fields = Project(name=name, number=number, main_contractor=main_contractor)
+    folder = existing.get(get_project_folder_name(fields).casefold())
+    if folder is not None:
+        return folder
+    # The main contractor was added or changed after the folder was made
+    fields.main_contractor = None
+    suffix = get_project_folder_name(fields).casefold()
+    candidates = [folder for key, folder in existing.items() if key == suffix or key.endswith(f" - {suffix}")]
+    return candidates[0] if len(candidates) == 1 else None
@@ -2,30 +2,31 @@
 
 from PyQt5.QtWidgets import (
     QDialog, QVBoxLayout, QFormLayout, QLineEdit, QDateEdit,
-    QComboBox, QCheckBox, QSpinBox, QPushButton, QMessageBox, QHBoxLayout, QWidget
+    QComboBox, QCheckBox, QSpinBox, QPushButton, QMessageBox, QHBoxLayout, QProgressDialog
 )
-from PyQt5.QtCore import Qt, QDate
+from PyQt5.QtCore import Qt, QDate, pyqtSignal
 from gui.base_projects_tab import BaseProjectsTab
-from project import Project
+from gui.widgets.unit_names_editor import UnitNamesEditor
+from gui.presence_index import get_presence_index
+from project import Project, Unit
+from scaffold import ScaffoldCancelled, plan_project_folder, build_staging, commit_staging, discard_staging
 from utils import (
-    sanitize_filename,
-    get_template_dir,
     check_template_files,
     open_docx_file,
-    get_project_dir,
     load_main_contractors,
-    add_main_contractor,
-    get_project_folder_name
+    add_main_contractor
 )
 from logger import get_logger
-import os
-import shutil
+import threading
 from datetime import datetime
 from controllers.project_controller import ProjectController
 
 logger = get_logger(__name__)
 
 class AddProjectDialog(QDialog):
+    scaffold_progress = pyqtSignal(int, int)  # (operations done, total)
+    scaffold_finished = pyqtSignal(object, object)  # (staging folder, error)
+
     def __init__(self, db):
         super().__init__()
         self.db = db
@@ -80,7 +81,7 @@ class AddProjectDialog(QDialog):
         self.units_input = QSpinBox()
         self.units_input.setRange(1, 1000)
         self.units_input.setEnabled(False)
-        self.units_input.valueChanged.connect(self.generate_unit_name_fields)
+        self.units_input.valueChanged.connect(self.resize_unit_names)
         self.form_layout.addRow("Number of Units:", self.units_input)
 
         # Extra Field
@@ -100,15 +101,12 @@ class AddProjectDialog(QDialog):
         self.main_contractor_input.lineEdit().setPlaceholderText("Select or enter Main Contractor")
         self.form_layout.addRow("Main Contractor:", self.main_contractor_input)
 
-        # Unit Names Layout
-        self.unit_names_widget = QWidget()
-        self.unit_names_layout = QVBoxLayout()
-        self.unit_names_widget.setLayout(self.unit_names_layout)
+        # Unit Names, one table for any number of units
+        self.unit_names_widget = UnitNamesEditor(max_units=self.units_input.maximum())
+        self.unit_names_widget.count_changed.connect(self.units_input.setValue)
         self.unit_names_widget.setVisible(False)
         self.form_layout.addRow("Unit Names:", self.unit_names_widget)
 
-        self.unit_line_edits = []
-
         self.layout.addLayout(self.form_layout)
 
         # Buttons Layout
@@ -121,35 +119,26 @@ class AddProjectDialog(QDialog):
         self.button_layout.addWidget(self.cancel_btn)
         self.layout.addLayout(self.button_layout)
 
+        self.scaffold_progress.connect(self.on_scaffold_progress)
+        self.scaffold_finished.connect(self.on_scaffold_finished)
+        self.cancel_event = None  # Set while project folders are being built
+        self.closing = False  # The dialog was closed while folders were built and closes once they are cleaned up
+
     def toggle_units(self, state):
         is_checked = state == Qt.Checked
         self.units_input.setEnabled(is_checked)
         self.unit_names_widget.setVisible(is_checked)
-        if not is_checked:
-            # Clear unit names fields
-            for i in reversed(range(self.unit_names_layout.count())):
-                widget_to_remove = self.unit_names_layout.itemAt(i).widget()
-                if widget_to_remove is not None:
-                    widget_to_remove.setParent(None)
-            self.unit_line_edits = []
+        # Clear unit names when unchecked
+        self.unit_names_widget.set_count(self.units_input.value() if is_checked else 0)
 
     def toggle_main_contractor(self, state):
         is_checked = state == Qt.Checked
         self.main_contractor_input.setEnabled(is_checked)
 
-    def generate_unit_name_fields(self, value):
-        # Clear existing fields
-        for i in reversed(range(self.unit_names_layout.count())):
-            widget_to_remove = self.unit_names_layout.itemAt(i).widget()
-            if widget_to_remove is not None:
-                widget_to_remove.setParent(None)
-        # Generate new fields
-        self.unit_line_edits = []
-        for i in range(1, value + 1):
-            line_edit = QLineEdit()
-            line_edit.setText(str(i))
-            self.unit_names_layout.addWidget(line_edit)
-            self.unit_line_edits.append(line_edit)
+    def resize_unit_names(self, value):
+        # Adds or removes rows at the end, names already entered are kept
+        if self.residential_checkbox.isChecked():
+            self.unit_names_widget.set_count(value)
 
     def save_project(self):
         # Gather data from input fields
@@ -162,10 +151,7 @@ class AddProjectDialog(QDialog):
         is_residential = self.residential_checkbox.isChecked()
         units = []
         if is_residential:
-            for line_edit in self.unit_line_edits:
-                unit_name = line_edit.text().strip()
-                if unit_name:
-                    units.append(unit_name)
+            units = [unit_name for unit_name in self.unit_names_widget.unit_names() if unit_name]
         extra = self.extra_input.text().strip()
 
         # Main Contractor
@@ -183,7 +169,7 @@ class AddProjectDialog(QDialog):
             if len(units) != self.units_input.value():
                 QMessageBox.warning(self, "Validation Error", "Number of unit names does not match the number of units specified.")
                 return
-            if len(units) != len(set(units)):
+            if self.unit_names_widget.model.has_duplicates():
                 QMessageBox.warning(self, "Validation Error", "Unit names must be unique.")
                 return
 
@@ -212,7 +198,7 @@ class AddProjectDialog(QDialog):
         project = Project(
             name=name,
             number=number,
-            start_date=start_date.strftime("%Y-%m-%d"),
+            start_date=start_date,
             end_date=None,
             status=status,
             is_residential_complex=is_residential,
@@ -220,102 +206,106 @@ class AddProjectDialog(QDialog):
             worker=worker,
             extra=extra,
             main_contractor=main_contractor,
-            units=units
+            units=[Unit(name=unit_name) for unit_name in units]
+        )
+
+        # Check for Template directory and required files before anything is created
+        valid, message = check_template_files()
+        if not valid:
+            QMessageBox.critical(self, "Template Error", message)
+            logger.error(f"Template check failed: {message}")
+            return
+
+        # Build the folder tree in the background; the project is saved once it is complete
+        self.pending_project = project
+        self.scaffold_plan = plan_project_folder(project)
+        self.cancel_event = threading.Event()
+        self.save_btn.setEnabled(False)
+        self.progress_dialog = QProgressDialog(
+            "Creating project folders...", "Cancel", 0, self.scaffold_plan.operations, self
         )
+        self.progress_dialog.setWindowTitle("Add New Project")
+        self.progress_dialog.setWindowModality(Qt.WindowModal)
+        self.progress_dialog.setMinimumDuration(500)
+        self.progress_dialog.canceled.connect(self.cancel_event.set)
+        threading.Thread(target=self.build_folders, name="scaffold", daemon=True).start()
+
+    def reject(self):
+        # Closing while folders are built cancels them; the scaffold thread cleans up and reports back first
+        if self.cancel_event is not None:
+            self.closing = True
+            self.cancel_event.set()
+            return
+        super().reject()
+
+    def build_folders(self):
+        # Runs on the scaffold thread, results go back to the GUI thread through the signals
+        try:
+            staging = build_staging(
+                self.scaffold_plan,
+                progress=self.scaffold_progress.emit,
+                cancel_event=self.cancel_event
+            )
+        except BaseException as e:
+            self.scaffold_finished.emit(None, e)
+        else:
+            self.scaffold_finished.emit(staging, None)
+
+    def on_scaffold_progress(self, done, total):
+        if not self.progress_dialog.wasCanceled():
+            self.progress_dialog.setValue(done)
+
+    def on_scaffold_finished(self, staging, error):
+        """
+        Saves the project once its folders are staged and then moves them into place. If that fails,
+        the project is deleted again, so a project is never left without its folder.
+        """
+        self.progress_dialog.reset()
+        self.save_btn.setEnabled(True)
+        self.cancel_event = None
+        project = self.pending_project
+        if self.closing:
+            # The folders may have been finished just before the cancel was seen
+            if staging is not None:
+                discard_staging(staging)
+            logger.info(f"Creating project '{project.name}' was cancelled; nothing was saved.")
+            super().reject()
+            return
+        if isinstance(error, ScaffoldCancelled):
+            logger.info(f"Creating project '{project.name}' was cancelled; nothing was saved.")
+            return
+        if error is not None:
+            QMessageBox.critical(self, "Error", f"Failed to create project folders, nothing was saved:\n{str(error)}")
+            logger.error(f"Failed to create folders for project '{project.name}': {error}")
+            return
 
         # Add project using ProjectController
         try:
             project_id = self.controller.add_project(project)
-            logger.info(f"Project '{project.name}' with ID {project_id} added successfully. Residential Complex: {is_residential}")
+            logger.info(f"Project '{project.name}' with ID {project_id} added successfully. Residential Complex: {project.is_residential_complex}")
         except Exception as e:
+            discard_staging(staging)
             QMessageBox.critical(self, "Database Error", f"Failed to add project: {str(e)}")
             logger.error(f"Failed to add project '{project.name}': {e}")
             return
 
-        # Create Project Folder
-        folder_name = get_project_folder_name(project)
-        project_folder = os.path.join(get_project_dir(), folder_name)
         try:
-            os.makedirs(project_folder, exist_ok=True)
-            logger.info(f"Created project folder at {project_folder}")
+            merged = commit_staging(self.scaffold_plan, staging)
+            get_presence_index().invalidate(self.scaffold_plan.folder)
+            logger.info(
+                f"{'Merged into' if merged else 'Created'} project folder at {self.scaffold_plan.folder} "
+                f"({len(self.scaffold_plan.directories)} folders, {len(self.scaffold_plan.documents)} documents)"
+            )
         except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to create project folder:\n{str(e)}")
-            logger.error(f"Failed to create project folder at {project_folder}: {e}")
-            return
-
-        # Create "Floor plan" or "Master" subfolder based on residential attribute
-        if is_residential:
-            master_folder = os.path.join(project_folder, "Master")
+            discard_staging(staging)
             try:
-                os.makedirs(master_folder, exist_ok=True)
-                logger.info(f"Created 'Master' folder at {master_folder}")
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Failed to create 'Master' folder:\n{str(e)}")
-                logger.error(f"Failed to create 'Master' folder at {master_folder}: {e}")
-                return
-        else:
-            floor_plan_folder = os.path.join(project_folder, "Floor plan")
-            try:
-                os.makedirs(floor_plan_folder, exist_ok=True)
-                logger.info(f"Created 'Floor plan' folder at {floor_plan_folder}")
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Failed to create 'Floor plan' folder:\n{str(e)}")
-                logger.error(f"Failed to create 'Floor plan' folder at {floor_plan_folder}: {e}")
-                return
-
-        # Check for Template directory and required files
-        valid, message = check_template_files()
-        if not valid:
-            QMessageBox.critical(self, "Template Error", message)
-            logger.error(f"Template check failed: {message}")
+                self.controller.delete_project(project_id)
+                logger.info(f"Rolled back project ID {project_id} after its folder could not be created.")
+            except Exception as rollback_error:
+                logger.error(f"Failed to roll back project ID {project_id}: {rollback_error}")
+            QMessageBox.critical(self, "Error", f"Failed to create project folder, the project was not saved:\n{str(e)}")
+            logger.error(f"Failed to move project folder into place at {self.scaffold_plan.folder}: {e}")
             return
 
-        # Define Template directory path
-        template_dir = get_template_dir()
-
-        # Copy the required template files into the project folder if not residential complex
-        if not is_residential:
-            try:
-                required_files = ["Innregulering.docx", "Sjekkliste.docx"]
-                for file in required_files:
-                    shutil.copy(os.path.join(template_dir, file), project_folder)
-                logger.info(f"Copied templates to {project_folder}")
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Failed to copy template files:\n{str(e)}")
-                logger.error(f"Failed to copy templates to {project_folder}: {e}")
-                return
-
-        # Create subfolders for each unit with their own DOCX files
-        if is_residential and units:
-            for unit in units:
-                unit_folder = os.path.join(project_folder, sanitize_filename(unit))
-                try:
-                    os.makedirs(unit_folder, exist_ok=True)
-                    logger.info(f"Created unit folder at {unit_folder}")
-                except Exception as e:
-                    QMessageBox.critical(self, "Error", f"Failed to create unit folder '{unit}':\n{str(e)}")
-                    logger.error(f"Failed to create unit folder '{unit}' at {unit_folder}: {e}")
-                    return
-                # Create "Floor plan" subfolder inside unit folder
-                floor_plan_subfolder = os.path.join(unit_folder, "Floor plan")
-                try:
-                    os.makedirs(floor_plan_subfolder, exist_ok=True)
-                    logger.info(f"Created 'Floor plan' subfolder at {floor_plan_subfolder}")
-                except Exception as e:
-                    QMessageBox.critical(self, "Error", f"Failed to create 'Floor plan' subfolder for unit '{unit}':\n{str(e)}")
-                    logger.error(f"Failed to create 'Floor plan' subfolder for unit '{unit}' at {floor_plan_subfolder}: {e}")
-                    return
-                # Create DOCX files for the unit using templates
-                try:
-                    innregulering_path = os.path.join(unit_folder, "Innregulering.docx")
-                    sjekkliste_path = os.path.join(unit_folder, "Sjekkliste.docx")
-                    shutil.copy(os.path.join(template_dir, "Innregulering.docx"), innregulering_path)
-                    shutil.copy(os.path.join(template_dir, "Sjekkliste.docx"), sjekkliste_path)
-                    logger.info(f"Copied Innregulering and Sjekkliste DOCX to {unit_folder}")
-                except Exception as e:
-                    QMessageBox.critical(self, "Error", f"Failed to copy DOCX files for unit '{unit}':\n{str(e)}")
-                    logger.error(f"Failed to copy DOCX files for unit '{unit}' in folder '{unit_folder}': {e}")
-                    return
-
         logger.info(f"Project added successfully: {project.name} ({project.number})")
         self.accept()
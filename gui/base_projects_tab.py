@@ -1,12 +1,11 @@
 # File: gui/base_projects_tab.py
 
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QTreeWidget, QTreeWidgetItem,
-    QHBoxLayout, QMessageBox, QCheckBox, QPushButton, QFileDialog, QMenu, QAction
+    QWidget, QVBoxLayout, QTreeView, QHBoxLayout, QMessageBox, QFileDialog, QMenu, QAction, QLineEdit, QLabel
 )
-from PyQt5.QtGui import QColor
-from PyQt5.QtCore import Qt, QPoint
+from PyQt5.QtCore import Qt, QPoint, QTimer
 from datetime import datetime
+from configparser import ConfigParser
 import os
 import sys
 import shutil
@@ -14,34 +13,68 @@ import tempfile
 
 from logger import get_logger
 from utils import (
-    sanitize_filename, get_project_dir, get_template_dir, get_project_folder_name, open_docx_file
+    sanitize_filename, get_template_dir, open_docx_file
 )
+from folders import project_folder, unit_folder, unit_folder_name
+from template_store import ensure_document, document_source
 from gui.widgets.buttons import SplitButton
+from gui.widgets.delegates import ButtonDelegate
+from gui.refresh_scheduler import get_refresh_scheduler
+from gui.presence_index import MISSING
+from gui.project_tree_model import (
+    ProjectTreeModel, ProjectFilterProxyModel, DATABASE_SORT_COLUMNS, ID_ROLE, ARCHIVED_ROLE, PROJECT_ROLE, UNIT_ROLE,
+    PRESENCE_ROLE, INNREGULERING_COLUMN, SJEKKLISTE_COLUMN, FLOOR_PLAN_COLUMN, MOVE_1_COLUMN, MOVE_2_COLUMN
+)
 from gui.event_handlers import (
     handle_project_delete, handle_toggle_unit_status, handle_move_project,
     handle_import_floor_plan, handle_import_master_floor_plan
 )
 from controllers.project_controller import ProjectController
-from docx import Document
-from docx.enum.section import WD_ORIENT
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.shared import Inches
-from database import UnitModel  # Removed ProjectModel import since we're using the controller
+from events import ChangeKind
 
 logger = get_logger(__name__)
 
+# Load configuration
+config = ConfigParser()
+config.read('config.ini')
+
+view_config = config['View'] if config.has_section('View') else {}
+# Projects fetched per page, and how close to the bottom (in scroll steps) the next page is requested
+PAGE_SIZE = int(view_config.get('page_size', 100))
+FETCH_THRESHOLD = int(view_config.get('fetch_threshold', 5))
+SEARCH_DELAY_MS = int(view_config.get('search_delay_ms', 200))
+SEARCH_LIMIT = int(view_config.get('search_limit', 200))
+# Which residential complexes start expanded: 'all', 'none', or 'small' for those with at most expand_max_units units
+EXPAND_UNITS = view_config.get('expand_units', 'small')
+EXPAND_MAX_UNITS = int(view_config.get('expand_max_units', 25))
+
 class BaseProjectsTab(QWidget):
-    def __init__(self, db, status_filter=None, title=""):
+    def __init__(self, db, status_filter=None, title="", model=None):
         super().__init__()
         self.db = db
         self.controller = ProjectController(self.db)
         self.status_filter = status_filter
         self.title = title
+        # Tabs of the main window share one model; a tab on its own gets a private one
+        self.model = model if model is not None else ProjectTreeModel(self.controller, self)
+        self.sort_column = 'id'
+        self.sort_descending = False
+        self.next_cursor = None
+        # Tabs that can show Finished projects continue into the archive once the main database runs out
+        self.include_archive = status_filter in (None, "Finished")
+        self.reading_archive = False
+        self.more_pages = True
+        self.load_generation = 0  # Bumped on every reload so results of older requests are dropped
+        self.page_request_pending = False
+        self.pending_requests = 0
+        self.pending_expansion = []  # Project IDs of rows inserted since the last expand_new_rows
         self.template_dir = get_template_dir()
+        self.scheduler = get_refresh_scheduler()
         self.layout = QVBoxLayout()
         self.setLayout(self.layout)
         self.setup_ui()
-        self.load_projects()
+        # Loads once the tab is shown
+        self.scheduler.request(self)
 
     def setup_ui(self):
         # Buttons Layout
@@ -58,220 +91,324 @@ class BaseProjectsTab(QWidget):
         )
         self.buttons_layout.addWidget(self.view_docx_split_btn)
 
+        # Search Box, searches as you type after a short pause
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search name, number, contractor, extra or unit...")
+        self.search_input.setClearButtonEnabled(True)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self.apply_search)
+        self.search_input.textChanged.connect(self.search_timer.start)
+        self.buttons_layout.addWidget(self.search_input)
+
+        # Shown while background requests for this tab are running
+        self.loading_label = QLabel("Loading...")
+        self.loading_label.setVisible(False)
+        self.buttons_layout.addWidget(self.loading_label)
+
         self.layout.addLayout(self.buttons_layout)
 
-        # Projects Tree
-        self.tree = QTreeWidget()
-        self.tree.setHeaderLabels([
-            "Project Name",
-            "Project Number",
-            "Main Contractor",
-            "Completed Units",
-            "Status",
-            "Extra",
-            "Innregulering",
-            "Sjekkliste",
-            "Floor Plan(s)",
-            "Move(1)",
-            "Move(2)",
-            "Start Date",
-            "End Date",
-            "Worker"
-        ])
-        self.tree.setColumnCount(14)
+        # This tab's rows of the project model
+        self.proxy = ProjectFilterProxyModel(self.status_filter, self)
+        self.proxy.setSourceModel(self.model)
+        self.proxy.sort(-1)
+        self.proxy.unit_check_changed.connect(
+            lambda project, unit, state: handle_toggle_unit_status(self.controller, project, unit, state, self)
+        )
+        self.proxy.rowsInserted.connect(self.on_rows_inserted)
+        # The shared model is cleared when everything is reloaded, then every tab starts over
+        self.proxy.modelReset.connect(self.on_model_reset)
+
+        # Projects Tree, buttons and checkboxes are painted by the delegate instead of being widgets per row
+        self.tree = QTreeView()
+        self.tree.setModel(self.proxy)
+        self.tree.setUniformRowHeights(True)
+        self.button_delegate = ButtonDelegate(self.tree)
+        self.button_delegate.clicked.connect(self.on_button_clicked)
+        self.button_delegate.menu_requested.connect(self.on_button_menu_requested)
+        self.tree.setItemDelegate(self.button_delegate)
+        # Clicking a header sorts in the proxy; no column is chosen at first, so rows keep the default order
+        header = self.tree.header()
+        header.setSortIndicator(-1, Qt.AscendingOrder)
+        self.tree.setSortingEnabled(True)
+        header.sortIndicatorChanged.connect(self.on_sort_changed)
+        header.setContextMenuPolicy(Qt.CustomContextMenu)
+        header.customContextMenuRequested.connect(self.open_header_menu)
         self.tree.setContextMenuPolicy(Qt.CustomContextMenu)
         self.tree.customContextMenuRequested.connect(self.open_context_menu)
+        self.tree.verticalScrollBar().valueChanged.connect(self.fetch_more_if_needed)
         self.layout.addWidget(self.tree)
 
         # Temporary DOCX path
         self.docx_path = os.path.join(tempfile.gettempdir(), f"{sanitize_filename(self.title)}_Projects.docx")
 
     def load_projects(self):
-        self.tree.clear()
-        projects = self.controller.load_projects(status=self.status_filter)
-        logger.info(f"Loading {len(projects)} projects into the '{self.title}' tab.")
-        for project in projects:
-            project_item = QTreeWidgetItem([
-                project.name,
-                project.number,
-                project.main_contractor if project.main_contractor else "",
-                "",
-                project.status,
-                project.extra if project.extra else "",
-                "",
-                "",
-                "",
-                "",
-                "",
-                self.format_date(project.start_date),
-                self.format_date(project.end_date) if project.end_date else "",
-                project.worker
-            ])
-            project_item.setData(0, Qt.UserRole, project.id)
-            self.tree.addTopLevelItem(project_item)
-            if project.is_residential_complex and project.units:
-                # Calculate completed units
-                completed = sum(1 for unit in project.units if self.get_unit_status(project.id, unit))
-                total = len(project.units)
-                project_item.setText(3, f"{completed}/{total}")
-
-                for unit_name in project.units:
-                    unit_item = QTreeWidgetItem([
-                        unit_name,
-                        "",
-                        "",
-                        "",
-                        "",
-                        "",
-                        "",
-                        "",
-                        "",
-                        "",
-                        "",
-                        "",
-                        "",
-                        ""
-                    ])
-                    # Add a checkbox for done/undone
-                    checkbox = QCheckBox()
-                    # Retrieve the unit's current status
-                    is_done = self.get_unit_status(project.id, unit_name)
-                    checkbox.setChecked(is_done)
-                    # Connect the checkbox state change to the event handler
-                    checkbox.stateChanged.connect(
-                        lambda state, p=project, u=unit_name: handle_toggle_unit_status(self.controller, p, u, state, self)
-                    )
-                    self.tree.setItemWidget(unit_item, 0, checkbox)
-                    project_item.addChild(unit_item)
-
-                    # Innregulering Split Button for Unit
-                    innregulering_split_btn = SplitButton(
-                        text="View",
-                        tooltip="View Innregulering DOCX",
-                        default_action=lambda checked=False, p=project, u=unit_name: self.view_docx(p, "Innregulering", u),
-                        menu_actions=[
-                            ("Save As...", lambda checked=False, p=project, u=unit_name: self.save_docx_as(p, "Innregulering", u))
-                        ]
-                    )
-                    self.tree.setItemWidget(unit_item, 6, innregulering_split_btn)
-
-                    # Sjekkliste Split Button for Unit
-                    sjekkliste_split_btn = SplitButton(
-                        text="View",
-                        tooltip="View Sjekkliste DOCX",
-                        default_action=lambda checked=False, p=project, u=unit_name: self.view_docx(p, "Sjekkliste", u),
-                        menu_actions=[
-                            ("Save As...", lambda checked=False, p=project, u=unit_name: self.save_docx_as(p, "Sjekkliste", u))
-                        ]
-                    )
-                    self.tree.setItemWidget(unit_item, 7, sjekkliste_split_btn)
-
-                    # Floor Plan(s) Split Button for Unit
-                    floor_plan_split_btn = SplitButton(
-                        text="View",
-                        tooltip="View Floor Plan(s)",
-                        default_action=lambda checked=False, p=project, u=unit_name: self.view_floor_plan(p, u),
-                        menu_actions=[
-                            ("Import PDF", lambda checked=False, p=project, u=unit_name: handle_import_floor_plan(p, u, self)),
-                            ("Save As...", lambda checked=False, p=project, u=unit_name: self.save_floor_plan_as(p, u))
-                        ]
-                    )
-                    self.tree.setItemWidget(unit_item, 8, floor_plan_split_btn)
-
-                # Add Master Split Button for Residential Projects in "Floor Plan(s)" column
-                master_split_btn = SplitButton(
-                    text="Master",
-                    tooltip="Manage Master Floor Plan",
-                    default_action=lambda checked=False, p=project: self.view_master_floor_plan(p),
-                    menu_actions=[
-                        ("Import PDF", lambda checked=False, p=project: handle_import_master_floor_plan(p, self)),
-                        ("Save As...", lambda checked=False, p=project: self.save_master_floor_plan_as(p))
-                    ]
-                )
-                self.tree.setItemWidget(project_item, 8, master_split_btn)
-
-                # Expand the project item to show unit names by default
-                self.tree.expandItem(project_item)
+        """
+        Reloads every project from the database. This clears the shared model, so all tabs start over.
+        """
+        self.model.clear()
+
+    def on_model_reset(self):
+        # Results of requests made before the reset are dropped right away, loading again waits for the scheduler
+        self.load_generation += 1
+        self.page_request_pending = False
+        self.scheduler.request(self)
+
+    def refresh(self):
+        """
+        Called by the refresh scheduler, at most once per event-loop tick and only while the tab is visible.
+        """
+        self.restart_loading()
+
+    def restart_loading(self):
+        """
+        Starts this tab's paging, or its search, from the beginning. Rows that are already in the
+        shared model stay and are shown as soon as they pass this tab's filter.
+        """
+        self.load_generation += 1
+        self.next_cursor = None
+        self.reading_archive = False
+        self.more_pages = True
+        self.page_request_pending = False
+        if self.search_input.text().strip():
+            self.show_search_results(self.search_input.text())
+        else:
+            self.proxy.set_search_results(None)
+            self.fetch_next_page(first_page=True)
+
+    def apply_search(self):
+        self.restart_loading()
+
+    def begin_request(self):
+        """
+        Marks a background request as started and returns the generation its result belongs to.
+        """
+        self.pending_requests += 1
+        self.loading_label.setVisible(True)
+        return self.load_generation
+
+    def end_request(self, generation):
+        """
+        Marks a background request as finished. Returns False if the tab was reloaded in the meantime.
+        """
+        self.pending_requests -= 1
+        self.loading_label.setVisible(self.pending_requests > 0)
+        return generation == self.load_generation
+
+    def show_search_results(self, search_text):
+        generation = self.begin_request()
+        self.controller.search_async(
+            search_text,
+            on_done=lambda result: self.on_search_results(generation, search_text, *result),
+            on_error=lambda e: self.end_request(generation),
+            status=self.status_filter,
+            limit=SEARCH_LIMIT,
+            include_archive=self.include_archive
+        )
+
+    def on_search_results(self, generation, search_text, projects, counts):
+        if not self.end_request(generation):
+            return
+        logger.info(f"Showing {len(projects)} search results for '{search_text}' in the '{self.title}' tab.")
+        self.model.append_projects(projects, counts)
+        self.proxy.set_search_results([project.id for project in projects])
+
+    def fetch_next_page(self, first_page=False):
+        """
+        Requests the next page of projects in the background. Called on load and when the user scrolls near the bottom.
+        """
+        if self.page_request_pending or (not first_page and not self.has_more_pages()):
+            return
+        self.page_request_pending = True
+        generation = self.begin_request()
+        self.controller.load_projects_page_async(
+            on_done=lambda result: self.on_page_loaded(generation, *result),
+            on_error=lambda e: self.on_page_failed(generation),
+            status=self.status_filter,
+            sort_column=self.sort_column,
+            descending=self.sort_descending,
+            after=self.next_cursor,
+            limit=PAGE_SIZE,
+            archived=self.reading_archive,
+            with_units=False
+        )
+
+    def has_more_pages(self):
+        return self.more_pages
+
+    def on_page_loaded(self, generation, page, counts):
+        """
+        Adds a loaded page to the shared model, unless the tab was reloaded since it was requested.
+        """
+        if not self.end_request(generation):
+            return
+        self.page_request_pending = False
+        self.next_cursor = page.next_cursor
+        if self.next_cursor is None:
+            if self.include_archive and not self.reading_archive:
+                # The main database is exhausted, the next page comes from the start of the archive
+                self.reading_archive = True
             else:
-                # Innregulering Split Button
-                innregulering_split_btn = SplitButton(
-                    text="View",
-                    tooltip="View Innregulering DOCX",
-                    default_action=lambda checked=False, p=project: self.view_docx(p, "Innregulering"),
-                    menu_actions=[
-                        ("Save As...", lambda checked=False, p=project: self.save_docx_as(p, "Innregulering"))
-                    ]
-                )
-                self.tree.setItemWidget(project_item, 6, innregulering_split_btn)
-
-                # Sjekkliste Split Button
-                sjekkliste_split_btn = SplitButton(
-                    text="View",
-                    tooltip="View Sjekkliste DOCX",
-                    default_action=lambda checked=False, p=project: self.view_docx(p, "Sjekkliste"),
-                    menu_actions=[
-                        ("Save As...", lambda checked=False, p=project: self.save_docx_as(p, "Sjekkliste"))
-                    ]
-                )
-                self.tree.setItemWidget(project_item, 7, sjekkliste_split_btn)
-
-                # Floor Plan(s) Split Button for Project
-                floor_plan_split_btn = SplitButton(
-                    text="View",
-                    tooltip="View Floor Plan(s)",
-                    default_action=lambda checked=False, p=project: self.view_floor_plan(p),
-                    menu_actions=[
-                        ("Import PDF", lambda checked=False, p=project: handle_import_floor_plan(p, None, self)),
-                        ("Save As...", lambda checked=False, p=project: self.save_floor_plan_as(p))
-                    ]
-                )
-                self.tree.setItemWidget(project_item, 8, floor_plan_split_btn)
-
-                # Move(1) Button
-                move1_btn = QPushButton("Active")
-                move1_btn.setToolTip("Move Project to Active")
-                move1_btn.setStyleSheet("background-color: yellow")
-                move1_btn.clicked.connect(lambda checked=False, p=project: handle_move_project(self.controller, p, "Active", self))
-                self.tree.setItemWidget(project_item, 9, move1_btn)
-
-                # Move(2) Button
-                move2_btn = QPushButton("Completed")
-                move2_btn.setToolTip("Move Project to Completed")
-                move2_btn.setStyleSheet("background-color: green")
-                move2_btn.clicked.connect(lambda checked=False, p=project: handle_move_project(self.controller, p, "Completed", self))
-                self.tree.setItemWidget(project_item, 10, move2_btn)
-
-                if not project.is_residential_complex:
-                    # Set Completed Units to N/A
-                    project_item.setText(3, "N/A")
-
-                logger.debug(f"Added project '{project.name}' with status '{project.status}' to the tree.")
-
-    def get_unit_status(self, project_id, unit_name):
+                self.more_pages = False
+        logger.info(f"Loading {len(page.projects)} projects into the '{self.title}' tab.")
+        # Rows loaded by other tabs or added through change events are skipped
+        self.model.append_projects(page.projects, counts)
+        logger.debug(f"Project cache after loading the '{self.title}' tab: {self.controller.cache_stats()}")
+        if self.has_more_pages() and self.tree.isVisible():
+            # Keep going until the viewport is filled, otherwise there is nothing to scroll
+            QTimer.singleShot(0, self.fetch_more_if_needed)
+
+    def on_page_failed(self, generation):
+        if self.end_request(generation):
+            self.page_request_pending = False
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.scheduler.activate(self)
+        QTimer.singleShot(0, self.fetch_more_if_needed)
+
+    def fetch_more_if_needed(self, *args):
+        scroll_bar = self.tree.verticalScrollBar()
+        if self.has_more_pages() and scroll_bar.value() >= scroll_bar.maximum() - FETCH_THRESHOLD:
+            self.fetch_next_page()
+
+    def on_project_changed(self, event):
+        """
+        The shared model patches the rows; search results are searched again, since whether a
+        changed project still matches is only known to the index.
+        """
+        if event.kind in (ChangeKind.PROJECT_ADDED, ChangeKind.PROJECT_UPDATED, ChangeKind.PROJECT_MOVED) \
+                and self.search_input.text().strip():
+            self.scheduler.request(self)
+
+    def on_sort_changed(self, column, order):
         """
-        Helper method to get the status of a unit.
+        The proxy has already re-sorted the loaded rows. Later pages are read in the same order where the
+        database can sort by the column, and if pages are still missing, paging starts over so that the
+        rows at the top are the first ones in the new order. The sort stays when the tab is refreshed.
         """
-        unit = self.controller.db.session.query(UnitModel).filter_by(project_id=project_id, name=unit_name).first()
-        return unit.is_done if unit else False
+        sort_column = DATABASE_SORT_COLUMNS.get(column, 'id')
+        descending = order == Qt.DescendingOrder and column in DATABASE_SORT_COLUMNS
+        if (sort_column, descending) == (self.sort_column, self.sort_descending):
+            return
+        self.sort_column, self.sort_descending = sort_column, descending
+        logger.info(f"Sorting the '{self.title}' tab by {sort_column}{' desc' if descending else ''}.")
+        if self.has_more_pages() and not self.search_input.text().strip():
+            self.scheduler.request(self)
+
+    def open_header_menu(self, position):
+        menu = QMenu(self)
+        default_order_action = QAction("Default Order", self)
+        default_order_action.setEnabled(self.proxy.sort_column >= 0)
+        default_order_action.triggered.connect(lambda: self.tree.sortByColumn(-1, Qt.AscendingOrder))
+        menu.addAction(default_order_action)
+        menu.exec_(self.tree.header().mapToGlobal(position))
+
+    def on_rows_inserted(self, parent, first, last):
+        if parent.isValid():
+            return
+        if not self.pending_expansion:
+            # Rows of one page or change arrive in several inserts; expand them together once control returns
+            QTimer.singleShot(0, self.expand_new_rows)
+        self.pending_expansion.extend(self.proxy.index(row, 0).data(ID_ROLE) for row in range(first, last + 1))
+
+    def expand_new_rows(self):
+        """
+        Expands the new residential complexes the expand_units policy asks for, loading the units they
+        still miss in one request. Other complexes load their units when the user expands them.
+        """
+        project_ids, self.pending_expansion = self.pending_expansion, []
+        if EXPAND_UNITS == 'none':
+            return
+        project_ids = [
+            project_id for project_id in project_ids
+            if self.model.has_units(project_id)
+            and (EXPAND_UNITS == 'all' or self.model.unit_total(project_id) <= EXPAND_MAX_UNITS)
+        ]
+        self.model.request_units(project_ids)
+        for project_id in project_ids:
+            index = self.proxy.mapFromSource(self.model.project_index(project_id))
+            if index.isValid():
+                self.tree.expand(index)
+
+    def button_actions(self, index):
+        """
+        Returns the default action and the (text, callback) menu actions of the button painted in a cell.
+        """
+        project = index.data(PROJECT_ROLE)
+        unit = index.data(UNIT_ROLE)
+        column = index.column()
+        # A floor plan known to be missing is imported on click instead of reporting that it doesn't exist
+        file_state = index.data(PRESENCE_ROLE)
+        missing = file_state is not None and file_state[0] == MISSING
+        if column in (INNREGULERING_COLUMN, SJEKKLISTE_COLUMN):
+            doc_type = "Innregulering" if column == INNREGULERING_COLUMN else "Sjekkliste"
+            return (
+                lambda: self.view_docx(project, doc_type, unit),
+                [("Save As...", lambda: self.save_docx_as(project, doc_type, unit))]
+            )
+        if column == FLOOR_PLAN_COLUMN and unit is None and self.model.has_units(project.id):
+            import_pdf = lambda: handle_import_master_floor_plan(project, self)
+            return (
+                import_pdf if missing else lambda: self.view_master_floor_plan(project),
+                [
+                    ("Import PDF", import_pdf),
+                    ("Save As...", lambda: self.save_master_floor_plan_as(project))
+                ]
+            )
+        if column == FLOOR_PLAN_COLUMN:
+            import_pdf = lambda: handle_import_floor_plan(project, unit, self)
+            return (
+                import_pdf if missing else lambda: self.view_floor_plan(project, unit),
+                [
+                    ("Import PDF", import_pdf),
+                    ("Save As...", lambda: self.save_floor_plan_as(project, unit))
+                ]
+            )
+        if column in (MOVE_1_COLUMN, MOVE_2_COLUMN):
+            new_status = "Active" if column == MOVE_1_COLUMN else "Completed"
+            return lambda: handle_move_project(self.controller, project, new_status, self), []
+        return None, []
+
+    def on_button_clicked(self, index):
+        default_action, _ = self.button_actions(index)
+        if default_action is not None:
+            default_action()
+
+    def on_button_menu_requested(self, index, position):
+        # The menu of a split button only exists while it is open
+        _, menu_actions = self.button_actions(index)
+        if not menu_actions:
+            return
+        menu = QMenu(self)
+        for action_text, action_callback in menu_actions:
+            menu.addAction(action_text).triggered.connect(lambda checked=False, callback=action_callback: callback())
+        menu.exec_(position)
+        menu.deleteLater()
 
     def open_context_menu(self, position: QPoint):
-        item = self.tree.itemAt(position)
-        if item and not item.parent():
+        index = self.tree.indexAt(position)
+        if index.isValid() and not index.parent().isValid():
+            index = index.siblingAtColumn(0)
             menu = QMenu(self)
             edit_action = QAction("Edit", self)
             delete_action = QAction("Delete", self)
             menu.addAction(edit_action)
             menu.addAction(delete_action)
+            delete_action.setEnabled(not index.data(ARCHIVED_ROLE))
             action = menu.exec_(self.tree.viewport().mapToGlobal(position))
             if action == edit_action:
                 # Placeholder for Edit functionality
                 pass
             elif action == delete_action:
-                project_id = item.data(0, Qt.UserRole)
+                project_id = index.data(ID_ROLE)
                 handle_project_delete(self.controller, project_id, self)
 
     def view_docx_overview(self):
-        self.generate_docx()
+        self.generate_docx(on_generated=self.open_docx_overview)
+
+    def open_docx_overview(self):
         if not os.path.exists(self.docx_path):
             QMessageBox.warning(self, "DOCX Error", f"{self.title} DOCX does not exist.")
             logger.warning(f"{self.title} DOCX not found.")
@@ -283,7 +420,6 @@ class BaseProjectsTab(QWidget):
             logger.error(f"Failed to open {self.title} DOCX: {message}")
 
     def save_docx_overview(self):
-        self.generate_docx()
         options = QFileDialog.Options()
         save_path, _ = QFileDialog.getSaveFileName(
             self,
@@ -293,15 +429,42 @@ class BaseProjectsTab(QWidget):
             options=options
         )
         if save_path:
-            try:
-                shutil.copy(self.docx_path, save_path)
-                QMessageBox.information(self, "Success", f"Overview saved successfully at:\n{save_path}")
-                logger.info(f"Overview saved as {save_path}")
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Failed to save Overview:\n{str(e)}")
-                logger.error(f"Failed to save Overview DOCX: {e}")
+            self.generate_docx(on_generated=lambda: self.copy_docx_overview(save_path))
+
+    def copy_docx_overview(self, save_path):
+        try:
+            shutil.copy(self.docx_path, save_path)
+            QMessageBox.information(self, "Success", f"Overview saved successfully at:\n{save_path}")
+            logger.info(f"Overview saved as {save_path}")
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to save Overview:\n{str(e)}")
+            logger.error(f"Failed to save Overview DOCX: {e}")
+
+    def generate_docx(self, on_generated=None):
+        """
+        Reads the tab's projects in the background, archived ones included where the tab shows them,
+        then writes the overview to docx_path and calls on_generated().
+        """
+        self.controller.submit(
+            self.controller.load_projects_with_counts,
+            status=self.status_filter,
+            include_archive=self.include_archive,
+            key=('overview', self.status_filter, self.include_archive),
+            on_done=lambda result: self.write_docx(*result, on_generated=on_generated),
+            on_error=self.on_generate_docx_failed
+        )
+
+    def on_generate_docx_failed(self, error):
+        QMessageBox.critical(self, "DOCX Generation Error", f"Failed to generate DOCX:\n{str(error)}")
+        logger.error(f"Failed to generate DOCX at {self.docx_path}: {error}")
+
+    def write_docx(self, projects, counts, on_generated=None):
+        # python-docx is only needed here, importing it at startup costs more than the rest of the GUI
+        from docx import Document
+        from docx.enum.section import WD_ORIENT
+        from docx.enum.text import WD_ALIGN_PARAGRAPH
+        from docx.shared import Inches
 
-    def generate_docx(self):
         try:
             document = Document()
             # Set page orientation to landscape
@@ -318,7 +481,6 @@ class BaseProjectsTab(QWidget):
             header_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
 
             # Add table
-            projects = self.controller.load_projects(status=self.status_filter)
             if not projects:
                 document.add_paragraph("No projects to display.")
             else:
@@ -340,21 +502,20 @@ class BaseProjectsTab(QWidget):
                     row_cells[1].text = project.number
                     row_cells[2].text = project.main_contractor if project.main_contractor else "N/A"
                     if project.is_residential_complex:
-                        completed = sum(1 for unit in project.units if self.get_unit_status(project.id, unit))
-                        total = len(project.units)
+                        completed, total = counts.get(project.id, (0, 0))
                         row_cells[3].text = f"{completed}/{total}"
                     else:
                         row_cells[3].text = "N/A"
                     row_cells[4].text = project.status
-                    row_cells[5].text = self.format_date(project.start_date)
-                    row_cells[6].text = self.format_date(project.end_date) if project.end_date else "N/A"
+                    row_cells[5].text = project.start_date_text
+                    row_cells[6].text = project.end_date_text or "N/A"
                     row_cells[7].text = project.worker
 
-                    # Adjust column widths to fit the page
-                    widths = [Inches(1.5), Inches(1.0), Inches(1.5), Inches(1.2), Inches(1.0), Inches(1.0), Inches(1.0), Inches(1.2)]
-                    for row in table.rows:
-                        for idx, width in enumerate(widths):
-                            row.cells[idx].width = width
+                # Adjust column widths to fit the page, once all rows are added
+                widths = [Inches(1.5), Inches(1.0), Inches(1.5), Inches(1.2), Inches(1.0), Inches(1.0), Inches(1.0), Inches(1.2)]
+                for row in table.rows:
+                    for idx, width in enumerate(widths):
+                        row.cells[idx].width = width
 
             # Add footer with current date
             footer = section.footer
@@ -365,10 +526,13 @@ class BaseProjectsTab(QWidget):
             document.save(self.docx_path)
             logger.info(f"Generated DOCX at {self.docx_path}")
         except Exception as e:
-            QMessageBox.critical(self, "DOCX Generation Error", f"Failed to generate DOCX:\n{str(e)}")
-            logger.error(f"Failed to generate DOCX at {self.docx_path}: {e}")
+            self.on_generate_docx_failed(e)
+            return
+        if on_generated is not None:
+            on_generated()
 
-    def save_docx_as(self, project, doc_type, unit_name=None):
+    def save_docx_as(self, project, doc_type, unit=None):
+        unit_name = unit.name if unit else None
         options = QFileDialog.Options()
         if unit_name:
             save_path, _ = QFileDialog.getSaveFileName(
@@ -388,12 +552,9 @@ class BaseProjectsTab(QWidget):
             )
         if save_path:
             try:
-                folder_name = get_project_folder_name(project)
-                if unit_name:
-                    docx_file = os.path.join(get_project_dir(), folder_name, sanitize_filename(unit_name), f"{doc_type}.docx")
-                else:
-                    docx_file = os.path.join(get_project_dir(), folder_name, f"{doc_type}.docx")
-                if not os.path.exists(docx_file):
+                # A document never opened is saved straight from its template in the store
+                docx_file = document_source(project_folder(project), self.document_path(doc_type, unit))
+                if docx_file is None:
                     QMessageBox.warning(self, "File Not Found", f"{doc_type}.docx does not exist.")
                     logger.warning(f"{doc_type}.docx not found for project '{project.name}'" + (f" and unit '{unit_name}'." if unit_name else "."))
                     return
@@ -404,15 +565,28 @@ class BaseProjectsTab(QWidget):
                 QMessageBox.critical(self, "Error", f"Failed to save {doc_type}:\n{str(e)}")
                 logger.error(f"Failed to save {doc_type} for project '{project.name}'" + (f" and unit '{unit_name}': {e}" if unit_name else f": {e}"))
 
-    def view_docx(self, project, doc_type, unit_name=None):
-        if unit_name:
-            folder_name = get_project_folder_name(project)
-            docx_file = os.path.join(get_project_dir(), folder_name, sanitize_filename(unit_name), f"{doc_type}.docx")
-        else:
-            folder_name = get_project_folder_name(project)
-            docx_file = os.path.join(get_project_dir(), folder_name, f"{doc_type}.docx")
+    def document_path(self, doc_type, unit=None):
+        """
+        Path of a project or unit document relative to the project folder.
+        """
+        if unit:
+            return os.path.join(unit_folder_name(unit), f"{doc_type}.docx")
+        return f"{doc_type}.docx"
 
-        if not os.path.exists(docx_file):
+    def view_docx(self, project, doc_type, unit=None):
+        unit_name = unit.name if unit else None
+        folder = project_folder(project)
+        try:
+            # Documents of new projects are written from the template store the first time they are opened
+            docx_file = ensure_document(folder, self.document_path(doc_type, unit))
+            # The document may have been written just now, and is likely edited once open
+            self.model.presence.invalidate(folder)
+        except Exception as e:
+            QMessageBox.critical(self, "DOCX Error", f"Failed to create {doc_type}.docx:\n{str(e)}")
+            logger.error(f"Failed to materialize {doc_type}.docx for project '{project.name}'" + (f" and unit '{unit_name}': {e}" if unit_name else f": {e}"))
+            return
+
+        if docx_file is None:
             QMessageBox.warning(self, "DOCX Error", f"{doc_type}.docx does not exist for this {'unit ' + unit_name if unit_name else 'project'}.")
             logger.warning(f"{doc_type}.docx not found for project '{project.name}'" + (f" and unit '{unit_name}'." if unit_name else "."))
             return
@@ -422,30 +596,18 @@ class BaseProjectsTab(QWidget):
             QMessageBox.warning(self, "DOCX Error", message)
             logger.error(f"Failed to open {doc_type}.docx for project '{project.name}'" + (f" and unit '{unit_name}': {message}" if unit_name else f": {message}"))
 
-    def view_floor_plan(self, project, unit_name=None):
+    def view_floor_plan(self, project, unit=None):
+        unit_name = unit.name if unit else None
         if project.is_residential_complex and not unit_name:
             QMessageBox.warning(self, "Floor Plan Error", "This project is a residential complex. Please select a unit to view its floor plan.")
             logger.warning(f"Attempted to view project-level floor plan for residential project '{project.name}'.")
             return
 
         try:
-            folder_name = get_project_folder_name(project)
-
-            if unit_name:
-                floor_plan_file = os.path.join(
-                    get_project_dir(),
-                    folder_name,
-                    sanitize_filename(unit_name),
-                    "Floor plan",
-                    "FloorPlan.pdf"
-                )
+            if unit:
+                floor_plan_file = os.path.join(unit_folder(project, unit), "Floor plan", "FloorPlan.pdf")
             else:
-                floor_plan_file = os.path.join(
-                    get_project_dir(),
-                    folder_name,
-                    "Floor plan",
-                    "FloorPlan.pdf"
-                )
+                floor_plan_file = os.path.join(project_folder(project), "Floor plan", "FloorPlan.pdf")
 
             if not os.path.exists(floor_plan_file):
                 QMessageBox.warning(self, "Floor Plan Error", "Floor Plan PDF does not exist.")
@@ -467,7 +629,8 @@ class BaseProjectsTab(QWidget):
             QMessageBox.critical(self, "Error", f"An error occurred while trying to view the Floor Plan:\n{str(e)}")
             logger.error(f"Error in view_floor_plan for project '{project.name}': {e}")
 
-    def save_floor_plan_as(self, project, unit_name=None):
+    def save_floor_plan_as(self, project, unit=None):
+        unit_name = unit.name if unit else None
         options = QFileDialog.Options()
         if unit_name:
             save_path, _ = QFileDialog.getSaveFileName(
@@ -487,11 +650,10 @@ class BaseProjectsTab(QWidget):
             )
         if save_path:
             try:
-                folder_name = get_project_folder_name(project)
-                if unit_name:
-                    floor_plan_file = os.path.join(get_project_dir(), folder_name, sanitize_filename(unit_name), "Floor plan", "FloorPlan.pdf")
+                if unit:
+                    floor_plan_file = os.path.join(unit_folder(project, unit), "Floor plan", "FloorPlan.pdf")
                 else:
-                    floor_plan_file = os.path.join(get_project_dir(), folder_name, "Floor plan", "FloorPlan.pdf")
+                    floor_plan_file = os.path.join(project_folder(project), "Floor plan", "FloorPlan.pdf")
                 if not os.path.exists(floor_plan_file):
                     QMessageBox.warning(self, "File Not Found", "Floor Plan PDF does not exist.")
                     logger.warning(f"Floor Plan PDF not found for project '{project.name}'" + (f" and unit '{unit_name}'." if unit_name else "."))
@@ -505,8 +667,7 @@ class BaseProjectsTab(QWidget):
 
     def view_master_floor_plan(self, project):
         try:
-            folder_name = get_project_folder_name(project)
-            master_floor_plan_file = os.path.join(get_project_dir(), folder_name, "Master", "MasterFloorPlan.pdf")
+            master_floor_plan_file = os.path.join(project_folder(project), "Master", "MasterFloorPlan.pdf")
 
             if not os.path.exists(master_floor_plan_file):
                 QMessageBox.warning(self, "Master Floor Plan Error", "Master Floor Plan PDF does not exist.")
@@ -539,8 +700,7 @@ class BaseProjectsTab(QWidget):
         )
         if save_path:
             try:
-                folder_name = get_project_folder_name(project)
-                master_floor_plan_file = os.path.join(get_project_dir(), folder_name, "Master", "MasterFloorPlan.pdf")
+                master_floor_plan_file = os.path.join(project_folder(project), "Master", "MasterFloorPlan.pdf")
                 if not os.path.exists(master_floor_plan_file):
                     QMessageBox.warning(self, "File Not Found", "Master Floor Plan PDF does not exist.")
                     logger.warning(f"Master Floor Plan PDF not found for project '{project.name}'.")
@@ -551,9 +711,3 @@ class BaseProjectsTab(QWidget):
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Failed to save Master Floor Plan:\n{str(e)}")
                 logger.error(f"Failed to save Master Floor Plan for project '{project.name}': {e}")
-
-    def format_date(self, date_str):
-        try:
-            return datetime.strptime(date_str, "%Y-%m-%d").strftime("%d-%m-%Y")
-        except:
-            return date_str
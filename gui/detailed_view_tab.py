@@ -2,14 +2,12 @@
 
 from gui.base_projects_tab import BaseProjectsTab
 from logger import get_logger
-from controllers.project_controller import ProjectController
 
 logger = get_logger(__name__)
 
 class DetailedViewTab(BaseProjectsTab):
-    def __init__(self, db):
-        super().__init__(db, status_filter=None, title="Detailed Project View")
-        self.controller = ProjectController(self.db)
+    def __init__(self, db, model=None):
+        super().__init__(db, status_filter=None, title="Detailed Project View", model=model)
         self.current_project = None
-        self.db.project_updated.connect(self.load_projects)
-        logger.info("DetailedViewTab initialized and connected to project_updated signal.")
+        self.db.project_changed.connect(self.on_project_changed)
+        logger.info("DetailedViewTab initialized and connected to project_changed signal.")
@@ -7,22 +7,27 @@ import os
 import shutil
 import sys
 import subprocess
-from datetime import datetime
+from dataclasses import replace
+from datetime import date
 
 from utils import (
-    sanitize_filename, open_docx_file, get_project_dir, get_template_dir, get_project_folder_name
+    open_docx_file, get_template_dir
 )
-from database import UnitModel, ProjectModel
+from folders import project_folder, unit_folder
+from gui.presence_index import get_presence_index
 from logger import get_logger
-from docx import Document
-from docx.enum.section import WD_ORIENT
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.shared import Inches
 
 logger = get_logger(__name__)
 
 def handle_project_delete(db, project_id, parent_widget):
-    project = db.get_project_by_id(project_id)
+    # The project is read in the background; the dialog opens once it is there
+    db.get_project_async(
+        project_id,
+        on_done=lambda result: confirm_project_delete(db, result[0], parent_widget),
+        on_error=lambda e: logger.error(f"Failed to read project ID {project_id} for deletion: {e}")
+    )
+
+def confirm_project_delete(db, project, parent_widget):
     if project:
         reply = QMessageBox.question(
             parent_widget,
@@ -31,53 +36,74 @@ def handle_project_delete(db, project_id, parent_widget):
             QMessageBox.Yes | QMessageBox.No
         )
         if reply == QMessageBox.Yes:
-            try:
-                # Delete project folder
-                folder_name = get_project_folder_name(project)
-                project_folder = os.path.join(get_project_dir(), folder_name)
-                if os.path.exists(project_folder):
-                    shutil.rmtree(project_folder)
-                    logger.info(f"Deleted project folder at {project_folder}")
-                # Delete project from database
-                db.delete_project(project.id)
-                parent_widget.load_projects()
-                QMessageBox.information(parent_widget, "Deleted", f"Project '{project.name}' has been deleted.")
-                logger.info(f"Deleted project '{project.name}' with ID {project.id}")
-            except Exception as e:
-                QMessageBox.critical(parent_widget, "Error", f"Failed to delete project: {str(e)}")
-                logger.error(f"Failed to delete project ID {project.id}: {e}")
-
-def handle_toggle_unit_status(db, project, unit_name, state, parent_widget):
+            db.folder_shared_async(
+                project,
+                on_done=lambda shared: delete_project(db, project, shared, parent_widget),
+                on_error=lambda e: on_project_delete_failed(project, e, parent_widget)
+            )
+
+def delete_project(db, project, folder_shared, parent_widget):
+    try:
+        # Delete the folder stored with the project, unless other projects were merged into it
+        folder = project_folder(project)
+        if folder_shared:
+            logger.info(f"Kept project folder at {folder}, other projects use it too")
+        elif os.path.exists(folder):
+            shutil.rmtree(folder)
+            logger.info(f"Deleted project folder at {folder}")
+        # Delete project from database in the background
+        db.delete_project_async(
+            project.id,
+            on_done=lambda _: on_project_deleted(project, parent_widget),
+            on_error=lambda e: on_project_delete_failed(project, e, parent_widget)
+        )
+    except Exception as e:
+        on_project_delete_failed(project, e, parent_widget)
+
+def on_project_deleted(project, parent_widget):
+    QMessageBox.information(parent_widget, "Deleted", f"Project '{project.name}' has been deleted.")
+    logger.info(f"Deleted project '{project.name}' with ID {project.id}")
+
+def on_project_delete_failed(project, error, parent_widget):
+    QMessageBox.critical(parent_widget, "Error", f"Failed to delete project: {str(error)}")
+    logger.error(f"Failed to delete project ID {project.id}: {error}")
+
+def handle_toggle_unit_status(db, project, unit, state, parent_widget):
     is_done = state == Qt.Checked
-    # Fetch unit by name and project
-    unit = db.session.query(UnitModel).join(ProjectModel).filter(
-        ProjectModel.id == project.id,
-        UnitModel.name == unit_name
-    ).first()
-    if unit:
-        try:
-            db.toggle_unit_status(project.id, unit.id, is_done)
-            parent_widget.load_projects()
-        except Exception as e:
-            QMessageBox.critical(parent_widget, "Error", f"Failed to update unit status: {str(e)}")
-            logger.error(f"Failed to update unit status for Unit '{unit_name}' in Project ID {project.id}: {e}")
+    if unit.id is not None:
+        db.toggle_unit_status_async(
+            project.id, unit.id, is_done,
+            on_error=lambda e: on_toggle_unit_status_failed(project, unit, e, parent_widget)
+        )
+
+def on_toggle_unit_status_failed(project, unit, error, parent_widget):
+    # Put the checkbox back to the stored state
+    parent_widget.model.refresh_projects([project.id])
+    QMessageBox.critical(parent_widget, "Error", f"Failed to update unit status: {str(error)}")
+    logger.error(f"Failed to update unit status for Unit '{unit.name}' in Project ID {project.id}: {error}")
 
 def handle_move_project(db, project, new_status, parent_widget):
     try:
-        project.status = new_status
-        if new_status == "Finished":
-            project.end_date = datetime.now().strftime("%Y-%m-%d")
-        else:
-            project.end_date = None
-        db.update_project(project)
-        parent_widget.load_projects()
-        QMessageBox.information(parent_widget, "Success", f"Project '{project.name}' moved to '{new_status}'.")
-        logger.info(f"Project '{project.name}' moved to '{new_status}'.")
+        # The model and the cache share the project, it is only changed once the database has the new status
+        project = replace(project, status=new_status, end_date=date.today() if new_status == "Finished" else None)
+        db.update_project_async(
+            project,
+            on_done=lambda _: on_project_moved(project, new_status, parent_widget),
+            on_error=lambda e: on_project_move_failed(project, new_status, e, parent_widget)
+        )
     except Exception as e:
-        QMessageBox.critical(parent_widget, "Error", f"Failed to move project: {str(e)}")
-        logger.error(f"Failed to move project '{project.name}' to '{new_status}': {e}")
+        on_project_move_failed(project, new_status, e, parent_widget)
+
+def on_project_moved(project, new_status, parent_widget):
+    QMessageBox.information(parent_widget, "Success", f"Project '{project.name}' moved to '{new_status}'.")
+    logger.info(f"Project '{project.name}' moved to '{new_status}'.")
+
+def on_project_move_failed(project, new_status, error, parent_widget):
+    QMessageBox.critical(parent_widget, "Error", f"Failed to move project: {str(error)}")
+    logger.error(f"Failed to move project '{project.name}' to '{new_status}': {error}")
 
-def handle_import_floor_plan(project, unit_name, parent_widget):
+def handle_import_floor_plan(project, unit, parent_widget):
+    unit_name = unit.name if unit else None
     options = QFileDialog.Options()
     file_path, _ = QFileDialog.getOpenFileName(
         parent_widget,
@@ -88,14 +114,12 @@ def handle_import_floor_plan(project, unit_name, parent_widget):
     )
     if file_path:
         try:
-            folder_name = get_project_folder_name(project)
-            if unit_name:
-                unit_folder = os.path.join(get_project_dir(), folder_name, sanitize_filename(unit_name), "Floor plan")
-                target_file = os.path.join(unit_folder, "FloorPlan.pdf")
+            if unit:
+                target_file = os.path.join(unit_folder(project, unit), "Floor plan", "FloorPlan.pdf")
             else:
-                floor_plan_folder = os.path.join(get_project_dir(), folder_name, "Floor plan")
-                target_file = os.path.join(floor_plan_folder, "FloorPlan.pdf")
+                target_file = os.path.join(project_folder(project), "Floor plan", "FloorPlan.pdf")
             shutil.copy(file_path, target_file)
+            get_presence_index().invalidate(project_folder(project))
             QMessageBox.information(parent_widget, "Success", f"Floor Plan imported successfully to '{target_file}'.")
             logger.info(f"Imported Floor Plan PDF to {target_file}")
         except Exception as e:
@@ -113,10 +137,9 @@ def handle_import_master_floor_plan(project, parent_widget):
     )
     if file_path:
         try:
-            folder_name = get_project_folder_name(project)
-            master_folder = os.path.join(get_project_dir(), folder_name, "Master")
-            target_file = os.path.join(master_folder, "MasterFloorPlan.pdf")
+            target_file = os.path.join(project_folder(project), "Master", "MasterFloorPlan.pdf")
             shutil.copy(file_path, target_file)
+            get_presence_index().invalidate(project_folder(project))
             QMessageBox.information(parent_widget, "Success", f"Master Floor Plan imported successfully to '{target_file}'.")
             logger.info(f"Imported Master Floor Plan PDF to {target_file}")
         except Exception as e:
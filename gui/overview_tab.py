@@ -4,17 +4,15 @@ from gui.base_projects_tab import BaseProjectsTab
 from gui.add_project_dialog import AddProjectDialog
 from logger import get_logger
 from PyQt5.QtWidgets import QPushButton, QHBoxLayout
-from controllers.project_controller import ProjectController
 
 logger = get_logger(__name__)
 
 class OverviewTab(BaseProjectsTab):
-    def __init__(self, db):
-        super().__init__(db, status_filter="Active", title="Overview Projects")
-        self.controller = ProjectController(self.db)
+    def __init__(self, db, model=None):
+        super().__init__(db, status_filter="Active", title="Overview Projects", model=model)
         self.setup_add_project_ui()
-        self.db.project_updated.connect(self.load_projects)
-        logger.info("OverviewTab initialized and connected to project_updated signal.")
+        self.db.project_changed.connect(self.on_project_changed)
+        logger.info("OverviewTab initialized and connected to project_changed signal.")
 
     def setup_add_project_ui(self):
         # Add Project Button
@@ -27,5 +25,4 @@ class OverviewTab(BaseProjectsTab):
     def open_add_project_dialog(self):
         dialog = AddProjectDialog(self.db)
         if dialog.exec_():
-            self.load_projects()
             logger.info("New project added via dialog.")
@@ -0,0 +1,238 @@
+# File: gui/presence_index.py
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from configparser import ConfigParser
+from typing import Dict, Optional
+
+from PyQt5.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+
+from template_store import read_manifest
+from utils import get_project_dir
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+# Load configuration
+config = ConfigParser()
+config.read('config.ini')
+
+presence_config = config['Presence'] if config.has_section('Presence') else {}
+# Folders watched for changes at most; folders past the limit are checked by polling their modification times
+WATCH_LIMIT = int(presence_config.get('watch_limit', 2000))
+POLL_INTERVAL_MS = int(presence_config.get('poll_interval_ms', 30000))
+SCAN_WORKERS = int(presence_config.get('scan_workers', 2))
+
+# Files tracked per project or unit folder, by kind
+DOCUMENT_FILES = {'Innregulering': "Innregulering.docx", 'Sjekkliste': "Sjekkliste.docx"}
+FLOOR_PLAN_FOLDER, FLOOR_PLAN_FILE = "Floor plan", "FloorPlan.pdf"
+MASTER_FOLDER, MASTER_FILE = "Master", "MasterFloorPlan.pdf"
+
+# States of a tracked file besides its modification time
+UNKNOWN = 'unknown'  # Its folder hasn't been scanned yet
+MISSING = 'missing'
+TEMPLATE = 'template'  # Listed in the template store manifest, written on first open
+
+def _entries(path):
+    try:
+        with os.scandir(path) as entries:
+            return {entry.name: entry for entry in entries}
+    except (FileNotFoundError, NotADirectoryError):
+        return {}
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+def _scan_files(path, entries, files, directories):
+    """
+    Modification time of each tracked file directly in path and in its floor plan folder.
+    """
+    directories[path] = _mtime(path) if entries else None
+    for kind, name in DOCUMENT_FILES.items():
+        if name in entries and entries[name].is_file():
+            files[kind] = entries[name].stat().st_mtime
+    for folder, name, kind in ((FLOOR_PLAN_FOLDER, FLOOR_PLAN_FILE, 'FloorPlan'), (MASTER_FOLDER, MASTER_FILE, 'MasterFloorPlan')):
+        if folder in entries and entries[folder].is_dir():
+            sub_path = os.path.join(path, folder)
+            sub_entries = _entries(sub_path)
+            directories[sub_path] = _mtime(sub_path)
+            if name in sub_entries and sub_entries[name].is_file():
+                files[kind] = sub_entries[name].stat().st_mtime
+
+def scan_project_folder(folder):
+    """
+    Reads the tracked files of a project folder and its unit folders in one pass. Returns
+    ({unit folder name, '' for the project: {kind: mtime or TEMPLATE}}, {directory: mtime}).
+    """
+    files = {'': {}}
+    directories = {}
+    entries = _entries(folder)
+    _scan_files(folder, entries, files[''], directories)
+    for name, entry in entries.items():
+        if entry.is_dir() and name not in (FLOOR_PLAN_FOLDER, MASTER_FOLDER) and not name.startswith('.'):
+            files[name] = {}
+            _scan_files(entry.path, _entries(entry.path), files[name], directories)
+    # Documents still in the template store count as present but unopened
+    for relative_path in read_manifest(folder) if entries else ():
+        unit, _, file_name = relative_path.rpartition('/')
+        for kind, name in DOCUMENT_FILES.items():
+            if name == file_name:
+                files.setdefault(unit, {}).setdefault(kind, TEMPLATE)
+    return files, directories
+
+class PresenceIndex(QObject):
+    """
+    Knows which documents and floor plans exist in the project folders, so views can show it without
+    touching the filesystem while painting. Folders are scanned in the background when first requested,
+    then kept current through a QFileSystemWatcher, or by polling directory modification times for
+    folders past the watch limit. Code that writes into a project folder can call invalidate() to see
+    the change at once.
+    """
+    changed = pyqtSignal(str)  # Project folder whose files changed
+    _scanned = pyqtSignal(str, object, object)  # (folder, files, directories), from the scan threads
+    _polled_changes = pyqtSignal(object)  # Polled folders whose directories changed, from the scan threads
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._files: Dict[str, dict] = {}
+        self._directories: Dict[str, dict] = {}  # Project folder -> {directory: mtime} seen by its last scan
+        self._scanning = set()
+        self._rescan = set()  # Folders that changed while being scanned
+        self._polled = set()  # Folders with directories the watcher doesn't cover
+        self._pool = ThreadPoolExecutor(max_workers=max(SCAN_WORKERS, 1), thread_name_prefix="presence")
+        self._scanned.connect(self._on_scanned)
+        self._polled_changes.connect(self._rescan_polled)
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
+        self._changed_folders = set()
+        self._change_timer = QTimer(self)
+        self._change_timer.setSingleShot(True)
+        self._change_timer.setInterval(300)  # Saving a document touches a folder several times
+        self._change_timer.timeout.connect(self._rescan_changed)
+        self._poll_timer = QTimer(self)
+        self._poll_timer.setInterval(POLL_INTERVAL_MS)
+        self._poll_timer.timeout.connect(self._poll)
+        self._poll_timer.start()
+        self.scans = 0
+
+    def request(self, folders):
+        """
+        Scans the given project folders in the background unless they are known or being scanned.
+        """
+        for folder in folders:
+            if folder not in self._files and folder not in self._scanning:
+                self._scan(folder)
+
+    def invalidate(self, folder):
+        """
+        Scans a project folder again, for code that just changed files in it.
+        """
+        if folder in self._scanning:
+            self._rescan.add(folder)
+        elif folder in self._files:
+            self._scan(folder)
+
+    def state(self, folder, unit, kind):
+        """
+        The modification time of a tracked file, or UNKNOWN, MISSING or TEMPLATE. unit is the name of
+        the unit's folder, or '' for the project itself.
+        """
+        files = self._files.get(folder)
+        if files is None:
+            return UNKNOWN
+        return files.get(unit, {}).get(kind, MISSING)
+
+    def shutdown(self):
+        self._poll_timer.stop()
+        self._pool.shutdown(wait=False)
+
+    def _scan(self, folder):
+        self._scanning.add(folder)
+        self.scans += 1
+        self._pool.submit(self._run_scan, folder)
+
+    def _run_scan(self, folder):
+        try:
+            files, directories = scan_project_folder(folder)
+        except Exception as e:
+            logger.error(f"Failed to scan project folder {folder}: {e}")
+            files, directories = {'': {}}, {folder: None}
+        try:
+            self._scanned.emit(folder, files, directories)
+        except RuntimeError:
+            # The index is gone (application shutting down)
+            pass
+
+    def _on_scanned(self, folder, files, directories):
+        self._scanning.discard(folder)
+        self._files[folder] = files
+        self._directories[folder] = directories
+        self._watch(folder, directories)
+        self.changed.emit(folder)
+        if folder in self._rescan:
+            self._rescan.discard(folder)
+            self._scan(folder)
+
+    def _watch(self, folder, directories):
+        watched = set(self._watcher.directories())
+        missing = [path for path in directories if path not in watched and os.path.isdir(path)]
+        room = WATCH_LIMIT - len(watched)
+        if missing and room > 0:
+            self._watcher.addPaths(missing[:room])
+        # Folders that don't exist yet show up in the project directory, which is watched as well
+        project_dir = get_project_dir()
+        if project_dir not in watched and room > len(missing) and os.path.isdir(project_dir):
+            self._watcher.addPath(project_dir)
+        if len(missing) > room or any(mtime is None for mtime in directories.values()):
+            self._polled.add(folder)
+        else:
+            self._polled.discard(folder)
+
+    def _on_directory_changed(self, path):
+        project_dir = get_project_dir()
+        if os.path.normcase(path) == os.path.normcase(project_dir):
+            # A project folder appeared or went away
+            self._changed_folders.update(folder for folder in self._files if self._directories[folder].get(folder) is None
+                                         or not os.path.isdir(folder))
+        else:
+            relative = os.path.relpath(path, project_dir)
+            self._changed_folders.add(os.path.join(project_dir, relative.split(os.sep)[0]))
+        self._change_timer.start()
+
+    def _rescan_changed(self):
+        folders, self._changed_folders = self._changed_folders, set()
+        for folder in folders:
+            self.invalidate(folder)
+
+    def _poll(self):
+        if self._polled:
+            self._pool.submit(self._run_poll, {folder: dict(self._directories[folder]) for folder in self._polled})
+
+    def _run_poll(self, directories_by_folder):
+        changed = [folder for folder, directories in directories_by_folder.items()
+                   if any(_mtime(path) != mtime for path, mtime in directories.items())]
+        if changed:
+            try:
+                self._polled_changes.emit(changed)
+            except RuntimeError:
+                # The index is gone (application shutting down)
+                pass
+
+    def _rescan_polled(self, folders):
+        # Scans start on the GUI thread only, so _scanning knows about every running scan
+        for folder in folders:
+            self.invalidate(folder)
+
+_presence_index: Optional[PresenceIndex] = None
+
+def get_presence_index() -> PresenceIndex:
+    """
+    Returns the index shared by all project models, creating it on first use. Must be called from the GUI thread.
+    """
+    global _presence_index
+    if _presence_index is None:
+        _presence_index = PresenceIndex()
+    return _presence_index
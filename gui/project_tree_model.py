@@ -0,0 +1,674 @@
+# File: gui/project_tree_model.py
+
+from collections import namedtuple
+from datetime import date, datetime
+from PyQt5.QtCore import Qt, QAbstractItemModel, QModelIndex, QSortFilterProxyModel, QTimer, pyqtSignal
+
+from events import ChangeKind
+from project import DATE_DISPLAY_FORMAT
+from folders import project_folder, unit_folder_name
+from utils import natural_key
+from gui.presence_index import get_presence_index, UNKNOWN, MISSING, TEMPLATE
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+COLUMNS = [
+    "Project Name",
+    "Project Number",
+    "Main Contractor",
+    "Completed Units",
+    "Status",
+    "Extra",
+    "Innregulering",
+    "Sjekkliste",
+    "Floor Plan(s)",
+    "Move(1)",
+    "Move(2)",
+    "Start Date",
+    "End Date",
+    "Worker"
+]
+(
+    NAME_COLUMN, NUMBER_COLUMN, CONTRACTOR_COLUMN, COMPLETED_COLUMN, STATUS_COLUMN, EXTRA_COLUMN,
+    INNREGULERING_COLUMN, SJEKKLISTE_COLUMN, FLOOR_PLAN_COLUMN, MOVE_1_COLUMN, MOVE_2_COLUMN,
+    START_DATE_COLUMN, END_DATE_COLUMN, WORKER_COLUMN
+) = range(len(COLUMNS))
+
+# Item data roles
+ID_ROLE = Qt.UserRole  # Project ID on project rows, unit ID on unit rows
+UNIT_DONE_ROLE = Qt.UserRole + 1
+COMPLETED_UNITS_ROLE = Qt.UserRole + 2
+ARCHIVED_ROLE = Qt.UserRole + 3
+BUTTON_ROLE = Qt.UserRole + 4  # CellButton for cells the delegate paints as a button, else None
+PROJECT_ROLE = Qt.UserRole + 5
+UNIT_ROLE = Qt.UserRole + 6
+PRESENCE_ROLE = Qt.UserRole + 7  # (state, kind) from the PresenceIndex of the file behind a document or floor plan cell
+
+# Columns whose values load_projects_page can order pages by; the others are sorted among the loaded rows only
+DATABASE_SORT_COLUMNS = {
+    NAME_COLUMN: 'name',
+    NUMBER_COLUMN: 'number',
+    CONTRACTOR_COLUMN: 'main_contractor',
+    STATUS_COLUMN: 'status',
+    START_DATE_COLUMN: 'start_date',
+    END_DATE_COLUMN: 'end_date',
+    WORKER_COLUMN: 'worker',
+}
+
+def date_key(value):
+    # Missing dates sort after all others
+    return (value is None, value or date.min)
+
+# How a cell is painted as a button; split buttons have a menu arrow on the right
+CellButton = namedtuple('CellButton', ['text', 'tooltip', 'split', 'color', 'enabled'])
+
+_UNIT_BUTTONS = {
+    INNREGULERING_COLUMN: CellButton("View", "View Innregulering DOCX", True, None, True),
+    SJEKKLISTE_COLUMN: CellButton("View", "View Sjekkliste DOCX", True, None, True),
+    FLOOR_PLAN_COLUMN: CellButton("View", "View Floor Plan(s)", True, None, True),
+}
+_RESIDENTIAL_BUTTONS = {
+    FLOOR_PLAN_COLUMN: CellButton("Master", "Manage Master Floor Plan", True, None, True),
+}
+_PROJECT_BUTTONS = {
+    **_UNIT_BUTTONS,
+    MOVE_1_COLUMN: CellButton("Active", "Move Project to Active", False, "yellow", True),
+    MOVE_2_COLUMN: CellButton("Completed", "Move Project to Completed", False, "green", True),
+}
+# File kind shown in each file column, per PresenceIndex
+_FILE_KINDS = {INNREGULERING_COLUMN: 'Innregulering', SJEKKLISTE_COLUMN: 'Sjekkliste', FLOOR_PLAN_COLUMN: 'FloorPlan'}
+_MISSING_TEXT = {'Innregulering': "Missing", 'Sjekkliste': "Missing", 'FloorPlan': "Import", 'MasterFloorPlan': "Import"}
+
+_ARCHIVED_PROJECT_BUTTONS = {
+    **_PROJECT_BUTTONS,
+    **{
+        column: _PROJECT_BUTTONS[column]._replace(tooltip="Archived projects are read-only", enabled=False)
+        for column in (MOVE_1_COLUMN, MOVE_2_COLUMN)
+    }
+}
+
+class ProjectTreeModel(QAbstractItemModel):
+    """
+    Projects as top-level rows with their units as children. Nothing here creates widgets: buttons and
+    checkboxes are painted by the view's delegate, so the cost of a row is the Project it points at.
+    Unit rows carry the ID of their project as internal ID, project rows carry 0.
+
+    Unit rows are only built once a project is expanded: projects may arrive without units
+    (units_loaded False) and fetchMore then loads them through the controller. Until then
+    the completed count comes from the (done, total) summary given with the project.
+
+    One model holds every project loaded by any tab; tabs look at it through a ProjectFilterProxyModel.
+    The model follows the database's change events itself, so each change patches one set of rows;
+    projects changed within one event-loop tick are read back together.
+
+    Every row gets a typed sort key per column when it is added (dates as dates, numbers naturally,
+    completion as a ratio), so the proxies re-sort without formatting or parsing anything.
+
+    The document and floor plan buttons show whether their file exists and when it was last changed,
+    as known to the PresenceIndex; painting never touches the filesystem.
+    """
+    def __init__(self, controller, parent=None, presence=None):
+        super().__init__(parent)
+        self.controller = controller
+        self.controller.db.project_changed.connect(self.on_project_changed)
+        self.presence = presence if presence is not None else get_presence_index()
+        self.presence.changed.connect(self.on_presence_changed)
+        self._projects = []
+        self._rows = {}  # project ID -> row
+        self._units = {}  # project ID -> loaded units
+        self._totals = {}  # project ID -> number of units, known before they are loaded
+        self._completed = {}  # project ID -> number of done units
+        self._done = {}  # unit ID -> is_done, kept apart so cached Project objects are never modified
+        self._sort_keys = {}  # project ID -> sort key per column, each ending in the default order
+        self._folders = {}  # project ID -> project folder
+        self._folder_projects = {}  # project folder -> IDs of the projects shown with it
+        self._unit_folders = {}  # unit ID -> name of its folder
+        self._fetching = set()  # project IDs whose units were requested
+        self._stale = set()  # project IDs to read back on the next tick
+        self._stale_timer = QTimer(self)
+        self._stale_timer.setSingleShot(True)
+        self._stale_timer.setInterval(0)
+        self._stale_timer.timeout.connect(self._read_stale_projects)
+        self.changes = 0
+        self.coalesced_changes = 0  # Changes to projects already waiting to be read back
+
+    # Qt model interface
+
+    def index(self, row, column, parent=QModelIndex()):
+        # Bounds are checked here instead of through hasIndex, the proxies call this for every comparison when sorting
+        if row < 0 or column < 0 or column >= len(COLUMNS):
+            return QModelIndex()
+        if not parent.isValid():
+            return self.createIndex(row, column, 0) if row < len(self._projects) else QModelIndex()
+        if parent.internalId() != 0 or parent.column() != 0:
+            return QModelIndex()
+        project_id = self._projects[parent.row()].id
+        return self.createIndex(row, column, project_id) if row < len(self._units.get(project_id, ())) else QModelIndex()
+
+    def parent(self, index):
+        if not index.isValid() or index.internalId() == 0:
+            return QModelIndex()
+        row = self._rows.get(index.internalId())
+        return QModelIndex() if row is None else self.createIndex(row, 0, 0)
+
+    def rowCount(self, parent=QModelIndex()):
+        if not parent.isValid():
+            return len(self._projects)
+        if parent.internalId() != 0 or parent.column() != 0:
+            return 0
+        return len(self._units.get(self._projects[parent.row()].id, ()))
+
+    def hasChildren(self, parent=QModelIndex()):
+        if not parent.isValid():
+            return bool(self._projects)
+        if parent.internalId() != 0 or parent.column() != 0:
+            return False
+        return self.has_units(self._projects[parent.row()].id)
+
+    def canFetchMore(self, parent):
+        if not parent.isValid() or parent.internalId() != 0:
+            return False
+        project_id = self._projects[parent.row()].id
+        return self.has_units(project_id) and project_id not in self._units and project_id not in self._fetching
+
+    def fetchMore(self, parent):
+        if self.canFetchMore(parent):
+            self.request_units([self._projects[parent.row()].id])
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return COLUMNS[section]
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        flags = Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        if index.internalId() != 0 and index.column() == NAME_COLUMN and not self._project_at(index).is_archived:
+            flags |= Qt.ItemIsUserCheckable
+        return flags
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        project = self._project_at(index)
+        if index.internalId() != 0:
+            return self._unit_data(project, self._units[project.id][index.row()], index.column(), role)
+        return self._project_data(project, index.column(), role)
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.CheckStateRole or not index.isValid() or index.internalId() == 0:
+            return False
+        project = self._project_at(index)
+        unit = self._units[project.id][index.row()]
+        # False when the state didn't change, so callers only act on real toggles
+        return self.set_unit_done(project.id, unit.id, Qt.CheckState(value) == Qt.Checked)
+
+    def _project_at(self, index):
+        if index.internalId() == 0:
+            return self._projects[index.row()]
+        return self._projects[self._rows[index.internalId()]]
+
+    def _project_data(self, project, column, role):
+        if role == Qt.DisplayRole:
+            if column == NAME_COLUMN:
+                return project.name
+            if column == NUMBER_COLUMN:
+                return project.number
+            if column == CONTRACTOR_COLUMN:
+                return project.main_contractor or ""
+            if column == COMPLETED_COLUMN:
+                if self.has_units(project.id):
+                    return f"{self._completed.get(project.id, 0)}/{self._totals[project.id]}"
+                return "" if project.is_residential_complex else "N/A"
+            if column == STATUS_COLUMN:
+                return f"{project.status} (archived)" if project.is_archived else project.status
+            if column == EXTRA_COLUMN:
+                return project.extra or ""
+            if column == START_DATE_COLUMN:
+                return project.start_date_text
+            if column == END_DATE_COLUMN:
+                return project.end_date_text
+            if column == WORKER_COLUMN:
+                return project.worker
+            return None
+        if role in (BUTTON_ROLE, Qt.ToolTipRole):
+            button = self._project_buttons(project).get(column)
+            if button is not None and column in _FILE_KINDS:
+                button = self._with_presence(button, self._file_state(project, None, column))
+            if button is None or role == BUTTON_ROLE:
+                return button
+            return button.tooltip
+        if role == PRESENCE_ROLE:
+            return self._file_state(project, None, column) if column in _FILE_KINDS else None
+        if role == ID_ROLE:
+            return project.id
+        if role == PROJECT_ROLE:
+            return project
+        if role == ARCHIVED_ROLE:
+            return project.is_archived
+        if role == COMPLETED_UNITS_ROLE:
+            return self._completed.get(project.id)
+        return None
+
+    def _unit_data(self, project, unit, column, role):
+        if role == Qt.DisplayRole:
+            return unit.name if column == NAME_COLUMN else None
+        if role == Qt.CheckStateRole:
+            if column != NAME_COLUMN:
+                return None
+            return Qt.Checked if self._done.get(unit.id) else Qt.Unchecked
+        if role in (BUTTON_ROLE, Qt.ToolTipRole):
+            button = _UNIT_BUTTONS.get(column)
+            if button is not None:
+                button = self._with_presence(button, self._file_state(project, unit, column))
+            if button is None or role == BUTTON_ROLE:
+                return button
+            return button.tooltip
+        if role == PRESENCE_ROLE:
+            return self._file_state(project, unit, column) if column in _FILE_KINDS else None
+        if role == ID_ROLE:
+            return unit.id
+        if role == PROJECT_ROLE:
+            return project
+        if role == UNIT_ROLE:
+            return unit
+        if role == ARCHIVED_ROLE:
+            return project.is_archived
+        if role == UNIT_DONE_ROLE:
+            return self._done.get(unit.id)
+        return None
+
+    def _project_buttons(self, project):
+        if self.has_units(project.id):
+            return _RESIDENTIAL_BUTTONS
+        return _ARCHIVED_PROJECT_BUTTONS if project.is_archived else _PROJECT_BUTTONS
+
+    def _file_state(self, project, unit, column):
+        kind = _FILE_KINDS[column]
+        if unit is None and kind == 'FloorPlan' and self.has_units(project.id):
+            kind = 'MasterFloorPlan'
+        unit_folder = self._unit_folders.get(unit.id, "") if unit is not None else ""
+        return self.presence.state(self._folders.get(project.id), unit_folder, kind), kind
+
+    @staticmethod
+    def _with_presence(button, file_state):
+        state, kind = file_state
+        if state == UNKNOWN:
+            return button
+        if state == MISSING:
+            if kind in ('FloorPlan', 'MasterFloorPlan'):
+                return button._replace(text=_MISSING_TEXT[kind], tooltip=f"No {'master ' if kind == 'MasterFloorPlan' else ''}floor plan yet, click to import a PDF")
+            return button._replace(text=_MISSING_TEXT[kind], tooltip=f"{kind}.docx does not exist")
+        if state == TEMPLATE:
+            return button._replace(text="New", tooltip=f"{button.tooltip} (not opened yet)")
+        modified = datetime.fromtimestamp(state).strftime(f"{DATE_DISPLAY_FORMAT} %H:%M")
+        return button._replace(tooltip=f"{button.tooltip} (modified {modified})")
+
+    def on_presence_changed(self, folder):
+        """
+        Repaints the file buttons of the projects kept in a folder whose files changed.
+        """
+        for project_id in self._folder_projects.get(folder, ()):
+            row = self._rows[project_id]
+            roles = [BUTTON_ROLE, Qt.ToolTipRole, PRESENCE_ROLE]
+            self.dataChanged.emit(
+                self.createIndex(row, INNREGULERING_COLUMN, 0), self.createIndex(row, FLOOR_PLAN_COLUMN, 0), roles
+            )
+            units = self._units.get(project_id)
+            if units:
+                self.dataChanged.emit(
+                    self.createIndex(0, INNREGULERING_COLUMN, project_id),
+                    self.createIndex(len(units) - 1, FLOOR_PLAN_COLUMN, project_id),
+                    roles
+                )
+
+    def project_folder(self, project_id):
+        return self._folders.get(project_id)
+
+    # Patching
+
+    def clear(self):
+        self.beginResetModel()
+        self._projects = []
+        self._rows = {}
+        self._units = {}
+        self._totals = {}
+        self._completed = {}
+        self._done = {}
+        self._sort_keys = {}
+        self._folders = {}
+        self._folder_projects = {}
+        self._unit_folders = {}
+        self._fetching = set()
+        self._stale = set()
+        self.endResetModel()
+
+    def has_project(self, project_id):
+        return project_id in self._rows
+
+    def has_units(self, project_id):
+        """
+        Residential complexes with units are shown with one child row per unit.
+        """
+        return self._totals.get(project_id, 0) > 0
+
+    def units_loaded(self, project_id):
+        return project_id in self._units
+
+    def unit_total(self, project_id):
+        return self._totals.get(project_id, 0)
+
+    def request_units(self, project_ids):
+        """
+        Loads the units of the given projects in the background and builds their rows, skipping
+        projects whose units are loaded or already requested.
+        """
+        projects = []
+        for project_id in project_ids:
+            if project_id in self._rows and project_id not in self._units and project_id not in self._fetching:
+                self._fetching.add(project_id)
+                projects.append(self._projects[self._rows[project_id]])
+        if not projects:
+            return
+        # One request for the main database and one for the archive
+        for archived in (False, True):
+            batch = [project.id for project in projects if project.is_archived == archived]
+            if batch:
+                self.controller.load_units_async(
+                    batch,
+                    on_done=lambda units, ids=batch: self.on_units_loaded(ids, units),
+                    on_error=lambda e, ids=batch: self.on_units_loaded(ids, {}),
+                    archived=archived
+                )
+
+    def on_units_loaded(self, project_ids, units):
+        for project_id in project_ids:
+            self.set_units(project_id, units.get(project_id))
+
+    def set_units(self, project_id, units):
+        """
+        Builds the unit rows of a project whose units were requested. None means loading failed,
+        the project can then be fetched again.
+        """
+        if project_id not in self._fetching:
+            return
+        self._fetching.discard(project_id)
+        row = self._rows.get(project_id)
+        if units is None or row is None:
+            return
+        parent = self.createIndex(row, 0, 0)
+        if units:
+            self.beginInsertRows(parent, 0, len(units) - 1)
+        self._set_units(project_id, units)
+        if units:
+            self.endInsertRows()
+        # The units are newer than the summary the row was shown with
+        self._totals[project_id] = len(units)
+        self._completed[project_id] = sum(1 for unit in units if unit.is_done)
+        self._set_completion_key(project_id)
+        completed_index = self.createIndex(row, COMPLETED_COLUMN, 0)
+        self.dataChanged.emit(completed_index, completed_index, [Qt.DisplayRole, COMPLETED_UNITS_ROLE])
+
+    def project_index(self, project_id):
+        row = self._rows.get(project_id)
+        return QModelIndex() if row is None else self.createIndex(row, 0, 0)
+
+    def append_projects(self, projects, counts=None):
+        """
+        Adds rows for the projects that aren't shown yet, in one insert, and returns those projects.
+        counts maps project ID to (done, total) from unit_completion_counts.
+        """
+        projects = [project for project in projects if project.id not in self._rows]
+        if not projects:
+            return []
+        first = len(self._projects)
+        self.beginInsertRows(QModelIndex(), first, first + len(projects) - 1)
+        self._projects.extend(projects)
+        for row, project in enumerate(projects, first):
+            self._rows[project.id] = row
+            self._add_summary(project, (counts or {}).get(project.id))
+            self._set_sort_keys(project)
+            self._add_folder(project)
+        self.endInsertRows()
+        self.presence.request([self._folders[project.id] for project in projects])
+        return projects
+
+    def insert_project(self, project, row=None, counts=None):
+        """
+        Adds the row for a project at the given position, or at the end. counts is its (done, total).
+        """
+        if project.id in self._rows:
+            row = self.remove_project(project.id)
+        if row is None or row > len(self._projects):
+            row = len(self._projects)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._projects.insert(row, project)
+        self._add_summary(project, counts)
+        self._reindex(row)
+        self._set_sort_keys(project)
+        self._add_folder(project)
+        self.endInsertRows()
+        self.presence.request([self._folders[project.id]])
+
+    def remove_project(self, project_id):
+        """
+        Removes the row of a project and returns its position, or None if it wasn't shown.
+        """
+        row = self._rows.get(project_id)
+        if row is None:
+            return None
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self._projects.pop(row)
+        del self._rows[project_id]
+        self._totals.pop(project_id, None)
+        self._completed.pop(project_id, None)
+        self._sort_keys.pop(project_id, None)
+        self._remove_folder(project_id)
+        self._fetching.discard(project_id)
+        for unit in self._units.pop(project_id, ()):
+            self._done.pop(unit.id, None)
+            self._unit_folders.pop(unit.id, None)
+        self._reindex(row)
+        self.endRemoveRows()
+        return row
+
+    def set_unit_done(self, project_id, unit_id, is_done):
+        """
+        Updates the check state of a unit and its project's completed count. Returns False if nothing changed.
+        """
+        row = self._rows.get(project_id)
+        if row is None or not self.has_units(project_id):
+            return False
+        if project_id in self._units:
+            if unit_id not in self._done or self._done[unit_id] == is_done:
+                return False
+            self._done[unit_id] = is_done
+            unit_row = next(i for i, unit in enumerate(self._units[project_id]) if unit.id == unit_id)
+            unit_index = self.createIndex(unit_row, NAME_COLUMN, project_id)
+            self.dataChanged.emit(unit_index, unit_index, [Qt.CheckStateRole, UNIT_DONE_ROLE])
+        # Without loaded units only the count is known; the database announces real changes only
+        self._completed[project_id] = self._completed.get(project_id, 0) + (1 if is_done else -1)
+        self._set_completion_key(project_id)
+        completed_index = self.createIndex(row, COMPLETED_COLUMN, 0)
+        self.dataChanged.emit(completed_index, completed_index, [Qt.DisplayRole, COMPLETED_UNITS_ROLE])
+        return True
+
+    def on_project_changed(self, event):
+        """
+        Patches only the rows affected by a ChangeEvent instead of reloading.
+        """
+        self.changes += 1
+        if event.kind == ChangeKind.PROJECTS_RELOADED:
+            self.clear()
+        elif event.kind == ChangeKind.UNIT_TOGGLED:
+            self.set_unit_done(event.project_id, event.unit_id, event.is_done)
+        elif event.kind == ChangeKind.PROJECT_DELETED:
+            self.remove_project(event.project_id)
+            self._stale.discard(event.project_id)
+        else:
+            # Added, updated or moved: re-read the project; the proxies decide which tabs show it
+            self.refresh_projects([event.project_id])
+        logger.debug(f"Applied {event.kind.value} for project ID {event.project_id} to the project model.")
+
+    def refresh_projects(self, project_ids):
+        """
+        Reads the given projects back from the database on the next tick and replaces their rows,
+        together with every other project that changes before then.
+        """
+        for project_id in project_ids:
+            if project_id in self._stale:
+                self.coalesced_changes += 1
+            self._stale.add(project_id)
+        self._stale_timer.start()
+
+    def _read_stale_projects(self):
+        project_ids, self._stale = sorted(self._stale), set()
+        if project_ids:
+            self.controller.get_projects_async(
+                project_ids,
+                on_done=lambda result: self.on_projects_loaded(*result)
+            )
+
+    def on_projects_loaded(self, projects, counts):
+        # Rows are replaced in place; deleted projects were already removed by their own event
+        for project in projects:
+            self.insert_project(project, counts=counts.get(project.id))
+
+    def sort_key(self, row):
+        """
+        Default order of project rows: current projects by ID, then archived ones, matching the order pages are read in.
+        """
+        project = self._projects[row]
+        return project.is_archived, project.id
+
+    def column_sort_key(self, row, column):
+        """
+        Sort key of a project row for the given column, computed when the row was added.
+        """
+        return self._sort_keys[self._projects[row].id][column]
+
+    def _set_sort_keys(self, project):
+        default = (project.is_archived, project.id)
+        values = {
+            NAME_COLUMN: natural_key(project.name),
+            NUMBER_COLUMN: natural_key(project.number),
+            CONTRACTOR_COLUMN: natural_key(project.main_contractor),
+            STATUS_COLUMN: project.status.casefold(),
+            EXTRA_COLUMN: natural_key(project.extra),
+            START_DATE_COLUMN: date_key(project.start_date),
+            END_DATE_COLUMN: date_key(project.end_date),
+            WORKER_COLUMN: natural_key(project.worker),
+        }
+        # Button columns have nothing to compare and keep the default order
+        self._sort_keys[project.id] = [(values.get(column, ()),) + default for column in range(len(COLUMNS))]
+        self._set_completion_key(project.id)
+
+    def _set_completion_key(self, project_id):
+        keys = self._sort_keys.get(project_id)
+        if keys is None:
+            return
+        if self.has_units(project_id):
+            # By ratio, then by size so larger complexes come first among equally complete ones
+            total = self._totals[project_id]
+            value = (0, self._completed.get(project_id, 0) / total, -total)
+        else:
+            # Complexes without units, then projects that aren't complexes ("N/A")
+            value = (1 if self._projects[self._rows[project_id]].is_residential_complex else 2,)
+        keys[COMPLETED_COLUMN] = (value,) + keys[COMPLETED_COLUMN][1:]
+
+    def _add_summary(self, project, counts):
+        if not project.is_residential_complex:
+            return
+        if project.units_loaded:
+            self._set_units(project.id, project.units)
+            counts = counts or (sum(1 for unit in project.units if unit.is_done), len(project.units))
+        if counts is not None and counts[1] > 0:
+            self._completed[project.id], self._totals[project.id] = counts
+
+    def _set_units(self, project_id, units):
+        self._units[project_id] = list(units)
+        for unit in units:
+            self._done[unit.id] = unit.is_done
+            self._unit_folders[unit.id] = unit_folder_name(unit)
+
+    def _add_folder(self, project):
+        folder = project_folder(project)
+        self._folders[project.id] = folder
+        self._folder_projects.setdefault(folder, set()).add(project.id)
+
+    def _remove_folder(self, project_id):
+        folder = self._folders.pop(project_id, None)
+        projects = self._folder_projects.get(folder)
+        if projects is not None:
+            projects.discard(project_id)
+            if not projects:
+                del self._folder_projects[folder]
+
+    def _reindex(self, start):
+        for row in range(start, len(self._projects)):
+            self._rows[self._projects[row].id] = row
+
+class ProjectFilterProxyModel(QSortFilterProxyModel):
+    """
+    One tab's view of the shared ProjectTreeModel: project rows with the tab's status, or while
+    searching only the matches, ranked best first. Unit rows of shown projects always pass.
+
+    Sorting by a column uses the keys the source model computed for its rows; column -1 goes back
+    to the default order, which is the search rank while searching.
+    """
+    # Emitted when the user checks or unchecks a unit in this tab: (project, unit, Qt.CheckState)
+    unit_check_changed = pyqtSignal(object, object, int)
+
+    def __init__(self, status_filter=None, parent=None):
+        super().__init__(parent)
+        self.status_filter = status_filter
+        self.search_ranks = None  # project ID -> rank while a search is shown
+        self.sort_column = -1  # Column chosen by the user, -1 for the default order
+        self.setDynamicSortFilter(True)
+
+    def set_search_results(self, project_ids):
+        """
+        Shows only the given projects in the given order; None goes back to showing every project.
+        """
+        self.search_ranks = None if project_ids is None else {project_id: rank for rank, project_id in enumerate(project_ids)}
+        # invalidateFilter reports rows coming and going as inserts and removals; invalidate then re-sorts
+        self.invalidateFilter()
+        self.invalidate()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.sort_column = column
+        # Sorting by column -1 would turn sorting off altogether, the default order is applied in lessThan instead
+        if column < 0:
+            super().sort(NAME_COLUMN, Qt.AscendingOrder)
+        else:
+            super().sort(column, order)
+
+    def setData(self, index, value, role=Qt.EditRole):
+        changed = super().setData(index, value, role)
+        if changed and role == Qt.CheckStateRole:
+            self.unit_check_changed.emit(index.data(PROJECT_ROLE), index.data(UNIT_ROLE), Qt.CheckState(value))
+        return changed
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if source_parent.isValid():
+            return True
+        project = self.sourceModel().index(source_row, 0).data(PROJECT_ROLE)
+        if self.status_filter is not None and project.status != self.status_filter:
+            return False
+        return self.search_ranks is None or project.id in self.search_ranks
+
+    def lessThan(self, left, right):
+        if left.internalId() != 0:
+            # Units keep their order
+            return left.row() < right.row()
+        model = self.sourceModel()
+        if self.sort_column >= 0:
+            return model.column_sort_key(left.row(), self.sort_column) < model.column_sort_key(right.row(), self.sort_column)
+        if self.search_ranks is not None:
+            return self.search_ranks[left.data(ID_ROLE)] < self.search_ranks[right.data(ID_ROLE)]
+        return model.sort_key(left.row()) < model.sort_key(right.row())
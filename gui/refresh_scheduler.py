@@ -0,0 +1,84 @@
+# File: gui/refresh_scheduler.py
+
+from typing import Optional
+from PyQt5.QtCore import QObject, QTimer
+
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+class RefreshScheduler(QObject):
+    """
+    Collects refresh requests of the project tabs and runs them once control returns to the event loop,
+    so a burst of change events costs one refresh per tab. Only visible tabs refresh then; hidden tabs
+    are marked dirty and refresh when they are shown. Tabs implement refresh() and call activate(tab)
+    from their showEvent.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._requested = {}  # Tabs waiting for the next tick, in request order
+        self._dirty = set()  # Hidden tabs that refresh when shown
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._flush)
+        self.requests = 0
+        self.refreshes = 0
+        self.coalesced = 0  # Requests merged into one already waiting for the same tick
+        self.deferred = 0  # Requests for hidden tabs that were already dirty
+
+    def request(self, tab):
+        self.requests += 1
+        if tab in self._requested:
+            self.coalesced += 1
+            return
+        self._requested[tab] = None
+        self._timer.start()
+
+    def activate(self, tab):
+        """
+        Refreshes a tab that became visible if a refresh was held back while it was hidden.
+        """
+        if tab in self._dirty:
+            self._dirty.discard(tab)
+            self._refresh(tab)
+
+    def is_dirty(self, tab) -> bool:
+        return tab in self._dirty or tab in self._requested
+
+    def _flush(self):
+        tabs, self._requested = self._requested, {}
+        for tab in tabs:
+            if tab.isVisible():
+                self._dirty.discard(tab)
+                self._refresh(tab)
+            elif tab in self._dirty:
+                self.deferred += 1
+            else:
+                self._dirty.add(tab)
+
+    def _refresh(self, tab):
+        self.refreshes += 1
+        tab.refresh()
+
+    def stats(self) -> dict:
+        waiting = len(self._requested) + len(self._dirty)
+        return {
+            'requests': self.requests,
+            'refreshes': self.refreshes,
+            'coalesced': self.coalesced,
+            'deferred': self.deferred,
+            'waiting': waiting,
+            'avoided': self.requests - self.refreshes - waiting,
+        }
+
+_scheduler: Optional[RefreshScheduler] = None
+
+def get_refresh_scheduler() -> RefreshScheduler:
+    """
+    Returns the scheduler shared by all tabs, creating it on first use. Must be called from the GUI thread.
+    """
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = RefreshScheduler()
+    return _scheduler
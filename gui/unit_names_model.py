@@ -0,0 +1,168 @@
+# File: gui/unit_names_model.py
+
+import re
+from collections import Counter
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt5.QtGui import QColor
+
+_PLACEHOLDER = re.compile(r"\{([^{}]*)\}")
+_COUNTER_PLACEHOLDER = re.compile(r"i+|n+")
+
+INVALID_NAME_COLOR = QColor(255, 200, 200)
+
+def expand_unit_pattern(pattern, count, units_per_floor=1, first_floor=1):
+    """
+    Generates count unit names from a pattern. {i} is the running number of the unit, {floor} its floor
+    and {n} its number on that floor, with units_per_floor units per floor. Repeating the letter pads the
+    number with zeros, so "A-{floor}{nn}" with 4 units per floor gives A-101 ... A-104, A-201, ...
+    """
+    for placeholder in _PLACEHOLDER.findall(pattern):
+        if placeholder != 'floor' and not _COUNTER_PLACEHOLDER.fullmatch(placeholder):
+            raise ValueError(f"Unknown placeholder '{{{placeholder}}}'. Use {{i}}, {{floor}} or {{n}}.")
+    units_per_floor = max(units_per_floor, 1)
+
+    def name(position):
+        values = {
+            'i': position + 1,
+            'floor': first_floor + position // units_per_floor,
+            'n': position % units_per_floor + 1,
+        }
+        return _PLACEHOLDER.sub(
+            lambda match: str(values['floor']) if match.group(1) == 'floor'
+            else str(values[match.group(1)[0]]).zfill(len(match.group(1))),
+            pattern
+        )
+
+    return [name(position) for position in range(count)]
+
+class UnitNamesModel(QAbstractTableModel):
+    """
+    The unit names of a new residential complex, one row per unit. Names are counted by value as they
+    change, so duplicates are known after every edit without comparing the whole list again; rows with
+    a blank or duplicate name are highlighted.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._names = []
+        self._counts = Counter()  # Stripped name -> rows using it
+        self._duplicates = set()  # Stripped names used by more than one row
+        self._blanks = 0
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._names)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else 1
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        return "Unit Name" if orientation == Qt.Horizontal else section + 1
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsEditable
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        name = self._names[index.row()]
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return name
+        if role in (Qt.BackgroundRole, Qt.ToolTipRole):
+            key = name.strip()
+            if not key:
+                reason = "Unit name is missing"
+            elif key in self._duplicates:
+                reason = "Unit name is used more than once"
+            else:
+                return None
+            return INVALID_NAME_COLOR if role == Qt.BackgroundRole else reason
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.EditRole or not index.isValid():
+            return False
+        value = str(value)
+        if value == self._names[index.row()]:
+            return False
+        self.set_names(index.row(), [value])
+        return True
+
+    def names(self):
+        return [name.strip() for name in self._names]
+
+    def has_duplicates(self):
+        return bool(self._duplicates)
+
+    def duplicate_names(self):
+        return sorted(self._duplicates)
+
+    def blank_count(self):
+        return self._blanks
+
+    def resize(self, count):
+        """
+        Grows or shrinks the list to count rows, keeping the names already entered. New rows are named
+        by their number.
+        """
+        current = len(self._names)
+        if count > current:
+            self.beginInsertRows(QModelIndex(), current, count - 1)
+            for position in range(current, count):
+                name = str(position + 1)
+                self._names.append(name)
+                self._add(name)
+            self.endInsertRows()
+        elif count < current:
+            self.beginRemoveRows(QModelIndex(), count, current - 1)
+            for name in self._names[count:]:
+                self._discard(name)
+            del self._names[count:]
+            self.endRemoveRows()
+        else:
+            return
+        self._refresh_highlights()
+
+    def set_names(self, first_row, names):
+        """
+        Replaces the names from first_row on, growing the list if they run past its end.
+        """
+        if not names:
+            return
+        if first_row + len(names) > len(self._names):
+            self.resize(first_row + len(names))
+        for row, name in enumerate(names, first_row):
+            self._discard(self._names[row])
+            self._names[row] = name
+            self._add(name)
+        self.dataChanged.emit(self.index(first_row, 0), self.index(first_row + len(names) - 1, 0))
+        self._refresh_highlights()
+
+    def _add(self, name):
+        key = name.strip()
+        if not key:
+            self._blanks += 1
+            return
+        self._counts[key] += 1
+        if self._counts[key] == 2:
+            self._duplicates.add(key)
+
+    def _discard(self, name):
+        key = name.strip()
+        if not key:
+            self._blanks -= 1
+            return
+        self._counts[key] -= 1
+        if self._counts[key] == 1:
+            self._duplicates.discard(key)
+        elif self._counts[key] == 0:
+            del self._counts[key]
+
+    def _refresh_highlights(self):
+        # Another row may have become or stopped being a duplicate; only the visible rows are repainted
+        if self._names:
+            self.dataChanged.emit(
+                self.index(0, 0), self.index(len(self._names) - 1, 0), [Qt.BackgroundRole, Qt.ToolTipRole]
+            )
@@ -0,0 +1,107 @@
+# File: gui/widgets/delegates.py
+
+from PyQt5.QtWidgets import (
+    QApplication, QStyle, QStyledItemDelegate, QStyleOptionButton, QStyleOptionToolButton
+)
+from PyQt5.QtGui import QColor
+from PyQt5.QtCore import Qt, QEvent, QModelIndex, QPersistentModelIndex, QPoint, QSize, pyqtSignal
+
+from gui.project_tree_model import BUTTON_ROLE
+
+class ButtonDelegate(QStyledItemDelegate):
+    """
+    Paints cells that have a CellButton in BUTTON_ROLE as push or split buttons and turns clicks on them
+    into signals. Only visible cells are ever painted and no widget or menu exists per row; whoever
+    handles menu_requested builds the menu when it is opened.
+    """
+    clicked = pyqtSignal(QModelIndex)
+    menu_requested = pyqtSignal(QModelIndex, QPoint)  # Global position to open the menu at
+
+    MENU_ARROW_WIDTH = 16
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pressed = None  # QPersistentModelIndex of the button held down
+
+    def paint(self, painter, option, index):
+        button = index.data(BUTTON_ROLE)
+        if button is None:
+            super().paint(painter, option, index)
+            return
+        style = option.widget.style() if option.widget else QApplication.style()
+        state = QStyle.State_Enabled if button.enabled else QStyle.State_None
+        if self._pressed is not None and self._pressed == QPersistentModelIndex(index):
+            state |= QStyle.State_Sunken
+        else:
+            state |= QStyle.State_Raised
+        rect = option.rect.adjusted(1, 1, -1, -1)
+
+        if button.split:
+            tool_button = QStyleOptionToolButton()
+            tool_button.initFrom(option.widget)
+            tool_button.rect = rect
+            tool_button.text = button.text
+            tool_button.state = state
+            tool_button.toolButtonStyle = Qt.ToolButtonTextOnly
+            tool_button.features = QStyleOptionToolButton.MenuButtonPopup | QStyleOptionToolButton.HasMenu
+            tool_button.subControls = QStyle.SC_ToolButton | QStyle.SC_ToolButtonMenu
+            style.drawComplexControl(QStyle.CC_ToolButton, tool_button, painter, option.widget)
+        else:
+            push_button = QStyleOptionButton()
+            push_button.initFrom(option.widget)
+            push_button.rect = rect
+            push_button.text = button.text
+            push_button.state = state
+            if button.color:
+                # Flat colored box like a push button with a background-color style sheet
+                painter.save()
+                color = QColor(button.color)
+                painter.fillRect(rect, color.darker(120) if state & QStyle.State_Sunken else color)
+                if not button.enabled:
+                    painter.fillRect(rect, QColor(255, 255, 255, 128))
+                painter.setPen(option.palette.mid().color())
+                painter.drawRect(rect.adjusted(0, 0, -1, -1))
+                painter.restore()
+                style.drawControl(QStyle.CE_PushButtonLabel, push_button, painter, option.widget)
+            else:
+                style.drawControl(QStyle.CE_PushButton, push_button, painter, option.widget)
+
+    def sizeHint(self, option, index):
+        size = super().sizeHint(option, index)
+        # Every row gets button height so the view can use uniform row heights
+        height = max(size.height(), option.fontMetrics.height() + 10)
+        button = index.data(BUTTON_ROLE)
+        if button is None:
+            return QSize(size.width(), height)
+        width = option.fontMetrics.horizontalAdvance(button.text) + 20
+        if button.split:
+            width += self.MENU_ARROW_WIDTH
+        return QSize(max(size.width(), width), height)
+
+    def editorEvent(self, event, model, option, index):
+        button = index.data(BUTTON_ROLE)
+        if button is None:
+            if event.type() == QEvent.MouseButtonRelease and self._pressed is not None:
+                # Released outside the button that was pressed
+                self._pressed = None
+                option.widget.viewport().update()
+            return super().editorEvent(event, model, option, index)
+        if not button.enabled:
+            return True
+        view = option.widget
+        if event.type() == QEvent.MouseButtonPress and event.button() == Qt.LeftButton:
+            self._pressed = QPersistentModelIndex(index)
+            view.viewport().update(option.rect)
+            return True
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            pressed, self._pressed = self._pressed, None
+            view.viewport().update(option.rect)
+            if pressed != QPersistentModelIndex(index) or not option.rect.contains(event.pos()):
+                return True
+            if button.split and event.pos().x() >= option.rect.right() - self.MENU_ARROW_WIDTH:
+                self.menu_requested.emit(index, view.viewport().mapToGlobal(option.rect.bottomLeft()))
+            else:
+                self.clicked.emit(index)
+            return True
+        # Don't let double clicks on a button expand or collapse the row
+        return event.type() == QEvent.MouseButtonDblClick
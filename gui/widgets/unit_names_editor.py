@@ -0,0 +1,104 @@
+# File: gui/widgets/unit_names_editor.py
+
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QSpinBox, QPushButton, QTableView, QHeaderView,
+    QLabel, QShortcut, QApplication, QMessageBox
+)
+from PyQt5.QtGui import QKeySequence
+from PyQt5.QtCore import Qt, pyqtSignal
+
+from gui.unit_names_model import UnitNamesModel, expand_unit_pattern
+
+class UnitNamesEditor(QWidget):
+    """
+    Edits the unit names of a residential complex in one table, however many units there are. Names
+    can be typed, generated from a pattern or pasted as a column from Excel with Ctrl+V.
+    """
+    # Emitted when pasting added units, with the new number of units
+    count_changed = pyqtSignal(int)
+
+    def __init__(self, max_units=1000, parent=None):
+        super().__init__(parent)
+        self.max_units = max_units
+        self.model = UnitNamesModel(self)
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.setLayout(layout)
+
+        # Pattern generation
+        pattern_layout = QHBoxLayout()
+        self.pattern_input = QLineEdit("{i}")
+        self.pattern_input.setPlaceholderText("e.g. A-{floor}{nn}")
+        self.pattern_input.setToolTip(
+            "{i}: running number, {floor}: floor, {n}: number on the floor. Repeat a letter to pad with zeros."
+        )
+        pattern_layout.addWidget(self.pattern_input)
+        pattern_layout.addWidget(QLabel("Units per floor:"))
+        self.units_per_floor_input = QSpinBox()
+        self.units_per_floor_input.setRange(1, 100)
+        self.units_per_floor_input.setValue(4)
+        pattern_layout.addWidget(self.units_per_floor_input)
+        self.generate_btn = QPushButton("Generate")
+        self.generate_btn.clicked.connect(self.generate_names)
+        pattern_layout.addWidget(self.generate_btn)
+        layout.addLayout(pattern_layout)
+
+        # Unit names, only the visible rows are painted
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.setMinimumHeight(150)
+        layout.addWidget(self.table)
+        paste_shortcut = QShortcut(QKeySequence.Paste, self.table, context=Qt.WidgetShortcut)
+        paste_shortcut.activated.connect(self.paste_names)
+
+        self.status_label = QLabel()
+        self.status_label.setStyleSheet("color: red;")
+        layout.addWidget(self.status_label)
+        self.model.dataChanged.connect(self.update_status)
+        self.model.rowsInserted.connect(self.update_status)
+        self.model.rowsRemoved.connect(self.update_status)
+
+    def set_count(self, count):
+        self.model.resize(count)
+
+    def unit_names(self):
+        return self.model.names()
+
+    def generate_names(self):
+        try:
+            names = expand_unit_pattern(
+                self.pattern_input.text(), self.model.rowCount(), self.units_per_floor_input.value()
+            )
+        except ValueError as e:
+            QMessageBox.warning(self, "Invalid Pattern", str(e))
+            return
+        self.model.set_names(0, names)
+
+    def paste_names(self):
+        """
+        Pastes the first column of the clipboard from the current row down, adding units if needed.
+        """
+        lines = QApplication.clipboard().text().splitlines()
+        while lines and not lines[-1].strip():
+            lines.pop()
+        if not lines:
+            return
+        first_row = max(self.table.currentIndex().row(), 0)
+        names = [line.split("\t")[0].strip() for line in lines][:self.max_units - first_row]
+        count = self.model.rowCount()
+        self.model.set_names(first_row, names)
+        if self.model.rowCount() != count:
+            self.count_changed.emit(self.model.rowCount())
+
+    def update_status(self, *args):
+        problems = []
+        duplicates = self.model.duplicate_names()
+        if duplicates:
+            shown = ", ".join(duplicates[:5]) + (", ..." if len(duplicates) > 5 else "")
+            problems.append(f"Duplicate names: {shown}")
+        if self.model.blank_count():
+            problems.append(f"{self.model.blank_count()} unit(s) without a name")
+        self.status_label.setText("; ".join(problems))
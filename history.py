@@ -0,0 +1,117 @@
+# File: history.py
+import getpass
+import threading
+from configparser import ConfigParser
+from datetime import datetime
+from sqlalchemy import text
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+# Load configuration
+config = ConfigParser()
+config.read('config.ini')
+
+history_config = config['History'] if config.has_section('History') else {}
+HISTORY_BATCH_SIZE = int(history_config.get('batch_size', 50))
+HISTORY_FLUSH_INTERVAL_MS = int(history_config.get('flush_interval_ms', 2000))
+
+def _default_worker():
+    try:
+        return getpass.getuser()
+    except Exception:
+        return ""
+
+HISTORY_WORKER = history_config.get('worker', '') or _default_worker()
+
+# Project attributes whose changes are recorded, in Project field order
+PROJECT_FIELDS = (
+    'name', 'number', 'start_date', 'end_date', 'status', 'is_residential_complex',
+    'number_of_units', 'worker', 'extra', 'main_contractor'
+)
+
+_INSERT_HISTORY = text(
+    "INSERT INTO history (timestamp, entity, entity_id, project_id, field, old_value, new_value, worker) "
+    "VALUES (:timestamp, :entity, :entity_id, :project_id, :field, :old_value, :new_value, :worker)"
+)
+
+def _as_text(value):
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    return str(value)
+
+def history_row(entity, entity_id, project_id, field, old_value=None, new_value=None, timestamp=None):
+    """
+    Builds one history row as a parameter dict for the history table.
+    """
+    return {
+        'timestamp': timestamp or datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'entity': entity,
+        'entity_id': entity_id,
+        'project_id': project_id,
+        'field': field,
+        'old_value': _as_text(old_value),
+        'new_value': _as_text(new_value),
+        'worker': HISTORY_WORKER,
+    }
+
+class HistoryWriter:
+    """
+    Buffers history rows in memory and writes them in batches with one executemany, either when
+    batch_size rows are waiting or flush_interval_ms after the first buffered row.
+    Rows still buffered when the process dies are lost; call flush() before reading history.
+    """
+    def __init__(self, engine, batch_size=HISTORY_BATCH_SIZE, flush_interval_ms=HISTORY_FLUSH_INTERVAL_MS):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self._rows = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # Keeps batches in order when two threads flush at once
+        self._timer = None
+        self.rows_written = 0
+        self.batches_written = 0
+
+    def record(self, rows):
+        rows = list(rows)
+        if not rows:
+            return
+        with self._lock:
+            self._rows.extend(rows)
+            flush_now = len(self._rows) >= self.batch_size
+            if not flush_now and self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if flush_now:
+            self.flush()
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._rows)
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                rows, self._rows = self._rows, []
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            if not rows:
+                return
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(_INSERT_HISTORY, rows)
+                self.rows_written += len(rows)
+                self.batches_written += 1
+                logger.debug(f"Wrote {len(rows)} history rows.")
+            except Exception as e:
+                # Put the rows back so the next flush retries them
+                with self._lock:
+                    self._rows[:0] = rows
+                logger.error(f"Failed to write {len(rows)} history rows: {e}")
+
+    def close(self):
+        self.flush()
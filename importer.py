@@ -0,0 +1,276 @@
+# File: importer.py
+import csv
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import insert
+from database import ProjectModel, UnitModel, HistoryModel, sort_key_values
+from events import ChangeEvent, ChangeKind
+from search_index import reindex_projects
+from history import history_row
+from folders import unit_folder_names
+from project import Project, Unit
+from utils import get_project_folder_name
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+VALID_STATUSES = ("Active", "Awaiting Completion", "Paused", "Completed", "Finished")
+DATE_FORMATS = ("%Y-%m-%d", "%d-%m-%Y", "%d.%m.%Y", "%d/%m/%Y")
+UNIT_SEPARATOR = ";"
+CSV_DELIMITERS = (",", ";", "\t")
+# Units in a CSV file separated by the unit separator itself are listed with this separator instead
+CSV_UNIT_SEPARATOR = ","
+
+# Accepted header spellings, normalized to lower case with underscores
+COLUMN_ALIASES = {
+    "name": "name",
+    "project_name": "name",
+    "number": "number",
+    "project_number": "number",
+    "worker": "worker",
+    "start_date": "start_date",
+    "end_date": "end_date",
+    "status": "status",
+    "main_contractor": "main_contractor",
+    "contractor": "main_contractor",
+    "extra": "extra",
+    "units": "units",
+    "unit_names": "units",
+}
+
+@dataclass
+class ImportReport:
+    rows_read: int = 0
+    projects_inserted: int = 0
+    units_inserted: int = 0
+    rejects: List[Tuple[int, str]] = field(default_factory=list)  # (row number, reason)
+    parse_seconds: float = 0.0
+    insert_seconds: float = 0.0
+    total_seconds: float = 0.0
+    dry_run: bool = False
+
+    @property
+    def rows_per_second(self):
+        return self.rows_read / self.total_seconds if self.total_seconds else 0.0
+
+    def summary(self):
+        action = "Validated" if self.dry_run else "Imported"
+        return (
+            f"{action} {self.projects_inserted} projects ({self.units_inserted} units) from {self.rows_read} rows, "
+            f"{len(self.rejects)} rejected. Parse {self.parse_seconds:.2f}s, insert {self.insert_seconds:.2f}s, "
+            f"total {self.total_seconds:.2f}s ({self.rows_per_second:.0f} rows/s)."
+        )
+
+def _normalize_header(header):
+    key = str(header or "").strip().lower().replace(" ", "_").replace("-", "_")
+    return COLUMN_ALIASES.get(key)
+
+def _iter_csv(path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        # Excel with a Norwegian locale writes ';' separated files, so pick the most common separator in the header
+        header_line = f.readline()
+        f.seek(0)
+        delimiter = max(CSV_DELIMITERS, key=header_line.count)
+        reader = csv.reader(f, delimiter=delimiter)
+        headers = next(reader, [])
+        for row_number, row in _rows_with_headers(headers, reader, first_row=2):
+            if delimiter == UNIT_SEPARATOR and row.get("units"):
+                row["units"] = row["units"].replace(CSV_UNIT_SEPARATOR, UNIT_SEPARATOR)
+            yield row_number, row
+
+def _iter_xlsx(path):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        headers = next(rows, ())
+        yield from _rows_with_headers(headers, rows, first_row=2)
+    finally:
+        workbook.close()
+
+def _rows_with_headers(headers, rows, first_row):
+    """
+    Pairs the values of each non-empty row with the recognized columns. Values past the last
+    header are kept under None, like csv.DictReader does, so validate_row can reject the row.
+    """
+    columns = [_normalize_header(header) for header in headers]
+    for row_number, values in enumerate(rows, start=first_row):
+        if not any(value not in (None, "") for value in values):
+            continue
+        row = {column: value for column, value in zip(columns, values) if column}
+        extra_values = [value for value in values[len(columns):] if value not in (None, "")]
+        if extra_values:
+            row[None] = extra_values
+        yield row_number, row
+
+def iter_rows(path):
+    """
+    Streams (row number, {column: value}) pairs from a CSV or XLSX file.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        return _iter_csv(path)
+    if extension in (".xlsx", ".xlsm"):
+        return _iter_xlsx(path)
+    raise ValueError(f"Unsupported file type '{extension}'. Use .csv or .xlsx.")
+
+def _has_value(value):
+    return isinstance(value, (date, datetime)) or bool(_text(value))
+
+def _text(value):
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+def _parse_date(value, column):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    text_value = _text(value)
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(text_value, date_format).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid {column} '{text_value}'")
+
+def validate_row(row):
+    """
+    Validates one input row and returns (project values, unit names).
+    Raises ValueError with the reason when the row must be rejected.
+    """
+    if row.get(None):
+        raise ValueError(f"{len(row[None])} more values than columns; quote values containing the separator")
+    name = _text(row.get("name"))
+    number = _text(row.get("number"))
+    if not name and not number:
+        raise ValueError("At least one of Project Name or Project Number must be provided")
+    worker = _text(row.get("worker"))
+    if not worker:
+        raise ValueError("Worker is required")
+    if not _has_value(row.get("start_date")):
+        raise ValueError("Start Date is required")
+    start_date = _parse_date(row.get("start_date"), "start_date")
+    end_date = _parse_date(row.get("end_date"), "end_date") if _has_value(row.get("end_date")) else None
+    status = _text(row.get("status")) or "Active"
+    if status not in VALID_STATUSES:
+        raise ValueError(f"Invalid status '{status}'")
+    units = [unit.strip() for unit in _text(row.get("units")).split(UNIT_SEPARATOR) if unit.strip()]
+    if len(units) != len(set(units)):
+        raise ValueError("Unit names must be unique")
+    main_contractor = _text(row.get("main_contractor")) or None
+    project_values = {
+        "name": name,
+        "number": number,
+        "start_date": start_date,
+        "end_date": end_date,
+        "status": status,
+        "is_residential_complex": bool(units),
+        "number_of_units": len(units),
+        "worker": worker,
+        "extra": _text(row.get("extra")),
+        "main_contractor": main_contractor,
+        "folder": get_project_folder_name(Project(name=name, number=number, main_contractor=main_contractor)),
+        **sort_key_values(name, number, main_contractor, worker),
+    }
+    return project_values, units
+
+def import_projects(db, path, batch_size=500, dry_run=False):
+    """
+    Imports projects and their units from a CSV or XLSX file in a single transaction.
+    Invalid rows are skipped and listed in the report; a database error rolls back the whole import.
+    """
+    report = ImportReport(dry_run=dry_run)
+    started = time.perf_counter()
+    project_rows = []
+    unit_rows = []
+    history_rows = []
+    first_id: Optional[int] = None
+    next_id: Optional[int] = None
+
+    def flush(conn):
+        if not project_rows and not unit_rows and not history_rows:
+            return
+        flush_started = time.perf_counter()
+        if project_rows:
+            conn.execute(insert(ProjectModel.__table__), project_rows)
+        if unit_rows:
+            conn.execute(insert(UnitModel.__table__), unit_rows)
+        if history_rows:
+            conn.execute(insert(HistoryModel.__table__), history_rows)
+        report.insert_seconds += time.perf_counter() - flush_started
+        project_rows.clear()
+        unit_rows.clear()
+        history_rows.clear()
+
+    try:
+        with db.engine.begin() as conn:
+            for row_number, row in iter_rows(path):
+                report.rows_read += 1
+                try:
+                    project_values, units = validate_row(row)
+                except ValueError as e:
+                    report.rejects.append((row_number, str(e)))
+                    continue
+                report.projects_inserted += 1
+                report.units_inserted += len(units)
+                if dry_run:
+                    continue
+                if next_id is None:
+                    # The first insert takes the write lock, so the following ids can be assigned up front
+                    insert_started = time.perf_counter()
+                    project_id = conn.execute(insert(ProjectModel.__table__), project_values).inserted_primary_key[0]
+                    first_id = project_id
+                    report.insert_seconds += time.perf_counter() - insert_started
+                    next_id = project_id + 1
+                else:
+                    project_id = next_id
+                    next_id += 1
+                    project_rows.append(dict(project_values, id=project_id))
+                unit_rows.extend(
+                    {"project_id": project_id, "name": unit, "is_done": False, "folder": folder}
+                    for unit, folder in zip(units, unit_folder_names([Unit(name=unit) for unit in units]))
+                )
+                # Imported rows go into the history with the rest of the import, not through the buffered writer
+                history_rows.append(history_row('project', project_id, project_id, 'created', new_value=project_values["name"]))
+                if len(project_rows) >= batch_size or len(unit_rows) >= batch_size * 10:
+                    flush(conn)
+            flush(conn)
+            if first_id is not None:
+                index_started = time.perf_counter()
+                reindex_projects(conn, range(first_id, next_id))
+                report.insert_seconds += time.perf_counter() - index_started
+    except Exception as e:
+        logger.error(f"Bulk import from {path} failed and was rolled back: {e}")
+        raise
+
+    report.total_seconds = time.perf_counter() - started
+    report.parse_seconds = report.total_seconds - report.insert_seconds
+    for row_number, reason in report.rejects:
+        logger.warning(f"Rejected row {row_number} in {path}: {reason}")
+    logger.info(f"Bulk import from {path}: {report.summary()}")
+    if report.projects_inserted and not dry_run:
+        db.project_changed.emit(ChangeEvent(ChangeKind.PROJECTS_RELOADED))
+    return report
+
+if __name__ == "__main__":
+    import sys
+    from database import Database
+
+    if len(sys.argv) < 2:
+        print("Usage: python importer.py <file.csv|file.xlsx> [--dry-run]")
+        sys.exit(1)
+    database = Database()
+    result = import_projects(database, sys.argv[1], dry_run="--dry-run" in sys.argv[2:])
+    print(result.summary())
+    for row_number, reason in result.rejects:
+        print(f"  row {row_number}: {reason}")
+    database.close()
@@ -2,51 +2,102 @@
 
 import sys
 import os
-from PyQt5.QtWidgets import QApplication, QMainWindow, QTabWidget, QMessageBox, QFileDialog
-from database import Database
-from gui.overview_tab import OverviewTab
-from gui.completed_projects_tab import CompletedProjectsTab
-from gui.finished_projects_tab import FinishedProjectsTab
-from gui.detailed_view_tab import DetailedViewTab
+import importlib
+from PyQt5.QtWidgets import QApplication, QMainWindow, QTabWidget, QMessageBox, QFileDialog, QWidget, QVBoxLayout
 from logger import get_logger
 
 logger = get_logger(__name__)
 
+# (tab title, MainWindow attribute, module, class); a tab is built the first time it is shown
+TABS = [
+    ("  Project Overview  ", 'overview_tab', 'gui.overview_tab', 'OverviewTab'),
+    ("  Completed Projects  ", 'completed_projects_tab', 'gui.completed_projects_tab', 'CompletedProjectsTab'),
+    ("  Finished Projects  ", 'finished_projects_tab', 'gui.finished_projects_tab', 'FinishedProjectsTab'),
+    ("  Detailed Project View  ", 'detailed_view_tab', 'gui.detailed_view_tab', 'DetailedViewTab'),
+]
+
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, deferred=False):
+        """
+        With deferred, only the empty window is built here so it can be shown at once; the database
+        and the first tab follow in start(). Otherwise start() runs right away.
+        """
         super().__init__()
         self.setWindowTitle("Boligventilasjon Project Management")
         self.resize(1200, 800)
 
-        self.db = Database()
+        self.db = None
+        self.project_model = None
 
+        # Each tab page starts as an empty container that receives the real tab on first activation
         self.tabs = QTabWidget()
         self.setCentralWidget(self.tabs)
-
-        # Initialize tabs
-        self.overview_tab = OverviewTab(self.db)
-        self.completed_projects_tab = CompletedProjectsTab(self.db)
-        self.finished_projects_tab = FinishedProjectsTab(self.db)
-        self.detailed_view_tab = DetailedViewTab(self.db)
-
-        self.tabs.addTab(self.overview_tab, "  Project Overview  ")
-        self.tabs.addTab(self.completed_projects_tab, "  Completed Projects  ")
-        self.tabs.addTab(self.finished_projects_tab, "  Finished Projects  ")
-        self.tabs.addTab(self.detailed_view_tab, "  Detailed Project View  ")
+        for title, attribute, _, _ in TABS:
+            setattr(self, attribute, None)
+            container = QWidget()
+            container.setLayout(QVBoxLayout())
+            container.layout().setContentsMargins(0, 0, 0, 0)
+            self.tabs.addTab(container, title)
 
         self.setup_menu_bar()
         self.apply_stylesheet()
+        if not deferred:
+            self.start()
+
+    def start(self):
+        """
+        Opens the database and builds the current tab. SQLAlchemy and the tab modules are imported here.
+        """
+        from database import Database
+        from controllers.project_controller import ProjectController
+        from gui.project_tree_model import ProjectTreeModel
+
+        self.db = Database()
+
+        # One project model for all tabs, each tab shows the projects with its status
+        self.project_model = ProjectTreeModel(ProjectController(self.db), self)
+
+        self.tabs.currentChanged.connect(self.ensure_tab)
+        self.ensure_tab(self.tabs.currentIndex())
+        self.file_menu.setEnabled(True)
+
+    def ensure_tab(self, index):
+        """
+        Builds the tab at index if it doesn't exist yet and returns it.
+        """
+        _, attribute, module_name, class_name = TABS[index]
+        tab = getattr(self, attribute)
+        if tab is None:
+            tab_class = getattr(importlib.import_module(module_name), class_name)
+            tab = tab_class(self.db, self.project_model)
+            setattr(self, attribute, tab)
+            self.tabs.widget(index).layout().addWidget(tab)
+            logger.info(f"Built the '{tab.title}' tab.")
+        return tab
 
     def setup_menu_bar(self):
         menu_bar = self.menuBar()
 
-        # File Menu
-        file_menu = menu_bar.addMenu("File")
+        # File Menu, usable once the database is open
+        file_menu = self.file_menu = menu_bar.addMenu("File")
+        file_menu.setEnabled(False)
 
         # Setup Template Action
         setup_template_action = file_menu.addAction("Setup Template")
         setup_template_action.triggered.connect(self.setup_template)
 
+        # Import Projects Action
+        import_projects_action = file_menu.addAction("Import Projects...")
+        import_projects_action.triggered.connect(self.import_projects)
+
+        # Archive Finished Projects Action
+        archive_projects_action = file_menu.addAction("Archive Finished Projects...")
+        archive_projects_action.triggered.connect(self.archive_projects)
+
+        # Template Storage Report Action
+        template_storage_action = file_menu.addAction("Template Storage Report")
+        template_storage_action.triggered.connect(self.template_storage_report)
+
     def setup_template(self):
         """
         Handles the Setup Template functionality:
@@ -121,6 +172,99 @@ class MainWindow(QMainWindow):
             QMessageBox.critical(self, "Error", f"Failed to copy template files:\n{str(e)}")
             logger.error(f"Failed to copy templates: {e}")
 
+    def import_projects(self):
+        """
+        Bulk imports projects and units from a CSV or XLSX file and reports the result.
+        """
+        from importer import import_projects
+
+        file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            "Import Projects",
+            "",
+            "Project Lists (*.csv *.xlsx)"
+        )
+        if not file_path:
+            return
+
+        # Runs on the database worker; the window stays responsive and the report follows when it is done
+        self.start_background_task()
+        self.project_model.controller.submit(
+            import_projects, self.db, file_path,
+            on_done=self.on_projects_imported,
+            on_error=lambda e: self.on_import_failed(file_path, e)
+        )
+
+    def on_projects_imported(self, report):
+        self.finish_background_task()
+        message = report.summary()
+        if report.rejects:
+            rejected = "\n".join(f"Row {row_number}: {reason}" for row_number, reason in report.rejects[:20])
+            if len(report.rejects) > 20:
+                rejected += f"\n... and {len(report.rejects) - 20} more (see the log)"
+            message += f"\n\nRejected rows:\n{rejected}"
+        QMessageBox.information(self, "Import Complete", message)
+
+    def on_import_failed(self, file_path, error):
+        self.finish_background_task()
+        QMessageBox.critical(self, "Import Error", f"Import failed and nothing was saved:\n{str(error)}")
+        logger.error(f"Failed to import projects from {file_path}: {error}")
+
+    def archive_projects(self):
+        """
+        Moves old Finished projects to the archive database after confirmation.
+        """
+        from archive import archive_finished_projects, ARCHIVE_AFTER_DAYS
+
+        reply = QMessageBox.question(
+            self,
+            "Archive Finished Projects",
+            f"Move Finished projects that ended more than {ARCHIVE_AFTER_DAYS} days ago to the archive?\n"
+            "Archived projects are still shown in the Finished tab and in search, but can no longer be changed.",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if reply != QMessageBox.Yes:
+            return
+        self.start_background_task()
+        self.project_model.controller.submit(
+            archive_finished_projects, self.db,
+            on_done=self.on_projects_archived,
+            on_error=self.on_archive_failed
+        )
+
+    def on_projects_archived(self, moved):
+        self.finish_background_task()
+        QMessageBox.information(self, "Archive Complete", f"Archived {moved} projects.")
+
+    def on_archive_failed(self, error):
+        self.finish_background_task()
+        QMessageBox.critical(self, "Archive Error", f"Archiving failed and nothing was moved:\n{str(error)}")
+        logger.error(f"Failed to archive Finished projects: {error}")
+
+    def start_background_task(self):
+        # The File menu stays disabled until the task is done, so an import or archive run can't be started twice
+        self.file_menu.setEnabled(False)
+        self.statusBar().showMessage("Loading...")
+
+    def finish_background_task(self):
+        self.file_menu.setEnabled(True)
+        self.statusBar().clearMessage()
+
+    def template_storage_report(self):
+        """
+        Shows how many project documents are still served from the template store and the space that saves.
+        """
+        from template_store import storage_report
+
+        try:
+            report = storage_report()
+        except Exception as e:
+            QMessageBox.critical(self, "Template Storage", f"Failed to read the template store:\n{str(e)}")
+            logger.error(f"Failed to build the template storage report: {e}")
+            return
+        logger.info(f"Template storage: {report.summary()}")
+        QMessageBox.information(self, "Template Storage", report.summary())
+
     def apply_stylesheet(self):
         """
         Applies a custom stylesheet to highlight the selected tab with a light blueish color
@@ -155,13 +299,30 @@ class MainWindow(QMainWindow):
         self.tabs.setStyleSheet(stylesheet)
 
     def closeEvent(self, event):
+        if self.db is None:
+            event.accept()
+            return
+        from controllers.db_executor import shutdown_executor
+        from gui.refresh_scheduler import get_refresh_scheduler
+        from gui.presence_index import get_presence_index
+
+        logger.info(
+            f"Tab refreshes: {get_refresh_scheduler().stats()}; project model applied {self.project_model.changes} changes, "
+            f"{self.project_model.coalesced_changes} merged into pending reads."
+        )
+        # Let queued writes finish before the database goes away
+        shutdown_executor(self.db)
+        get_presence_index().shutdown()
         self.db.close()
         event.accept()
 
 def main():
     app = QApplication(sys.argv)
-    window = MainWindow()
+    window = MainWindow(deferred=True)
     window.show()
+    # Paint the empty window before the database is opened
+    app.processEvents()
+    window.start()
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
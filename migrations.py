@@ -0,0 +1,263 @@
+# File: migrations.py
+import os
+from datetime import datetime
+from sqlalchemy import text
+from search_index import create_search_table, reindex_projects
+from history import history_row
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+def _add_lookup_indexes(conn):
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_projects_status ON projects (status)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_projects_number ON projects (number)"))
+    # Older databases may hold duplicate unit names; keep the first of each before enforcing uniqueness,
+    # marked done if any of its duplicates was
+    first_units = "SELECT MIN(id) FROM units GROUP BY project_id, name"
+    duplicate_ids = [row[0] for row in conn.execute(text(f"SELECT id FROM units WHERE id NOT IN ({first_units})"))]
+    if duplicate_ids:
+        conn.execute(text(
+            f"UPDATE units SET is_done = 1 WHERE id IN ({first_units} HAVING MAX(COALESCE(is_done, 0)) = 1)"
+        ))
+        conn.execute(text(f"DELETE FROM units WHERE id NOT IN ({first_units})"))
+        logger.warning(
+            f"Removed {len(duplicate_ids)} duplicate unit rows before adding unique index: ids {duplicate_ids}."
+        )
+    conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS uq_units_project_name ON units (project_id, name)"))
+
+def _add_search_index(conn):
+    create_search_table(conn)
+    reindex_projects(conn)
+
+def _add_unit_completion_index(conn):
+    # Covers the per-project (done, total) aggregate, so it never touches the units table itself
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_units_project_done ON units (project_id, is_done)"))
+
+def _use_autoincrement_ids(conn):
+    # Without AUTOINCREMENT SQLite reuses the largest id once its row is deleted, which would let new
+    # projects and units take the ids of archived ones. Rebuild both tables from the current models.
+    if "AUTOINCREMENT" in (conn.execute(text("SELECT sql FROM sqlite_master WHERE name = 'projects'")).scalar() or "").upper():
+        return
+    for index_name in ("ix_projects_status", "ix_projects_number", "uq_units_project_name", "ix_units_project_done"):
+        conn.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+    conn.execute(text("ALTER TABLE units RENAME TO units_old"))
+    conn.execute(text("ALTER TABLE projects RENAME TO projects_old"))
+    from database import Base  # Imported here, database imports this module
+
+    tables = [Base.metadata.tables['projects'], Base.metadata.tables['units']]
+    Base.metadata.create_all(conn, tables=tables)
+    for table in tables:
+        old_columns = {row[1] for row in conn.execute(text(f"PRAGMA table_info({table.name}_old)"))}
+        columns = ", ".join(column.name for column in table.columns if column.name in old_columns)
+        conn.execute(text(f"INSERT INTO {table.name} ({columns}) SELECT {columns} FROM {table.name}_old"))
+    conn.execute(text("DROP TABLE units_old"))
+    conn.execute(text("DROP TABLE projects_old"))
+
+def _normalize_dates(conn):
+    # Dates are read as datetime.date now, so every stored value must be 'YYYY-MM-DD'. Older rows may hold
+    # other formats or empty end dates; the original text of anything rewritten is kept in the history.
+    iso_pattern = "[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]"
+    conn.execute(text("UPDATE projects SET end_date = NULL WHERE TRIM(end_date) = ''"))
+    rows = conn.execute(text(
+        f"SELECT id, start_date, end_date FROM projects WHERE start_date NOT GLOB '{iso_pattern}' "
+        f"OR (end_date IS NOT NULL AND end_date NOT GLOB '{iso_pattern}')"
+    )).fetchall()
+    history_rows = []
+    for project_id, start_date, end_date in rows:
+        for column, value in (("start_date", start_date), ("end_date", end_date)):
+            new_value = _parse_legacy_date(value) if value is not None else None
+            if value is None or new_value == value:
+                continue
+            if new_value is None:
+                # An unreadable start date can't be kept in a DATE column; fall back to today and keep the original
+                new_value = None if column == "end_date" else datetime.now().date().isoformat()
+                logger.warning(f"Project ID {project_id} has an unreadable {column} '{value}', replaced by {new_value}.")
+            conn.execute(text(f"UPDATE projects SET {column} = :value WHERE id = :id"), {'value': new_value, 'id': project_id})
+            history_rows.append(history_row('project', project_id, project_id, column, value, new_value))
+    if history_rows:
+        conn.execute(text(
+            "INSERT INTO history (timestamp, entity, entity_id, project_id, field, old_value, new_value, worker) "
+            "VALUES (:timestamp, :entity, :entity_id, :project_id, :field, :old_value, :new_value, :worker)"
+        ), history_rows)
+        logger.info(f"Normalized {len(history_rows)} stored dates to YYYY-MM-DD.")
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_projects_start_date ON projects (start_date)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_projects_end_date ON projects (end_date)"))
+
+def _parse_legacy_date(value):
+    for date_format in ("%Y-%m-%d", "%d-%m-%Y", "%d.%m.%Y", "%d/%m/%Y", "%Y-%m-%d %H:%M:%S"):
+        try:
+            return datetime.strptime(str(value).strip(), date_format).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+def _table_columns(conn, table, schema='main'):
+    return {row[1] for row in conn.execute(text(f"PRAGMA {schema}.table_info({table})"))}
+
+def _add_folder_columns(conn, schema='main'):
+    for table in ('projects', 'units'):
+        if 'folder' not in _table_columns(conn, table, schema):
+            conn.execute(text(f"ALTER TABLE {schema}.{table} ADD COLUMN folder VARCHAR"))
+
+def _backfill_folders(conn, schema='main'):
+    # Folders used to be derived from the project's fields on every access, so a project whose main contractor,
+    # name or number changed since lost its folder. Store the folder each project has on disk now; projects
+    # without one get the name their folder would be created with.
+    from folders import match_project_folder
+    from project import Project
+    from utils import get_project_dir, get_project_folder_name, sanitize_filename
+
+    project_dir = get_project_dir()
+    existing = {}
+    if os.path.isdir(project_dir):
+        existing = {
+            entry.name.casefold(): entry.name for entry in os.scandir(project_dir)
+            if entry.is_dir() and not entry.name.startswith('.')
+        }
+    rows = conn.execute(text(f"SELECT id, name, number, main_contractor FROM {schema}.projects WHERE folder IS NULL")).fetchall()
+    updates = []
+    matched = 0
+    for project_id, name, number, main_contractor in rows:
+        folder = match_project_folder(name, number, main_contractor, existing)
+        if folder is None:
+            folder = get_project_folder_name(Project(name=name, number=number, main_contractor=main_contractor))
+        else:
+            matched += 1
+        updates.append({'id': project_id, 'folder': folder})
+    if updates:
+        conn.execute(text(f"UPDATE {schema}.projects SET folder = :folder WHERE id = :id"), updates)
+    # Unit folders were always named after the unit
+    unit_rows = conn.execute(text(f"SELECT id, name FROM {schema}.units WHERE folder IS NULL")).fetchall()
+    if unit_rows:
+        conn.execute(
+            text(f"UPDATE {schema}.units SET folder = :folder WHERE id = :id"),
+            [{'id': unit_id, 'folder': sanitize_filename(name)} for unit_id, name in unit_rows]
+        )
+    logger.info(
+        f"Stored the folders of {len(rows)} projects in {schema}, {matched} matched to existing folders, "
+        f"and of {len(unit_rows)} units."
+    )
+
+def _add_folder_paths(conn):
+    _add_folder_columns(conn)
+    _backfill_folders(conn)
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_projects_folder ON projects (folder)"))
+
+def _add_sort_key_columns(conn, schema='main'):
+    # Pages are sorted by stored natural sort keys, so SQLite can walk an index instead of sorting every row
+    from database import SORT_KEY_COLUMNS  # Imported here, database imports this module
+    from utils import natural_sort_key
+
+    existing = _table_columns(conn, 'projects', schema)
+    for key_column in SORT_KEY_COLUMNS.values():
+        if key_column not in existing:
+            conn.execute(text(f"ALTER TABLE {schema}.projects ADD COLUMN {key_column} VARCHAR"))
+    columns = ", ".join(SORT_KEY_COLUMNS)
+    missing = " OR ".join(f"{key_column} IS NULL" for key_column in SORT_KEY_COLUMNS.values())
+    rows = conn.execute(text(f"SELECT id, {columns} FROM {schema}.projects WHERE {missing}")).fetchall()
+    if rows:
+        assignments = ", ".join(f"{key_column} = :{key_column}" for key_column in SORT_KEY_COLUMNS.values())
+        conn.execute(text(f"UPDATE {schema}.projects SET {assignments} WHERE id = :id"), [
+            dict({key_column: natural_sort_key(value) for value, key_column in zip(row[1:], SORT_KEY_COLUMNS.values())}, id=row[0])
+            for row in rows
+        ])
+    for key_column in SORT_KEY_COLUMNS.values():
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {schema}.ix_projects_{key_column} ON projects ({key_column})"))
+    logger.info(f"Stored the sort keys of {len(rows)} projects in {schema}.")
+
+def upgrade_archive(conn, schema):
+    """
+    Brings the tables of an attached archive written by an older version up to the current models.
+    Must run outside of a transaction.
+    """
+    if 'folder' not in _table_columns(conn, 'projects', schema):
+        with conn.begin():
+            _add_folder_columns(conn, schema)
+            _backfill_folders(conn, schema)
+    if 'name_sort' not in _table_columns(conn, 'projects', schema):
+        with conn.begin():
+            _add_sort_key_columns(conn, schema)
+
+# (version, description, upgrade function). Versions are stored in PRAGMA user_version and must only grow.
+# Each migration runs in an explicit transaction, but should still be safe to re-run.
+MIGRATIONS = [
+    (1, "Add lookup indexes on projects and unique unit names per project", _add_lookup_indexes),
+    (2, "Add full-text search index over projects and unit names", _add_search_index),
+    (3, "Add covering index for unit completion counts", _add_unit_completion_index),
+    (4, "Never reuse project and unit ids", _use_autoincrement_ids),
+    (5, "Store project dates as YYYY-MM-DD and index them", _normalize_dates),
+    (6, "Store the folder of every project and unit", _add_folder_paths),
+    (7, "Store and index natural sort keys of the sortable text columns", _add_sort_key_columns),
+]
+
+# Queries the application runs on every refresh, with the indexes each one may use
+HOT_QUERIES = [
+    ("projects by status", "SELECT * FROM projects WHERE status = 'Active'", ("ix_projects_status",)),
+    ("projects by number", "SELECT * FROM projects WHERE number = '1'", ("ix_projects_number",)),
+    ("unit by project and name", "SELECT * FROM units WHERE project_id = 1 AND name = 'A'", ("uq_units_project_name",)),
+    ("units for loaded projects", "SELECT * FROM units WHERE project_id IN (1, 2, 3)",
+     ("uq_units_project_name", "ix_units_project_done")),
+    ("unit completion counts",
+     "SELECT project_id, SUM(CASE WHEN is_done = 1 THEN 1 ELSE 0 END), COUNT(id) FROM units GROUP BY project_id",
+     ("ix_units_project_done",)),
+    ("projects started in a period", "SELECT * FROM projects WHERE start_date BETWEEN '2024-01-01' AND '2024-03-31'",
+     ("ix_projects_start_date",)),
+    ("projects finished in a period",
+     "SELECT * FROM projects WHERE status = 'Finished' AND end_date BETWEEN '2023-01-01' AND '2023-12-31'",
+     ("ix_projects_end_date", "ix_projects_status")),
+    ("projects page by name",
+     "SELECT * FROM projects WHERE (name_sort, id) > ('1a', 1) ORDER BY name_sort, id LIMIT 101",
+     ("ix_projects_name_sort",)),
+    ("projects in folder", "SELECT COUNT(id) FROM projects WHERE folder = 'A - 1'", ("ix_projects_folder",)),
+    ("history for project", "SELECT * FROM history WHERE project_id = 1 ORDER BY id DESC LIMIT 200", ("ix_history_project",)),
+    ("history since", "SELECT * FROM history WHERE timestamp >= '2024-01-01' ORDER BY timestamp, id LIMIT 1000",
+     ("ix_history_timestamp",)),
+]
+
+def get_schema_version(conn):
+    return conn.execute(text("PRAGMA user_version")).scalar()
+
+def run_migrations(engine):
+    """
+    Upgrades the database schema in place to the latest version in MIGRATIONS.
+    """
+    with engine.connect() as conn:
+        current = get_schema_version(conn)
+    for version, description, upgrade in MIGRATIONS:
+        if version <= current:
+            continue
+        try:
+            with engine.begin() as conn:
+                # pysqlite only opens transactions for DML, so begin explicitly to keep DDL in the same transaction
+                conn.exec_driver_sql("BEGIN")
+                upgrade(conn)
+                conn.execute(text(f"PRAGMA user_version = {int(version)}"))
+            logger.info(f"Applied migration {version}: {description}")
+        except Exception as e:
+            logger.error(f"Migration {version} failed: {e}")
+            raise
+    return max([current] + [version for version, _, _ in MIGRATIONS])
+
+def check_query_plans(engine):
+    """
+    Runs EXPLAIN QUERY PLAN for each hot query and reports whether it hits one of its expected indexes.
+    Returns a list of (label, uses_index, plan) tuples.
+    """
+    results = []
+    with engine.connect() as conn:
+        for label, sql, index_names in HOT_QUERIES:
+            plan = " | ".join(row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+            uses_index = any(index_name in plan for index_name in index_names)
+            if not uses_index:
+                logger.warning(f"Query '{label}' does not use any of {', '.join(index_names)}: {plan}")
+            results.append((label, uses_index, plan))
+    return results
+
+if __name__ == "__main__":
+    from sqlalchemy import create_engine
+    from database import db_path
+
+    engine = create_engine(f'sqlite:///{db_path}')
+    print(f"Schema version: {run_migrations(engine)}")
+    for label, uses_index, plan in check_query_plans(engine):
+        print(f"[{'OK' if uses_index else 'SCAN'}] {label}: {plan}")
@@ -1,24 +1,54 @@
 # File: project.py
 from dataclasses import dataclass, field
-from typing import Optional, List
+from datetime import date
+from typing import Optional, List, Tuple, Any
+
+DATE_DISPLAY_FORMAT = "%d-%m-%Y"
+
+def format_date(value: Optional[date]) -> str:
+    return value.strftime(DATE_DISPLAY_FORMAT) if value else ""
 
 @dataclass
 class Unit:
     id: Optional[int] = field(default=None)
     name: str = ""
     is_done: bool = False
+    folder: str = ""  # Folder of the unit relative to its project folder, kept when the unit is renamed
 
 @dataclass
 class Project:
     id: Optional[int] = field(default=None)
     name: str = ""
     number: str = ""
-    start_date: str = ""
-    end_date: Optional[str] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
     status: str = ""
     is_residential_complex: bool = False
     number_of_units: int = 0
     worker: str = ""
     extra: str = ""
     main_contractor: Optional[str] = None  # New Optional Attribute
-    units: List[str] = field(default_factory=list)  # List of Unit Names
+    units: List[Unit] = field(default_factory=list)  # List of Unit Objects
+    folder: str = ""  # Folder of the project relative to the project directory, empty until saved
+    is_archived: bool = False  # Read from the archive database; archived projects are read-only
+    units_loaded: bool = True  # False when read without units; units is empty then and must not be saved
+    # Display forms of the dates, formatted once when the project is read from the database
+    start_date_text: str = ""
+    end_date_text: str = ""
+
+@dataclass
+class ProjectPage:
+    projects: List[Project] = field(default_factory=list)
+    next_cursor: Optional[Tuple[Any, int]] = None  # (sort value, id) of the last row, None on the last page
+
+@dataclass
+class HistoryEntry:
+    id: Optional[int] = field(default=None)
+    timestamp: str = ""  # 'YYYY-MM-DD HH:MM:SS', local time
+    entity: str = ""  # 'project' or 'unit'
+    entity_id: Optional[int] = None
+    project_id: Optional[int] = None
+    field_name: str = ""  # Changed attribute, or 'created' / 'deleted'
+    old_value: Optional[str] = None
+    new_value: Optional[str] = None
+    worker: str = ""  # Who made the change
@@ -0,0 +1,193 @@
+# File: scaffold.py
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from configparser import ConfigParser
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Tuple
+
+from utils import get_template_dir
+from folders import project_folder, unit_folder_names
+import template_store
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+# Load configuration
+config = ConfigParser()
+config.read('config.ini')
+
+scaffold_config = config['Scaffold'] if config.has_section('Scaffold') else {}
+# Filesystem operations run at once; on a network share each one mostly waits on the server
+WORKERS = int(scaffold_config.get('workers', 8))
+
+TEMPLATE_FILES = ("Innregulering.docx", "Sjekkliste.docx")
+STAGING_PREFIX = ".staging-"
+
+class ScaffoldCancelled(Exception):
+    pass
+
+@dataclass
+class ScaffoldPlan:
+    """
+    Everything to create for one project folder, relative to the folder itself.
+    """
+    folder: str  # Final path of the project folder
+    directories: List[str] = field(default_factory=list)
+    documents: List[Tuple[str, str]] = field(default_factory=list)  # (template file, destination)
+    materialize: str = template_store.MATERIALIZE
+
+    @property
+    def templates(self):
+        return sorted({template for template, _ in self.documents})
+
+    @property
+    def operations(self):
+        # Storing each template, the folders, writing the documents when eager, and the manifest
+        written = len(self.documents) if self.materialize == 'eager' else 0
+        return len(self.templates) + len(self.directories) + written + 1
+
+@dataclass
+class ScaffoldReport:
+    folder: str = ""
+    directories: int = 0
+    documents: int = 0
+    written: int = 0  # Documents written out now rather than on first use
+    seconds: float = 0.0
+    merged: bool = False  # The folder already existed and only missing entries were added
+
+    def summary(self):
+        return (
+            f"Created {self.directories} folders and {self.documents} documents ({self.written} written out) "
+            f"in {self.seconds:.2f}s"
+            f"{' (merged into the existing folder)' if self.merged else ''}."
+        )
+
+def plan_project_folder(project) -> ScaffoldPlan:
+    """
+    Plans the folder tree of a new project: a 'Floor plan' folder and the template documents for a
+    single project, or a 'Master' folder and one folder with 'Floor plan' and documents per unit for a
+    residential complex.
+    """
+    template_dir = get_template_dir()
+    plan = ScaffoldPlan(folder=project_folder(project))
+    if project.is_residential_complex:
+        plan.directories.append("Master")
+        # The same folders the database stores for the units when the project is added
+        for unit_folder in unit_folder_names(project.units):
+            plan.directories.append(os.path.join(unit_folder, "Floor plan"))
+            plan.documents.extend(
+                (os.path.join(template_dir, file), os.path.join(unit_folder, file)) for file in TEMPLATE_FILES
+            )
+    else:
+        plan.directories.append("Floor plan")
+        plan.documents.extend((os.path.join(template_dir, file), file) for file in TEMPLATE_FILES)
+    return plan
+
+def build_staging(plan: ScaffoldPlan, progress: Optional[Callable[[int, int], None]] = None,
+                  cancel_event: Optional[threading.Event] = None, workers: int = WORKERS) -> str:
+    """
+    Builds the planned tree in a staging folder next to the project folder and returns its path.
+    The templates are put in the template store and the folders created, each step on a thread pool.
+    The documents are listed in the folder's manifest and written out on first use, or right away
+    when materialize is 'eager'. progress(done, total) is called from the pool threads. On failure or
+    cancellation the staging folder is removed and the error (ScaffoldCancelled when cancelled) is raised.
+    """
+    staging = os.path.join(
+        os.path.dirname(plan.folder), f"{STAGING_PREFIX}{os.path.basename(plan.folder)}-{uuid.uuid4().hex[:8]}"
+    )
+    total = plan.operations
+    done = 0
+    lock = threading.Lock()
+
+    def run(operation, *args):
+        nonlocal done
+        if cancel_event is not None and cancel_event.is_set():
+            raise ScaffoldCancelled()
+        result = operation(*args)
+        with lock:
+            done += 1
+            if progress is not None:
+                progress(done, total)
+        return result
+
+    def run_step(pool, jobs):
+        futures = [pool.submit(run, *job) for job in jobs]
+        try:
+            return [future.result() for future in futures]
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+    try:
+        os.makedirs(staging)
+        with ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="scaffold") as pool:
+            templates = plan.templates
+            digests = dict(zip(templates, run_step(pool, [(template_store.put, template) for template in templates])))
+            run_step(pool, [(os.makedirs, os.path.join(staging, directory)) for directory in plan.directories])
+            # Documents need their folders, so they are written once every folder exists
+            if plan.materialize == 'eager':
+                run_step(pool, [
+                    (template_store.materialize, digests[template], os.path.join(staging, destination))
+                    for template, destination in plan.documents
+                ])
+            manifest = {destination.replace(os.sep, '/'): digests[template] for template, destination in plan.documents}
+            run(template_store.write_manifest, staging, manifest)
+        return staging
+    except BaseException:
+        discard_staging(staging)
+        raise
+
+def commit_staging(plan: ScaffoldPlan, staging: str) -> bool:
+    """
+    Moves a finished staging folder into place with one rename. If the project folder already exists,
+    the staged entries it lacks are moved into it instead and nothing existing is overwritten.
+    Returns True in that case.
+    """
+    if not os.path.exists(plan.folder):
+        os.rename(staging, plan.folder)
+        return False
+    _merge(staging, plan.folder)
+    discard_staging(staging)
+    return True
+
+def _merge(source, destination):
+    for entry in os.scandir(source):
+        target = os.path.join(destination, entry.name)
+        if not os.path.exists(target):
+            os.rename(entry.path, target)
+        elif entry.name == template_store.MANIFEST_NAME:
+            template_store.merge_manifest(source, destination)
+        elif entry.is_dir() and os.path.isdir(target):
+            _merge(entry.path, target)
+
+def discard_staging(staging: str):
+    shutil.rmtree(staging, ignore_errors=True)
+
+def scaffold_project(project, progress=None, cancel_event=None, workers: int = WORKERS) -> ScaffoldReport:
+    """
+    Creates the folder of a project: builds it in staging and moves it into place once complete,
+    so the project folder never exists half-built.
+    """
+    started = time.perf_counter()
+    plan = plan_project_folder(project)
+    staging = build_staging(plan, progress, cancel_event, workers)
+    try:
+        merged = commit_staging(plan, staging)
+    except Exception:
+        discard_staging(staging)
+        raise
+    report = ScaffoldReport(
+        folder=plan.folder,
+        directories=len(plan.directories),
+        documents=len(plan.documents),
+        written=len(plan.documents) if plan.materialize == 'eager' else 0,
+        seconds=time.perf_counter() - started,
+        merged=merged
+    )
+    logger.info(f"Scaffolded {plan.folder}: {report.summary()}")
+    return report
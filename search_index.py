@@ -0,0 +1,78 @@
+# File: search_index.py
+import re
+from sqlalchemy import text, bindparam
+
+# One row per project, rowid = projects.id. Unit names are folded into a single column.
+# Every statement takes the schema to work in, 'main' or an attached database such as the archive.
+CREATE_SEARCH_TABLE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS {schema}.project_search USING fts5("
+    "name, number, main_contractor, extra, units, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+)
+
+# Column weights for bm25, in table column order: name, number, main_contractor, extra, units
+RANK_EXPRESSION = "bm25(project_search, 10.0, 10.0, 4.0, 1.0, 3.0)"
+
+_INDEX_SELECT = (
+    "SELECT p.id, p.name, p.number, COALESCE(p.main_contractor, ''), COALESCE(p.extra, ''), "
+    "COALESCE((SELECT group_concat(u.name, ' ') FROM {schema}.units u WHERE u.project_id = p.id), '') "
+    "FROM {schema}.projects p"
+)
+
+def create_search_table(conn, schema='main'):
+    conn.execute(text(CREATE_SEARCH_TABLE.format(schema=schema)))
+
+def reindex_projects(conn, project_ids=None, schema='main'):
+    """
+    Rewrites the search rows of the given projects, or of every project when project_ids is None.
+    Runs on the caller's connection so it commits or rolls back together with the change.
+    """
+    index_select = _INDEX_SELECT.format(schema=schema)
+    if project_ids is None:
+        conn.execute(text(f"DELETE FROM {schema}.project_search"))
+        conn.execute(text(f"INSERT INTO {schema}.project_search (rowid, name, number, main_contractor, extra, units) {index_select}"))
+        return
+    project_ids = list(project_ids)
+    if not project_ids:
+        return
+    remove_projects(conn, project_ids, schema=schema)
+    conn.execute(
+        text(f"INSERT INTO {schema}.project_search (rowid, name, number, main_contractor, extra, units) {index_select} "
+             "WHERE p.id IN :ids").bindparams(bindparam('ids', expanding=True)),
+        {'ids': project_ids}
+    )
+
+def remove_projects(conn, project_ids, schema='main'):
+    conn.execute(
+        text(f"DELETE FROM {schema}.project_search WHERE rowid IN :ids").bindparams(bindparam('ids', expanding=True)),
+        {'ids': list(project_ids)}
+    )
+
+def build_match_query(search_text):
+    """
+    Turns free text into an FTS5 query where every word must match as a prefix.
+    Returns None when the text has nothing searchable.
+    """
+    words = re.findall(r"\w+", search_text or "")
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
+
+def search_project_ids(conn, search_text, status=None, limit=50, schema='main'):
+    """
+    Returns the ids of matching projects, best match first.
+    """
+    match_query = build_match_query(search_text)
+    if match_query is None:
+        return []
+    sql = (
+        f"SELECT project_search.rowid FROM {schema}.project_search "
+        f"JOIN {schema}.projects ON projects.id = project_search.rowid "
+        "WHERE project_search MATCH :query"
+    )
+    params = {'query': match_query, 'limit': limit}
+    if status is not None:
+        sql += " AND projects.status = :status"
+        params['status'] = status
+    sql += f" ORDER BY {RANK_EXPRESSION} LIMIT :limit"
+    return [row[0] for row in conn.execute(text(sql), params)]
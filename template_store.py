@@ -0,0 +1,195 @@
+# File: template_store.py
+import hashlib
+import json
+import os
+import shutil
+import sys
+import threading
+import uuid
+from configparser import ConfigParser
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from utils import get_project_dir
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+# Load configuration
+config = ConfigParser()
+config.read('config.ini')
+
+templates_config = config['Templates'] if config.has_section('Templates') else {}
+# 'lazy' writes a project's documents when they are first opened, 'eager' when the project is created
+MATERIALIZE = templates_config.get('materialize', 'lazy')
+STORE_DIR_NAME = ".template_store"
+# Lists each document of a project folder with the blob it starts from, by path relative to the folder
+MANIFEST_NAME = ".documents.json"
+
+FICLONE = 0x40049409  # Linux ioctl that makes a copy-on-write clone (btrfs, XFS)
+
+_hash_cache: Dict[tuple, str] = {}  # (path, size, mtime) -> sha256 of the file
+_hash_lock = threading.Lock()
+
+def get_store_dir():
+    return os.path.join(get_project_dir(), STORE_DIR_NAME)
+
+def blob_path(digest):
+    return os.path.join(get_store_dir(), digest[:2], digest)
+
+def file_digest(path):
+    stat = os.stat(path)
+    cache_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    with _hash_lock:
+        digest = _hash_cache.get(cache_key)
+    if digest is None:
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+        with _hash_lock:
+            _hash_cache[cache_key] = digest
+    return digest
+
+def put(path):
+    """
+    Stores the contents of a file once, named by its SHA-256, and returns the digest.
+    """
+    digest = file_digest(path)
+    target = blob_path(digest)
+    if not os.path.exists(target):
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        temporary = f"{target}.{uuid.uuid4().hex[:8]}.tmp"
+        shutil.copyfile(path, temporary)
+        os.replace(temporary, target)
+        logger.info(f"Stored template {os.path.basename(path)} as {digest}")
+    return digest
+
+def _reflink(source, destination):
+    """
+    Clones source to destination sharing its data blocks, where the filesystem supports it.
+    """
+    if not sys.platform.startswith('linux'):
+        return False
+    import fcntl
+
+    try:
+        with open(source, 'rb') as src, open(destination, 'wb') as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        return True
+    except OSError:
+        if os.path.exists(destination):
+            os.remove(destination)
+        return False
+
+def materialize(digest, destination):
+    """
+    Writes a blob to destination as an ordinary file the user may edit: a reflink where possible,
+    otherwise a copy. Hardlinks are never used, an in-place save would change the shared blob.
+    Returns True if the file was reflinked.
+    """
+    temporary = f"{destination}.{uuid.uuid4().hex[:8]}.tmp"
+    reflinked = _reflink(blob_path(digest), temporary)
+    if not reflinked:
+        shutil.copyfile(blob_path(digest), temporary)
+    os.replace(temporary, destination)
+    return reflinked
+
+def read_manifest(folder):
+    try:
+        with open(os.path.join(folder, MANIFEST_NAME), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+def write_manifest(folder, documents):
+    temporary = os.path.join(folder, f"{MANIFEST_NAME}.{uuid.uuid4().hex[:8]}.tmp")
+    with open(temporary, 'w', encoding='utf-8') as f:
+        json.dump(documents, f, indent=0, sort_keys=True)
+    os.replace(temporary, os.path.join(folder, MANIFEST_NAME))
+
+def merge_manifest(source_folder, destination_folder):
+    """
+    Adds the documents listed in source_folder's manifest to destination_folder's, keeping existing entries.
+    """
+    documents = read_manifest(source_folder)
+    documents.update(read_manifest(destination_folder))
+    write_manifest(destination_folder, documents)
+
+def ensure_document(project_folder, relative_path) -> Optional[str]:
+    """
+    Returns the path of a document in a project folder, writing it from the store the first time it
+    is needed. None if the document neither exists nor is listed in the folder's manifest.
+    """
+    path = os.path.join(project_folder, relative_path)
+    if os.path.exists(path):
+        return path
+    digest = read_manifest(project_folder).get(relative_path.replace(os.sep, '/'))
+    if digest is None or not os.path.exists(blob_path(digest)):
+        return None
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    reflinked = materialize(digest, path)
+    logger.info(f"Materialized {path} from template {digest}{' (reflink)' if reflinked else ''}")
+    return path
+
+def document_source(project_folder, relative_path) -> Optional[str]:
+    """
+    Returns the file holding a document's current contents without writing anything: the document
+    itself once it exists, else the blob it starts from.
+    """
+    path = os.path.join(project_folder, relative_path)
+    if os.path.exists(path):
+        return path
+    digest = read_manifest(project_folder).get(relative_path.replace(os.sep, '/'))
+    if digest is not None and os.path.exists(blob_path(digest)):
+        return blob_path(digest)
+    return None
+
+@dataclass
+class StoreReport:
+    projects: int = 0
+    documents: int = 0
+    materialized: int = 0
+    blobs: int = 0
+    blob_bytes: int = 0
+    bytes_saved: int = 0  # Size of the documents still served from the store, less the store itself
+
+    def summary(self):
+        return (
+            f"{self.documents} template documents in {self.projects} projects, {self.materialized} written out. "
+            f"{self.blobs} stored templates use {self.blob_bytes / 1024 / 1024:.1f} MB and save "
+            f"{self.bytes_saved / 1024 / 1024:.1f} MB compared to a copy of every document."
+        )
+
+def storage_report() -> StoreReport:
+    """
+    Counts the documents of every project folder with a manifest and the bytes the store saves.
+    """
+    report = StoreReport()
+    store_dir = get_store_dir()
+    sizes = {}
+    if os.path.isdir(store_dir):
+        for prefix in os.scandir(store_dir):
+            if prefix.is_dir():
+                for blob in os.scandir(prefix.path):
+                    if not blob.name.endswith('.tmp'):
+                        sizes[blob.name] = blob.stat().st_size
+    report.blobs = len(sizes)
+    report.blob_bytes = sum(sizes.values())
+    pending_bytes = 0
+    for entry in os.scandir(get_project_dir()):
+        if not entry.is_dir() or entry.name.startswith('.'):
+            continue
+        documents = read_manifest(entry.path)
+        if not documents:
+            continue
+        report.projects += 1
+        for relative_path, digest in documents.items():
+            report.documents += 1
+            if os.path.exists(os.path.join(entry.path, relative_path)):
+                report.materialized += 1
+            else:
+                pending_bytes += sizes.get(digest, 0)
+    report.bytes_saved = max(pending_bytes - report.blob_bytes, 0)
+    return report
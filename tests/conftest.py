@@ -0,0 +1,94 @@
+# File: tests/conftest.py
+import glob
+import os
+import sys
+import tempfile
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules read config.ini from the working directory when they are imported, so the tests run from a
+# scratch directory with their own configuration and never touch the project database of the repository
+WORK_DIR = tempfile.mkdtemp(prefix="project-manager-tests-")
+with open(os.path.join(WORK_DIR, "config.ini"), "w") as f:
+    f.write(
+        "[Paths]\n"
+        f"template_dir = {os.path.join(REPO_DIR, 'templates')}\n"
+        f"project_dir = {os.path.join(WORK_DIR, 'projects')}\n"
+        f"docx_temp_dir = {os.path.join(WORK_DIR, 'temp_docx')}\n"
+        f"logs_dir = {os.path.join(WORK_DIR, 'logs')}\n"
+        "database_file = projects.db\n"
+    )
+os.chdir(WORK_DIR)
+sys.path.insert(0, REPO_DIR)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+@pytest.fixture(scope="session")
+def qapp():
+    from PyQt5.QtWidgets import QApplication
+
+    return QApplication.instance() or QApplication([])
+
+@pytest.fixture
+def db(qapp):
+    """
+    A Database on a fresh file, removed again after the test.
+    """
+    from database import Database, db_path, archive_path
+    from controllers.db_executor import shutdown_executor
+
+    database = Database()
+    yield database
+    shutdown_executor(database)
+    database.close()
+    database.engine.dispose()
+    for path in glob.glob(f"{db_path}*") + glob.glob(f"{archive_path}*"):
+        os.remove(path)
+
+@pytest.fixture
+def controller(db):
+    from controllers.project_cache import ProjectCache
+    from controllers.project_controller import ProjectController
+
+    # A private cache, the shared one would carry projects over from other tests
+    return ProjectController(db, cache=ProjectCache())
+
+@pytest.fixture
+def make_project():
+    from datetime import date
+    from project import Project, Unit
+
+    def make(name="Project", number="1", status="Active", units=(), **fields):
+        return Project(
+            name=name, number=number, status=status, start_date=fields.pop('start_date', date(2024, 1, 1)),
+            worker=fields.pop('worker', "Tester"), is_residential_complex=bool(units), number_of_units=len(units),
+            units=[unit if isinstance(unit, Unit) else Unit(name=unit) for unit in units], **fields
+        )
+    return make
+
+class QueryCounter:
+    """
+    Counts the statements an engine executes while active.
+    """
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _count(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        from sqlalchemy import event
+
+        event.listen(self.engine, "before_cursor_execute", self._count)
+        return self
+
+    def __exit__(self, *exc_info):
+        from sqlalchemy import event
+
+        event.remove(self.engine, "before_cursor_execute", self._count)
+
+@pytest.fixture
+def count_queries(db):
+    return lambda: QueryCounter(db.engine)
@@ -0,0 +1,31 @@
+# File: tests/test_add_project_dialog.py
+import time
+
+from PyQt5.QtWidgets import QDialog
+
+def test_closing_while_folders_are_built_closes_once_cancelled(qapp, db, monkeypatch):
+    from gui import add_project_dialog
+    from scaffold import ScaffoldCancelled
+
+    def build_staging(plan, progress=None, cancel_event=None):
+        # Stands in for a slow network drive: nothing is built until the cancel arrives
+        cancel_event.wait(5)
+        raise ScaffoldCancelled()
+
+    monkeypatch.setattr(add_project_dialog, 'build_staging', build_staging)
+    dialog = add_project_dialog.AddProjectDialog(db)
+    dialog.show()
+    dialog.name_input.setText("Tower")
+    dialog.worker_input.setCurrentText("Tester")
+    dialog.save_project()
+
+    dialog.reject()
+    # The scaffold thread still has to clean up
+    assert dialog.isVisible()
+
+    deadline = time.monotonic() + 5
+    while dialog.isVisible() and time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(0.005)
+    assert not dialog.isVisible() and dialog.result() == QDialog.Rejected
+    assert db.load_projects() == []
@@ -0,0 +1,106 @@
+# File: tests/test_database.py
+import pytest
+
+def test_load_projects_uses_two_queries(db, make_project, count_queries):
+    for i in range(20):
+        db.add_project(make_project(name=f"Complex {i}", number=str(i), units=[f"A{n}" for n in range(5)]))
+    db.add_project(make_project(name="Single", number="99"))
+    db.Session.remove()  # Nothing already loaded in the session
+
+    # One query for the projects and one batched query for all of their units
+    with count_queries() as counter:
+        projects = db.load_projects()
+    assert len(projects) == 21
+    assert counter.count <= 2
+    assert sum(len(project.units) for project in projects) == 100
+
+def test_load_projects_by_status_uses_two_queries(db, make_project, count_queries):
+    for i in range(10):
+        db.add_project(make_project(name=f"P{i}", number=str(i), status="Active" if i % 2 else "Paused", units=["A", "B"]))
+    db.Session.remove()
+
+    with count_queries() as counter:
+        projects = db.load_projects(status="Active")
+    assert [project.status for project in projects] == ["Active"] * 5
+    assert counter.count <= 2
+
+def test_update_project_matches_unit_ids_before_names(db, make_project):
+    from project import Unit
+
+    project_id = db.add_project(make_project(units=[Unit(name="A", is_done=True)]))
+    project = db.get_project_by_id(project_id)
+    stored = project.units[0]
+
+    # A new unit takes the old name of the renamed one
+    project.units = [Unit(name="A"), Unit(id=stored.id, name="B", is_done=True)]
+    project.number_of_units = 2
+    db.update_project(project)
+
+    units = {unit.name: unit for unit in db.get_project_by_id(project_id).units}
+    assert units["B"].id == stored.id and units["B"].is_done
+    assert units["A"].id != stored.id and not units["A"].is_done
+
+def test_finished_projects_include_the_archive(db, controller, make_project):
+    from datetime import date
+    from archive import archive_finished_projects
+
+    old = make_project(name="Old", number="1", status="Finished", end_date=date(2000, 1, 1), units=["A", "B"])
+    old.units[0].is_done = True
+    old_id = db.add_project(old)
+    recent_id = db.add_project(make_project(name="Recent", number="2", status="Finished", end_date=date.today(), units=["A"]))
+    assert archive_finished_projects(db, max_age_days=365) == 1
+
+    projects, counts = controller.load_projects_with_counts(status="Finished", include_archive=True)
+    assert [(project.id, project.is_archived) for project in projects] == [(recent_id, False), (old_id, True)]
+    assert counts == {recent_id: (0, 1), old_id: (1, 2)}
+    assert [project.id for project in controller.load_projects(status="Finished")] == [recent_id]
+
+@pytest.mark.parametrize("sort_column", ["name", "number", "main_contractor", "end_date"])
+@pytest.mark.parametrize("descending", [False, True])
+def test_pages_arrive_in_view_order(db, make_project, sort_column, descending):
+    from datetime import date
+    from gui.project_tree_model import date_key
+    from utils import natural_key
+
+    names = ["Item 10", "item 9", "Item 1", "b", "B", "a2", "A10", "Ærfugl"]
+    end_dates = [None, date(2024, 5, 1), None, date(2023, 1, 2), date(2024, 5, 1), None, date(2022, 1, 1), date(2025, 1, 1)]
+    for i, (name, end_date) in enumerate(zip(names, end_dates)):
+        db.add_project(make_project(name=name, number=name.upper(), main_contractor=name if i % 3 else None, end_date=end_date))
+
+    projects, after = [], None
+    while True:
+        page = db.load_projects_page(sort_column=sort_column, descending=descending, after=after, limit=3)
+        projects += page.projects
+        after = page.next_cursor
+        if after is None:
+            break
+
+    # The sort key of the project views, see ProjectTreeModel._set_sort_keys
+    key = date_key if sort_column == "end_date" else natural_key
+    expected = sorted(projects, key=lambda project: (key(getattr(project, sort_column)), project.id), reverse=descending)
+    assert [project.id for project in projects] == [project.id for project in expected]
+    assert len(projects) == len(names)
+
+def test_page_query_walks_the_sort_key_index(db):
+    from migrations import check_query_plans
+
+    plans = {label: uses_index for label, uses_index, _ in check_query_plans(db.engine)}
+    assert plans["projects page by name"]
+
+def test_renaming_a_project_keeps_a_shared_folder(db, make_project):
+    import os
+    import shutil
+    from folders import project_folder
+
+    first_id = db.add_project(make_project(name="Tower", number="1", folder="Tower - 1"))
+    second_id = db.add_project(make_project(name="Tower annex", number="2", folder="Tower - 1"))
+    folder = project_folder(db.get_project_by_id(first_id))
+    os.makedirs(folder)
+
+    project = db.get_project_by_id(first_id)
+    project.name = "Tower renamed"
+    db.update_project(project)
+
+    assert os.path.isdir(folder)
+    assert db.get_project_by_id(first_id).folder == db.get_project_by_id(second_id).folder == "Tower - 1"
+    shutil.rmtree(folder)
@@ -0,0 +1,26 @@
+# File: tests/test_engine_profile.py
+from sqlalchemy import text
+
+import database
+from database import ENGINE_PROFILE, create_database_engine
+
+def _pragmas(engine):
+    with engine.connect() as conn:
+        return conn.execute(text("PRAGMA journal_mode")).scalar(), conn.execute(text("PRAGMA mmap_size")).scalar()
+
+def test_default_profile_is_safe_on_a_network_share(tmp_path):
+    engine = create_database_engine(str(tmp_path / "default.db"), ENGINE_PROFILE)
+    assert _pragmas(engine) == ('delete', 0)
+    engine.dispose()
+
+def test_wal_falls_back_to_delete_on_a_network_share(tmp_path, monkeypatch):
+    profile = dict(ENGINE_PROFILE, journal_mode='WAL', mmap_size=134217728)
+    monkeypatch.setattr(database, 'is_network_path', lambda path: True)
+    engine = create_database_engine(str(tmp_path / "share.db"), profile)
+    assert _pragmas(engine) == ('delete', 0)
+    engine.dispose()
+
+    monkeypatch.setattr(database, 'is_network_path', lambda path: False)
+    engine = create_database_engine(str(tmp_path / "local.db"), profile)
+    assert _pragmas(engine) == ('wal', 134217728)
+    engine.dispose()
@@ -0,0 +1,18 @@
+# File: tests/test_event_handlers.py
+from datetime import date
+
+class FailingController:
+    def update_project_async(self, project, on_done=None, on_error=None):
+        self.saved = project
+        on_error(RuntimeError("database is locked"))
+
+def test_failed_move_leaves_the_shown_project_unchanged(qapp, make_project, monkeypatch):
+    from gui import event_handlers
+
+    monkeypatch.setattr(event_handlers.QMessageBox, 'critical', lambda *args: None)
+    project = make_project(status="Completed")
+    controller = FailingController()
+    event_handlers.handle_move_project(controller, project, "Finished", None)
+
+    assert (controller.saved.status, controller.saved.end_date) == ("Finished", date.today())
+    assert (project.status, project.end_date) == ("Completed", None)
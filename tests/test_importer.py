@@ -0,0 +1,37 @@
+# File: tests/test_importer.py
+import pytest
+
+from importer import import_projects, iter_rows, validate_row
+
+HEADER = "Project Name;Project Number;Worker;Start Date;Units\n"
+
+def _write(tmp_path, text):
+    path = tmp_path / "projects.csv"
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+def test_unquoted_units_in_semicolon_file_are_rejected_with_row_number(tmp_path):
+    path = _write(tmp_path, HEADER + "Tower;1;Kari;2024-01-01;D1\nBlock;2;Kari;2024-01-01;D1;D2;D3\n")
+    rows = list(iter_rows(path))
+    assert validate_row(rows[0][1])[1] == ["D1"]
+    assert rows[1][0] == 3
+    with pytest.raises(ValueError, match="2 more values than columns"):
+        validate_row(rows[1][1])
+
+def test_semicolon_file_separates_units_with_commas(tmp_path):
+    path = _write(tmp_path, HEADER + 'Block;2;Kari;2024-01-01;D1,D2,D3\nTower;3;Kari;2024-01-01;"H1;H2"\n')
+    assert [validate_row(row)[1] for _, row in iter_rows(path)] == [["D1", "D2", "D3"], ["H1", "H2"]]
+
+def test_comma_file_separates_units_with_semicolons(tmp_path):
+    path = _write(tmp_path, HEADER.replace(";", ",") + "Block,2,Kari,2024-01-01,D1;D2\n")
+    assert [validate_row(row)[1] for _, row in iter_rows(path)] == [["D1", "D2"]]
+
+def test_import_reports_rejected_rows(db, tmp_path):
+    path = _write(tmp_path, HEADER + "Tower;1;Kari;2024-01-01;D1,D2\nBlock;2;Kari;2024-01-01;D1;D2\n")
+    report = import_projects(db, path)
+    assert report.projects_inserted == 1 and report.units_inserted == 2
+    assert [row_number for row_number, _ in report.rejects] == [3]
+    # Imported rows bypass the ORM but still get the keys pages are sorted by
+    assert db.load_projects_page(sort_column='name').projects[0].name == "Tower"
+    with db.engine.connect() as conn:
+        assert conn.exec_driver_sql("SELECT COUNT(*) FROM projects WHERE name_sort IS NULL").scalar() == 0
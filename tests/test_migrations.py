@@ -0,0 +1,35 @@
+# File: tests/test_migrations.py
+from sqlalchemy import create_engine, text
+
+def test_unit_dedupe_keeps_done_state(tmp_path):
+    from migrations import _add_lookup_indexes
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE projects (id INTEGER PRIMARY KEY, status VARCHAR, number VARCHAR)"))
+        conn.execute(text("CREATE TABLE units (id INTEGER PRIMARY KEY, project_id INTEGER, name VARCHAR, is_done BOOLEAN)"))
+        conn.execute(text(
+            "INSERT INTO units (id, project_id, name, is_done) VALUES "
+            "(1, 1, 'A', 0), (2, 1, 'A', 1), (3, 1, 'B', 0), (4, 1, 'B', 0), (5, 2, 'A', 0)"
+        ))
+        _add_lookup_indexes(conn)
+        rows = conn.execute(text("SELECT id, project_id, name, is_done FROM units ORDER BY id")).fetchall()
+    assert [tuple(row) for row in rows] == [(1, 1, 'A', 1), (3, 1, 'B', 0), (5, 2, 'A', 0)]
+
+def test_sort_keys_are_backfilled_and_indexed(tmp_path):
+    from migrations import _add_sort_key_columns
+    from utils import natural_sort_key
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE projects (id INTEGER PRIMARY KEY, name VARCHAR, number VARCHAR, main_contractor VARCHAR, worker VARCHAR)"
+        ))
+        conn.execute(text("INSERT INTO projects VALUES (1, 'Item 10', '7', NULL, 'Kari'), (2, 'item 9', '12', 'Veidekke', 'Ola')"))
+        _add_sort_key_columns(conn)
+        rows = conn.execute(text("SELECT id FROM projects ORDER BY name_sort")).fetchall()
+        keys = conn.execute(text("SELECT main_contractor_sort, worker_sort FROM projects WHERE id = 1")).fetchone()
+        plan = " ".join(row[-1] for row in conn.execute(text("EXPLAIN QUERY PLAN SELECT * FROM projects ORDER BY number_sort DESC")))
+    assert [row[0] for row in rows] == [2, 1]
+    assert tuple(keys) == ('', natural_sort_key('Kari'))
+    assert "ix_projects_number_sort" in plan and "TEMP B-TREE" not in plan
@@ -0,0 +1,38 @@
+# File: tests/test_presence_index.py
+import os
+import threading
+import time
+
+def _wait_for(qapp, condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting for the presence index"
+        qapp.processEvents()
+        time.sleep(0.005)
+
+def test_polled_change_is_scanned_once_with_its_bookkeeping(qapp, tmp_path, monkeypatch):
+    from gui import presence_index
+
+    folder = str(tmp_path / "Project - 1")
+    os.makedirs(folder)
+    index = presence_index.PresenceIndex()
+    index.request([folder])
+    _wait_for(qapp, lambda: folder in index._files)
+
+    # The next scan blocks, so the poll's scan is still running when the folder is invalidated
+    release = threading.Event()
+    scan = presence_index.scan_project_folder
+    monkeypatch.setattr(presence_index, 'scan_project_folder', lambda path: release.wait(5) and scan(path))
+    index._polled.add(folder)
+    index._directories[folder] = {folder: 0}
+    scans = index.scans
+    index._poll()
+    _wait_for(qapp, lambda: folder in index._scanning)
+
+    index.invalidate(folder)
+    assert index.scans == scans + 1 and folder in index._rescan
+
+    release.set()
+    _wait_for(qapp, lambda: not index._scanning and not index._rescan)
+    assert index.scans == scans + 2
+    index.shutdown()
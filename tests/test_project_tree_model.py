@@ -0,0 +1,78 @@
+# File: tests/test_project_tree_model.py
+import time
+
+import pytest
+
+class SignalCounter:
+    def __init__(self, model):
+        self.counts = {'rowsInserted': 0, 'rowsRemoved': 0, 'dataChanged': 0, 'modelReset': 0}
+        for name in self.counts:
+            getattr(model, name).connect(lambda *args, name=name: self.counts.__setitem__(name, self.counts[name] + 1))
+
+# The same counts for a small and a large model show that an event costs the rows it changes, not the model size
+@pytest.fixture(params=[30, 300])
+def loaded_model(request, qapp, db, controller, make_project):
+    from gui.presence_index import PresenceIndex
+    from gui.project_tree_model import ProjectTreeModel
+
+    for i in range(request.param):
+        db.add_project(make_project(name=f"Complex {i}", number=str(i), units=["A", "B", "C"]))
+    presence = PresenceIndex()
+    model = ProjectTreeModel(controller, presence=presence)
+    model.append_projects(controller.load_projects(), controller.unit_completion_counts())
+    # The folders of new rows are scanned in the background; their updates aren't part of the events measured
+    _wait_for(qapp, lambda: not presence._scanning)
+    yield model
+    presence.shutdown()
+
+def _wait_for(qapp, condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting for the model"
+        qapp.processEvents()
+        time.sleep(0.005)
+
+def _events_of(db, model, change):
+    """
+    Makes a change without the model seeing it and returns the change events it caused.
+    """
+    events = []
+    db.project_changed.disconnect(model.on_project_changed)
+    db.project_changed.connect(events.append)
+    try:
+        change()
+    finally:
+        db.project_changed.disconnect(events.append)
+        db.project_changed.connect(model.on_project_changed)
+    return events
+
+def test_unit_toggled_patches_two_cells_without_queries(qapp, db, loaded_model, count_queries):
+    project = loaded_model._projects[len(loaded_model._projects) // 2]
+    unit = project.units[0]
+    events = _events_of(db, loaded_model, lambda: db.toggle_unit_status(project.id, unit.id, True))
+
+    signals = SignalCounter(loaded_model)
+    with count_queries() as counter:
+        for event in events:
+            db.project_changed.emit(event)
+        qapp.processEvents()
+    # The unit's check box and its project's completed count
+    assert signals.counts == {'rowsInserted': 0, 'rowsRemoved': 0, 'dataChanged': 2, 'modelReset': 0}
+    assert counter.count == 0
+
+def test_project_updated_replaces_one_row(qapp, db, loaded_model, count_queries):
+    project = loaded_model._projects[len(loaded_model._projects) // 2]
+    events = _events_of(db, loaded_model, lambda: db.update_project(
+        type(project)(**dict(vars(project), extra="Changed"))
+    ))
+
+    signals = SignalCounter(loaded_model)
+    with count_queries() as counter:
+        for event in events:
+            db.project_changed.emit(event)
+        _wait_for(qapp, lambda: signals.counts['rowsInserted'])
+        qapp.processEvents()
+    assert signals.counts == {'rowsInserted': 1, 'rowsRemoved': 1, 'dataChanged': 0, 'modelReset': 0}
+    # The project with its units and its completion count, whatever the number of loaded projects
+    assert counter.count <= 3
+    assert loaded_model._projects[len(loaded_model._projects) // 2].extra == "Changed"
@@ -1,8 +1,10 @@
 # File: utils.py
 import os
+import re
 import sys
 import subprocess
 from configparser import ConfigParser
+from datetime import date, timedelta
 
 # Load configuration
 config = ConfigParser()
@@ -11,6 +13,54 @@ config.read('config.ini')
 def sanitize_filename(filename):
     return "".join(c for c in filename if c.isalnum() or c in (" ", "_", "-")).rstrip()
 
+def natural_key(text):
+    """
+    Sorts text case-insensitively with runs of digits compared as numbers, so '9' comes before '10'.
+    """
+    return tuple((0, int(part)) if part.isdigit() else (1, part.casefold()) for part in re.split(r'(\d+)', text or "") if part)
+
+def natural_sort_key(text):
+    """
+    natural_key as a string that sorts the same way by plain text comparison, so it can be stored in an
+    indexed column. Numbers are written with their length first, and parts are separated by a control
+    character that sorts before any text.
+    """
+    parts = []
+    for kind, value in natural_key(text):
+        if kind == 0:
+            digits = str(value)
+            parts.append(f"0{len(digits):03d}{digits}")
+        else:
+            parts.append(f"1{value}")
+    return "\x01".join(parts)
+
+# Named date ranges accepted by the project date filters
+DATE_PERIODS = ("this_month", "last_month", "this_quarter", "last_quarter", "this_year", "last_year")
+
+def date_range(period, today=None):
+    """
+    Returns the inclusive (first day, last day) of a named period relative to today.
+    """
+    today = today or date.today()
+    if period in ("this_month", "last_month"):
+        first = today.replace(day=1)
+        if period == "last_month":
+            first = (first - timedelta(days=1)).replace(day=1)
+        months = 1
+    elif period in ("this_quarter", "last_quarter"):
+        first = date(today.year, 3 * ((today.month - 1) // 3) + 1, 1)
+        if period == "last_quarter":
+            first = date(first.year - 1, 10, 1) if first.month == 1 else date(first.year, first.month - 3, 1)
+        months = 3
+    elif period in ("this_year", "last_year"):
+        first = date(today.year - (period == "last_year"), 1, 1)
+        months = 12
+    else:
+        raise ValueError(f"Unknown date period '{period}'. Use one of {', '.join(DATE_PERIODS)}.")
+    month_after = first.month - 1 + months
+    last = date(first.year + month_after // 12, month_after % 12 + 1, 1) - timedelta(days=1)
+    return first, last
+
 def get_template_dir():
     return os.path.abspath(config['Paths']['template_dir'])
 